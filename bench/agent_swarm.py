@@ -0,0 +1,119 @@
+import argparse
+import multiprocessing
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from linux.agent import PushAgent
+from linux.collector import LinuxMetricsCollector
+from web.aggregator import Aggregator
+
+
+# 에이전트 군집 벤치: 로컬 프로세스 여러 개가 각각 수백 개 호스트(에이전트 스레드)를 흉내 내어 수집기로 푸시
+# 수집기는 이 프로세스 안에서 실행(--server 지정 시 외부 수집기로 보냄)하고 수신량/CPU 사용을 주기적으로 출력
+class SharedSample:
+	# 프로세스 안의 에이전트들은 같은 /proc 샘플을 공유(주기당 한 번 수집), 호스트마다 카운터만 조금씩 다르게
+	def __init__(self, interval_s: float):
+		self.interval_s = interval_s
+		self.collector = LinuxMetricsCollector()
+		self.lock = threading.Lock()
+		self.at = 0.0
+		self.metrics = None
+
+	def get(self, offset: int):
+		with self.lock:
+			now = time.monotonic()
+			if self.metrics is None or now - self.at >= self.interval_s / 2:
+				self.metrics = self.collector.collect_all()
+				self.at = now
+			metrics = self.metrics
+		network = dict(metrics["network"])
+		network["rx_bytes_total"] = (network.get("rx_bytes_total") or 0) + offset * 1000
+		out = dict(metrics)
+		out["network"] = network
+		return out
+
+
+def run_agents(server: str, proc_idx: int, count: int, interval_s: float, batch: int):
+	sample = SharedSample(interval_s)
+	agents = []
+	for i in range(count):
+		offset = proc_idx * count + i
+		agents.append(PushAgent(
+			server,
+			lambda offset=offset: sample.get(offset),
+			host=f"swarm-{proc_idx}-{i}",
+			interval_s=interval_s,
+			batch=batch,
+		))
+	rand = random.Random(proc_idx)
+	threads = []
+	for agent in agents:
+		# 시작 시각을 주기 안에서 흩어 동시 접속 폭주를 피함
+		t = threading.Timer(rand.uniform(0, interval_s), agent.run)
+		t.daemon = True
+		t.start()
+		threads.append(t)
+	for t in threads:
+		t.join()
+	while True:
+		time.sleep(3600)
+
+
+def main():
+	parser = argparse.ArgumentParser(description="에이전트 푸시 수집기 부하 벤치")
+	parser.add_argument("--agents", type=int, default=1000, help="전체 에이전트(호스트) 수")
+	parser.add_argument("--procs", type=int, default=4, help="에이전트를 나눠 실행할 프로세스 수")
+	parser.add_argument("--interval", type=float, default=5.0, help="에이전트 수집 주기(초)")
+	parser.add_argument("--batch", type=int, default=1, help="프레임당 샘플 수")
+	parser.add_argument("--duration", type=float, default=60.0)
+	parser.add_argument("--server", type=str, help="외부 수집기 host:port(생략 시 이 프로세스에서 실행)")
+	args = parser.parse_args()
+
+	aggregator = None
+	server = args.server
+	if server is None:
+		aggregator = Aggregator("127.0.0.1", 0).start()
+		server = f"127.0.0.1:{aggregator.listen[1]}"
+	per_proc = max(1, args.agents // args.procs)
+	# 수집기 스레드가 도는 프로세스를 fork하지 않도록 spawn
+	ctx = multiprocessing.get_context("spawn")
+	procs = [
+		ctx.Process(target=run_agents, args=(server, p, per_proc, args.interval, args.batch), daemon=True)
+		for p in range(args.procs)
+	]
+	for p in procs:
+		p.start()
+	print(f"{per_proc * args.procs} agents in {args.procs} procs -> {server}")
+	if aggregator is None:
+		time.sleep(args.duration)
+		return
+
+	aggregator.collect_all()
+	cpu0 = time.process_time()
+	t0 = time.monotonic()
+	end = t0 + args.duration
+	while time.monotonic() < end:
+		time.sleep(min(5.0, max(0.0, end - time.monotonic())))
+		snap_t0 = time.perf_counter()
+		summary = aggregator.collect_all()["agents"]
+		snap_ms = (time.perf_counter() - snap_t0) * 1000.0
+		cpu = time.process_time() - cpu0
+		elapsed = time.monotonic() - t0
+		print(
+			f"t={elapsed:5.1f}s connected={summary['connected']} stale={summary['stale']} "
+			f"samples/s={summary['samples_per_sec']} bytes/s={summary['bytes_per_sec']} "
+			f"bytes/sample={summary['bytes_per_sample']} errors={summary['errors_total']} "
+			f"cpu={cpu / elapsed * 100:.1f}% snapshot={snap_ms:.0f}ms"
+		)
+	for p in procs:
+		p.terminate()
+	aggregator.close()
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,170 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# 로컬 테스트/벤치용 Jolokia 에이전트 흉내: bulk read(JSON 배열 POST)에 합성 JVM 값으로 응답
+# 경로별로 서로 다른 JVM처럼 동작(예: /jvm/3/jolokia), keep-alive(HTTP/1.1) 지원
+class SyntheticJvm:
+	# 경과 시간만큼 일정 속도로 Eden에 할당, Eden이 차면 young GC(일부는 Old로 승격), Old가 차면 full GC
+	EDEN_BYTES = 256 << 20
+	OLD_BYTES = 1024 << 20
+
+	def __init__(self, seed: int):
+		self.rand = random.Random(seed)
+		self.started = time.monotonic()
+		self.last = self.started
+		# 초당 할당 바이트와 young GC당 승격 비율
+		self.alloc_rate = self.rand.randint(50, 400) << 20
+		self.promote_ratio = self.rand.uniform(0.01, 0.05)
+		self.young_count = 0
+		self.young_time = 0
+		self.old_count = 0
+		self.old_time = 0
+		self.eden_used = 0
+		self.old_used = 64 << 20
+		self.last_young = None
+		self.last_old_after = None
+		self.lock = threading.Lock()
+
+	def tick(self):
+		# 호출마다 시간 경과만큼 할당/GC를 진행시켜 누적 카운터가 증가하도록 함
+		with self.lock:
+			now = time.monotonic()
+			self.eden_used += int(self.alloc_rate * (now - self.last))
+			self.last = now
+			while self.eden_used >= self.EDEN_BYTES:
+				promoted = int(self.EDEN_BYTES * self.promote_ratio)
+				before = {"G1 Eden Space": self.EDEN_BYTES, "G1 Old Gen": self.old_used}
+				self.eden_used -= self.EDEN_BYTES
+				self.old_used += promoted
+				self.young_count += 1
+				self.young_time += self.rand.randint(2, 15)
+				self.last_young = (before, {"G1 Eden Space": 0, "G1 Old Gen": self.old_used})
+				if self.old_used >= self.OLD_BYTES:
+					self.old_used = 256 << 20
+					self.old_count += 1
+					self.old_time += self.rand.randint(50, 300)
+					self.last_old_after = self.old_used
+
+	def _gc_info(self, usage: tuple | None):
+		if usage is None:
+			return None
+		before, after = usage
+		return {
+			"memoryUsageBeforeGc": {name: {"init": 0, "used": used, "committed": 0, "max": -1} for name, used in before.items()},
+			"memoryUsageAfterGc": {name: {"init": 0, "used": used, "committed": 0, "max": -1} for name, used in after.items()},
+		}
+
+	def value(self, req: dict):
+		mbean = req.get("mbean", "")
+		uptime = int((time.monotonic() - self.started) * 1000)
+		heap_used = self.eden_used + self.old_used
+		if mbean == "java.lang:type=Memory":
+			return {
+				"HeapMemoryUsage": {"init": 256 << 20, "used": heap_used, "committed": 1536 << 20, "max": 2 << 30},
+				"NonHeapMemoryUsage": {"init": 7 << 20, "used": 90 << 20, "committed": 100 << 20, "max": -1},
+			}
+		if mbean == "java.lang:type=GarbageCollector,name=*":
+			return {
+				"java.lang:name=G1 Young Generation,type=GarbageCollector": {
+					"CollectionCount": self.young_count,
+					"CollectionTime": self.young_time,
+					"LastGcInfo": self._gc_info(self.last_young),
+				},
+				"java.lang:name=G1 Old Generation,type=GarbageCollector": {
+					"CollectionCount": self.old_count,
+					"CollectionTime": self.old_time,
+					"LastGcInfo": None,
+				},
+			}
+		if mbean == "java.lang:type=MemoryPool,name=*":
+			pools = {
+				"G1 Eden Space": (self.eden_used, self.EDEN_BYTES, 0 if self.young_count else None),
+				"G1 Old Gen": (self.old_used, self.OLD_BYTES, self.last_old_after),
+				"G1 Survivor Space": (8 << 20, 16 << 20, 8 << 20),
+				"Metaspace": (60 << 20, 64 << 20, None),
+			}
+			attrs = req.get("attribute") or ["Usage"]
+			result = {}
+			for name, (used, committed, after_gc) in pools.items():
+				values = {}
+				for a in attrs:
+					if a == "CollectionUsage":
+						values[a] = None if after_gc is None else {"init": 0, "used": after_gc, "committed": committed, "max": -1}
+					else:
+						values[a] = {"init": 0, "used": used, "committed": committed, "max": -1}
+				result[f"java.lang:name={name},type=MemoryPool"] = values
+			return result
+		if mbean == "java.lang:type=Threading":
+			if req.get("type") == "exec":
+				return None
+			return {"ThreadCount": 42, "DaemonThreadCount": 30, "PeakThreadCount": 50}
+		if mbean == "java.lang:type=ClassLoading":
+			return {"LoadedClassCount": 9000, "TotalLoadedClassCount": 9100, "UnloadedClassCount": 100}
+		if mbean == "java.lang:type=OperatingSystem":
+			return {"ProcessCpuLoad": self.rand.random() * 0.5, "SystemCpuLoad": self.rand.random(), "ProcessCpuTime": uptime * 1000000}
+		if mbean == "java.lang:type=Runtime":
+			return {"Uptime": uptime, "VmName": "Stub VM", "VmVersion": "0.0"}
+		if mbean == "java.lang:type=Compilation":
+			return {"TotalCompilationTime": 1234}
+		raise KeyError(mbean)
+
+
+def make_handler(jvms: dict, delay_s: float):
+	class Handler(BaseHTTPRequestHandler):
+		protocol_version = "HTTP/1.1"
+		disable_nagle_algorithm = True
+
+		def log_message(self, *args):
+			pass
+
+		def do_POST(self):
+			body = self.rfile.read(int(self.headers.get("Content-Length", "0")))
+			jvm = jvms.setdefault(self.path, SyntheticJvm(hash(self.path)))
+			jvm.tick()
+			responses = []
+			for req in json.loads(body):
+				try:
+					responses.append({"request": req, "value": jvm.value(req), "status": 200, "timestamp": int(time.time())})
+				except KeyError:
+					responses.append({"request": req, "error": f"javax.management.InstanceNotFoundException : {req.get('mbean')}", "status": 404})
+			if delay_s:
+				time.sleep(delay_s)
+			data = json.dumps(responses).encode()
+			self.send_response(200)
+			self.send_header("Content-Type", "application/json")
+			self.send_header("Content-Length", str(len(data)))
+			self.end_headers()
+			self.wfile.write(data)
+
+	return Handler
+
+
+class StubServer(ThreadingHTTPServer):
+	daemon_threads = True
+	# 수백 개 동시 연결(플릿 테스트)을 받도록 listen backlog 확대
+	request_queue_size = 1024
+
+
+def serve(port: int, delay_s: float = 0.0) -> StubServer:
+	server = StubServer(("127.0.0.1", port), make_handler({}, delay_s))
+	threading.Thread(target=server.serve_forever, daemon=True).start()
+	return server
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Jolokia bulk read 스텁 서버")
+	parser.add_argument("--port", type=int, default=8778)
+	parser.add_argument("--delay-ms", type=float, default=0.0, help="응답 지연(ms)")
+	args = parser.parse_args()
+	server = StubServer(("127.0.0.1", args.port), make_handler({}, args.delay_ms / 1000.0))
+	print(f"jolokia stub on http://127.0.0.1:{args.port}/jolokia (any path = separate JVM)")
+	server.serve_forever()
+
+
+if __name__ == "__main__":
+	main()
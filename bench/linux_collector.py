@@ -0,0 +1,60 @@
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# 프로젝트 루트를 import 경로에 추가
+project_root = str(Path(__file__).resolve().parents[1])
+if project_root not in sys.path:
+	sys.path.insert(0, project_root)
+
+from linux.collector import LinuxMetricsCollector
+from linux.procs import ProcessTable
+
+
+def bench(fn, iterations: int) -> dict:
+	samples = []
+	for _ in range(iterations):
+		start = time.perf_counter()
+		fn()
+		samples.append((time.perf_counter() - start) * 1e6)
+	samples.sort()
+	return {
+		"mean_us": round(statistics.fmean(samples), 1),
+		"p50_us": round(samples[len(samples) // 2], 1),
+		"p99_us": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))], 1),
+	}
+
+
+def main():
+	parser = argparse.ArgumentParser(description="LinuxMetricsCollector.collect_all 1회 비용 측정")
+	parser.add_argument("--iterations", type=int, default=2000)
+	parser.add_argument("--process-top-n", type=int, default=10, help="프로세스 top-N(0이면 끔)")
+	parser.add_argument("--spawn", type=int, default=0, help="측정 동안 띄워 둘 유휴 프로세스 수(프로세스 수가 많은 호스트 흉내)")
+	args = parser.parse_args()
+
+	spawned = [subprocess.Popen(["sleep", "3600"]) for _ in range(args.spawn)]
+	try:
+		collector = LinuxMetricsCollector(process_top_n=args.process_top_n)
+		# 첫 호출(CPU 기준 샘플, 마운트 목록, 프로세스 fd 열기 등 초기화)은 측정에서 제외
+		collector.collect_all()
+		collector.collect_all()
+		result = bench(collector.collect_all, args.iterations)
+		print(f"collect_all x{args.iterations}: mean={result['mean_us']}us p50={result['p50_us']}us p99={result['p99_us']}us")
+		if args.process_top_n > 0:
+			table = ProcessTable(top_n=args.process_top_n)
+			table.sample()
+			table.sample()
+			result = bench(table.sample, args.iterations)
+			print(f"processes.sample x{args.iterations} ({len(table.entries)} procs): mean={result['mean_us']}us p50={result['p50_us']}us p99={result['p99_us']}us")
+			table.close()
+	finally:
+		for proc in spawned:
+			proc.kill()
+			proc.wait()
+
+
+if __name__ == "__main__":
+	main()
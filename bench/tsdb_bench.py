@@ -0,0 +1,75 @@
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core.tsdb import TimeSeriesStore
+
+
+# 시계열 저장소 벤치: 합성 메트릭을 1초 간격으로 기록해 점당 바이트와 조회 지연을 측정
+# 메트릭 구성은 실제 수집 결과와 비슷하게 상수/카운터/정수 게이지/실수 게이지를 섞음
+def synthetic(n: int, seed: int = 1):
+	rand = random.Random(seed)
+	state = []
+	for i in range(n):
+		kind = ("const", "counter", "int_gauge", "float_gauge")[i % 4]
+		state.append([kind, float(rand.randint(0, 10 ** 6)), rand.random()])
+
+	def step():
+		out = []
+		for s in state:
+			kind = s[0]
+			if kind == "counter":
+				s[1] += rand.randint(0, 5000)
+			elif kind == "int_gauge":
+				s[1] = max(0.0, s[1] + rand.randint(-3, 3))
+			elif kind == "float_gauge":
+				s[1] = round(abs(s[1] % 100 + rand.gauss(0, 1)), 3)
+			out.append(s[1])
+		return out
+
+	return step
+
+
+def main():
+	parser = argparse.ArgumentParser(description="시계열 저장소 크기/조회 벤치")
+	parser.add_argument("--metrics", type=int, default=200)
+	parser.add_argument("--hours", type=float, default=6.0, help="기록할 기간(1초 간격)")
+	parser.add_argument("--dir", type=str, help="저장 경로(기본 임시 디렉터리)")
+	args = parser.parse_args()
+
+	path = Path(args.dir or tempfile.mkdtemp(prefix="systools-tsdb-"))
+	store = TimeSeriesStore(path)
+	keys = [f"bench:m{i}" for i in range(args.metrics)]
+	seconds = int(args.hours * 3600)
+	step = synthetic(args.metrics)
+	start = int(time.time()) - seconds
+	t0 = time.perf_counter()
+	for t in range(start, start + seconds):
+		for key, value in zip(keys, step()):
+			store.append(key, t, value)
+	ingest_s = time.perf_counter() - t0
+	store.close()
+	store = TimeSeriesStore(path)
+
+	points = seconds * args.metrics
+	disk = store.disk_bytes()
+	print(f"dir: {path}")
+	print(f"points: {points}, ingest: {ingest_s:.1f}s ({points / ingest_s:,.0f} points/s)")
+	print(f"disk: {disk / 1e6:.2f} MB, {disk / points:.3f} bytes/point (all levels)")
+	print(f"1 week x {args.metrics} metrics estimate: {disk / seconds * 7 * 86400 / 1e6:.1f} MB")
+	end = start + seconds
+	for label, span, q_step in (("5m raw", 300, 1), ("1h raw", 3600, 1), ("1h auto", 3600, None), ("6h auto", 6 * 3600, None), ("1d 5m", 86400, 300)):
+		t0 = time.perf_counter()
+		result = store.query(keys[3], end - span, end, step=q_step)
+		ms = (time.perf_counter() - t0) * 1000.0
+		print(f"query {label:8s}: {ms:7.2f} ms, resolution {result['resolution_s']}s, step {result['step_s']}s, {len(result['points'])} points")
+	store.close()
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1 @@
+# empty package marker
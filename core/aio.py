@@ -0,0 +1,131 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+from core.sampler import SnapshotCache
+
+
+async def collect_async(collector) -> Dict[str, Any]:
+	# collect_all_async가 있으면 그대로, 없으면 collect_all을 executor 스레드에서 실행
+	fn = getattr(collector, "collect_all_async", None)
+	if fn is not None:
+		return await fn()
+	return await asyncio.get_running_loop().run_in_executor(None, collector.collect_all)
+
+
+async def close_async(collector):
+	try:
+		fn = getattr(collector, "close_async", None)
+		if fn is not None:
+			await fn()
+		elif hasattr(collector, "close"):
+			collector.close()
+	except Exception:
+		pass
+
+
+class AsyncPoller:
+	# 여러 대상을 한 이벤트 루프에서 interval 주기로 수집해 SnapshotCache에 기록(대상당 코루틴 하나, 대상당 스레드 없음)
+	# 동시 수집 수는 concurrency로 제한. timeout을 넘기면 timeout 오류로 기록하고 늦은 수집은 계속 진행되며,
+	# 같은 대상은 동시에 하나만 실행된다(CollectionScheduler와 같은 규칙)
+	def __init__(
+		self,
+		collectors: Dict[str, Any],
+		interval_s: float,
+		cache: SnapshotCache | None = None,
+		timeout_s: float | None = None,
+		concurrency: int = 64,
+		transform: Callable[[str, Dict[str, Any]], Dict[str, Any]] | None = None,
+		on_snapshot: Callable[[Dict[str, Any]], None] | None = None,
+	):
+		self.collectors = dict(collectors)
+		self.interval_s = max(0.1, float(interval_s))
+		self.cache = cache or SnapshotCache()
+		self.timeout_s = max(0.001, float(timeout_s)) if timeout_s else self.interval_s
+		self.concurrency = max(1, int(concurrency))
+		# transform(name, data): 수집 결과 후처리(변화율 계산, 시계열 기록 등), on_snapshot(snapshot): 기록 직후 호출
+		self.transform = transform
+		self.on_snapshot = on_snapshot
+		self._inflight: Dict[str, asyncio.Task] = {}
+		self._loop: asyncio.AbstractEventLoop | None = None
+		self._sem: asyncio.Semaphore | None = None
+		self._stop: asyncio.Event | None = None
+
+	def _prepare(self):
+		loop = asyncio.get_running_loop()
+		if self._loop is loop:
+			return
+		self._loop = loop
+		self._sem = asyncio.Semaphore(self.concurrency)
+		self._stop = asyncio.Event()
+		# collect_all_async가 없는 collector와 /proc 읽기 등 블로킹 구간이 쓰는 기본 executor(동시 수집 수만큼)
+		loop.set_default_executor(ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="systools-aio"))
+
+	async def _collect(self, name: str) -> Dict[str, Any]:
+		async with self._sem:
+			try:
+				data = await collect_async(self.collectors[name])
+				if self.transform is not None:
+					data = self.transform(name, data)
+				return {"name": name, "data": data, "error": None}
+			except Exception as e:
+				return {"name": name, "data": None, "error": str(e) or type(e).__name__}
+
+	async def poll(self, name: str) -> Dict[str, Any]:
+		self._prepare()
+		started = time.monotonic()
+		task = self._inflight.get(name)
+		# 이전 수집이 아직 끝나지 않았으면 새로 시작하지 않고 그 결과를 기다림
+		if task is None or task.done():
+			task = self._inflight[name] = asyncio.ensure_future(self._collect(name))
+		try:
+			result = await asyncio.wait_for(asyncio.shield(task), self.timeout_s)
+		except asyncio.TimeoutError:
+			result = {"name": name, "data": None, "error": f"timeout: no result within {self.timeout_s:g}s"}
+		snapshot = self.cache.put(name, result, (time.monotonic() - started) * 1000.0)
+		if self.on_snapshot is not None:
+			self.on_snapshot(snapshot)
+		return snapshot
+
+	async def once(self) -> List[Dict[str, Any]]:
+		return list(await asyncio.gather(*(self.poll(name) for name in self.collectors)))
+
+	async def _run_target(self, name: str, offset_s: float):
+		next_at = time.monotonic() + offset_s
+		while not self._stop.is_set():
+			delay = next_at - time.monotonic()
+			if delay > 0:
+				try:
+					await asyncio.wait_for(self._stop.wait(), delay)
+					break
+				except asyncio.TimeoutError:
+					pass
+			await self.poll(name)
+			# 고정 주기로 다음 시각 계산, 수집이 주기보다 길면 밀린 틱은 건너뜀
+			next_at += self.interval_s
+			now = time.monotonic()
+			if next_at < now:
+				next_at = now
+
+	async def run(self):
+		# stop() 호출까지 반복. 대상별 시작 시각을 주기 안에 고르게 흩어 수집이 한 순간에 몰리지 않게 함
+		self._prepare()
+		names = list(self.collectors)
+		await asyncio.gather(*(
+			self._run_target(name, self.interval_s * i / len(names))
+			for i, name in enumerate(names)
+		))
+
+	def stop(self):
+		if self._stop is not None:
+			self._stop.set()
+
+	async def close(self):
+		self.stop()
+		for task in self._inflight.values():
+			task.cancel()
+		await asyncio.gather(*self._inflight.values(), return_exceptions=True)
+		self._inflight.clear()
+		for collector in self.collectors.values():
+			await close_async(collector)
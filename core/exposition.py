@@ -0,0 +1,226 @@
+import gzip
+import hashlib
+import math
+import re
+import threading
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from core.rates import COUNTERS
+
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PREFIX = "systools"
+
+# 대상별 동적 키(인터페이스, 노드, 토픽 등) 경로 → 라벨 이름. 해당 키는 메트릭 이름 대신 라벨로 내보냄
+LABELS: Dict[str, Dict[str, str]] = {
+	"linux": {
+		"disk.*": "mount",
+		"diskio.*": "device",
+		"pressure.*": "resource",
+		"network.interfaces.*": "interface",
+		"processes.top_cpu.*": "process",
+		"processes.top_rss.*": "process",
+		"processes.top_io.*": "process",
+		"processes.top_fds.*": "process",
+		"cgroups.groups.*": "cgroup",
+	},
+	"redis": {
+		"clients.by_name.*": "client_name",
+		"clients.by_host.*": "client_host",
+		"nodes.*": "node",
+	},
+	"kafka": {
+		"throughput.topics.*": "topic",
+		"throughput.brokers.*": "broker",
+		"lag.topics.*": "topic",
+		"lag.topics.*.partitions.*": "partition",
+		"lag.groups.*": "group",
+		"lag.groups.*.topics.*": "topic",
+		"lag.groups.*.topics.*.partitions.*": "partition",
+	},
+	"jvm": {
+		"pools.*": "pool",
+		"jvms.*": "jvm",
+	},
+}
+# 라벨 값을 dict 키 대신 항목의 필드로 쓰는 경로. 프로세스 top-N 키 "comm[pid]"는 PID마다 새 시계열이 생기므로
+# comm만 라벨로 쓰고(같은 comm이 여럿이면 순위가 높은 첫 항목만) pid는 gauge 값으로 남김
+LABEL_FIELDS: Dict[str, Dict[str, str]] = {
+	"linux": {
+		"processes.top_cpu.*": "comm",
+		"processes.top_rss.*": "comm",
+		"processes.top_io.*": "comm",
+		"processes.top_fds.*": "comm",
+	},
+}
+# 에이전트 수집기: 호스트별 linux 메트릭(호스트 이름 라벨 + linux 라벨)
+LABELS["agents"] = {"hosts.*": "host"}
+LABELS["agents"].update({f"hosts.*.{path}": label for path, label in LABELS["linux"].items()})
+LABEL_FIELDS["agents"] = {f"hosts.*.{path}": field for path, field in LABEL_FIELDS["linux"].items()}
+
+# 내보내지 않는 섹션/키: rates는 Prometheus가 직접 계산, meta는 라벨로 사용, error는 값이 매번 달라 시계열 폭증
+SKIP_SECTIONS = ("rates", "meta")
+SKIP_KEYS = ("error", "last_error")
+# 짧은 문자열 값(role, cluster_state 등)은 value 라벨을 단 info 메트릭으로
+MAX_INFO_VALUE_LEN = 64
+
+NAME_INVALID_RE = re.compile(r"[^a-zA-Z0-9_]")
+
+
+def metric_name(*parts: str) -> str:
+	name = NAME_INVALID_RE.sub("_", "_".join(p for p in parts if p))
+	return f"_{name}" if name[:1].isdigit() else name
+
+
+def label_value(value: Any) -> str:
+	# URL의 인증 정보는 라벨에 남기지 않음
+	text = str(value)
+	if "://" in text and "@" in text:
+		parts = urlsplit(text)
+		text = urlunsplit((parts.scheme, parts.netloc.rpartition("@")[2], parts.path, parts.query, parts.fragment))
+	return text.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def format_labels(labels: Dict[str, str]) -> str:
+	if not labels:
+		return ""
+	return "{" + ",".join(f'{k}="{label_value(v)}"' for k, v in labels.items()) + "}"
+
+
+def format_value(value: int | float) -> str:
+	if isinstance(value, bool):
+		return "1" if value else "0"
+	if isinstance(value, int):
+		return str(value)
+	value = float(value)
+	# OpenMetrics 표기: inf/nan은 +Inf/-Inf/NaN (repr 그대로면 스크레이프 전체가 파싱 실패)
+	if math.isnan(value):
+		return "NaN"
+	if math.isinf(value):
+		return "+Inf" if value > 0 else "-Inf"
+	return repr(value)
+
+
+class MetricFamilies:
+	# OpenMetrics는 같은 메트릭의 샘플이 연속해야 하므로 이름별로 모았다가 한 번에 출력
+	def __init__(self):
+		self._families: Dict[str, Tuple[str, List[Tuple[str, Dict[str, str], int | float]]]] = {}
+
+	def add(self, family: str, kind: str, labels: Dict[str, str], value: int | float, suffix: str = ""):
+		entry = self._families.get(family)
+		if entry is None:
+			entry = self._families[family] = (kind, [])
+		elif entry[0] != kind:
+			# 같은 이름이 다른 타입으로 나오면(스키마 충돌) 먼저 등록된 타입 유지, 샘플은 버림
+			return
+		if kind == "counter" and isinstance(value, float) and not math.isfinite(value):
+			# counter 값은 유한한 수만 허용되므로 버림(gauge는 +Inf/-Inf/NaN으로 출력)
+			return
+		entry[1].append((family + suffix, labels, value))
+
+	def render(self) -> str:
+		lines: List[str] = []
+		for family, (kind, samples) in self._families.items():
+			lines.append(f"# TYPE {family} {kind}")
+			for name, labels, value in samples:
+				lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+		lines.append("# EOF")
+		return "\n".join(lines) + "\n"
+
+
+def flatten(target: str, data: Dict[str, Any], base_labels: Dict[str, str], families: MetricFamilies):
+	# 중첩 dict를 메트릭으로 펼침. LABELS 경로의 키는 라벨로, 카운터 경로(core.rates.COUNTERS)는 counter 타입
+	labeled = LABELS.get(target, {})
+	label_fields = LABEL_FIELDS.get(target, {})
+	counters = set(COUNTERS.get(target, ()))
+
+	def walk(node: Dict[str, Any], pattern: str, name_parts: List[str], labels: Dict[str, str]):
+		seen = set()
+		for key, value in node.items():
+			key = str(key)
+			if not pattern and key in SKIP_SECTIONS:
+				continue
+			if key in SKIP_KEYS:
+				continue
+			star = f"{pattern}.*" if pattern else "*"
+			if star in labeled:
+				field = label_fields.get(star)
+				if field and isinstance(value, dict) and value.get(field) is not None:
+					key = str(value[field])
+					if key in seen:
+						continue
+					seen.add(key)
+					value = {k: v for k, v in value.items() if k != field}
+				child_pattern = star
+				child_labels = dict(labels)
+				child_labels[labeled[star]] = key
+				child_parts = name_parts
+			else:
+				child_pattern = f"{pattern}.{key}" if pattern else key
+				child_labels = labels
+				child_parts = name_parts + [key]
+			if isinstance(value, dict):
+				walk(value, child_pattern, child_parts, child_labels)
+			elif isinstance(value, (int, float)):
+				family = metric_name(PREFIX, target, *child_parts)
+				if child_pattern in counters:
+					# counter 샘플 이름은 family + _total (필드명이 이미 _total이면 family에서 뗌)
+					if family.endswith("_total"):
+						family = family[: -len("_total")]
+					families.add(family, "counter", child_labels, value, "_total")
+				else:
+					families.add(family, "gauge", child_labels, value)
+			elif isinstance(value, str) and len(value) <= MAX_INFO_VALUE_LEN and "\n" not in value:
+				info_labels = dict(child_labels)
+				info_labels["value"] = value
+				families.add(metric_name(PREFIX, target, *child_parts), "info", info_labels, 1, "_info")
+
+	walk(data, "", [], dict(base_labels))
+
+
+def meta_labels(data: Dict[str, Any]) -> Dict[str, str]:
+	# meta 블록의 문자열 값(redis_url, jmx_url, node 등)을 대상 공통 라벨로 사용
+	meta = data.get("meta") if isinstance(data, dict) else None
+	if not isinstance(meta, dict):
+		return {}
+	return {metric_name(k): v for k, v in meta.items() if isinstance(v, str) and v}
+
+
+def render_snapshots(snapshots: List[Dict[str, Any]]) -> str:
+	families = MetricFamilies()
+	for snapshot in snapshots:
+		target = {"target": snapshot["name"]}
+		families.add(metric_name(PREFIX, "up"), "gauge", target, 0 if snapshot["error"] else 1)
+		families.add(metric_name(PREFIX, "collect_duration_seconds"), "gauge", target, round(snapshot["duration_ms"] / 1000.0, 6))
+		families.add(metric_name(PREFIX, "last_collect_timestamp_seconds"), "gauge", target, round(snapshot["collected_at"], 3))
+	for snapshot in snapshots:
+		data = snapshot["data"]
+		if snapshot["error"] or not isinstance(data, dict):
+			continue
+		labels = {"target": snapshot["name"]}
+		labels.update(meta_labels(data))
+		flatten(snapshot["name"], data, labels, families)
+	return families.render()
+
+
+class ExpositionCache:
+	# 스냅샷 seq가 바뀔 때만 다시 렌더링. 본문/gzip 본문/ETag를 미리 만들어 두고 스크레이프는 그대로 반환
+	def __init__(self, compresslevel: int = 6):
+		self.compresslevel = compresslevel
+		self._key: Tuple | None = None
+		self._body = b""
+		self._gzip_body = b""
+		self._etag = ""
+		self._lock = threading.Lock()
+
+	def get(self, snapshots: List[Dict[str, Any]]) -> Tuple[bytes, bytes, str]:
+		key = tuple((s["name"], s["seq"]) for s in snapshots)
+		with self._lock:
+			if key != self._key:
+				body = render_snapshots(snapshots).encode("utf-8")
+				self._body = body
+				self._gzip_body = gzip.compress(body, compresslevel=self.compresslevel, mtime=0)
+				self._etag = hashlib.sha1(body).hexdigest()[:20]
+				self._key = key
+			return self._body, self._gzip_body, self._etag
@@ -0,0 +1,140 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Tuple
+
+
+class _PoolEntry:
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.collector: Any = None
+		self.last_used = time.monotonic()
+		self.last_checked = 0.0
+		self.evicted = False
+
+
+class CollectorPool:
+	# 프로세스 전역 collector 레지스트리: (target, 연결 파라미터) 키로 연결이 살아있는 collector를 재사용
+	# - 임대 시 health_check_s 주기로 healthy() 확인, 실패/예외 시 닫고 다음 임대에서 재생성(재연결)
+	# - idle_ttl_s 동안 사용되지 않은 항목은 닫고 제거
+	def __init__(self, idle_ttl_s: float = 300.0, health_check_s: float = 30.0):
+		self.idle_ttl_s = max(1.0, float(idle_ttl_s))
+		self.health_check_s = max(0.0, float(health_check_s))
+		self._entries: Dict[Tuple[str, Tuple[Any, ...]], _PoolEntry] = {}
+		self._lock = threading.Lock()
+		self._reaper: threading.Thread | None = None
+
+	def _close(self, collector: Any):
+		close = getattr(collector, "close", None)
+		if close is None:
+			return
+		try:
+			close()
+		except Exception:
+			pass
+
+	def _healthy(self, collector: Any) -> bool:
+		check = getattr(collector, "healthy", None)
+		if check is None:
+			return True
+		try:
+			return bool(check())
+		except Exception:
+			return False
+
+	def _ensure_reaper(self):
+		with self._lock:
+			if self._reaper is not None:
+				return
+			self._reaper = threading.Thread(target=self._reap_loop, name="systools-pool-reaper", daemon=True)
+			self._reaper.start()
+
+	def _reap_loop(self):
+		while True:
+			time.sleep(max(1.0, self.idle_ttl_s / 4))
+			self.evict_idle()
+
+	@contextmanager
+	def lease(self, target: str, params: Tuple[Any, ...], factory: Callable[[], Any]) -> Iterator[Any]:
+		self._ensure_reaper()
+		key = (target, tuple(params))
+		while True:
+			with self._lock:
+				entry = self._entries.get(key)
+				if entry is None:
+					entry = _PoolEntry()
+					self._entries[key] = entry
+			entry.lock.acquire()
+			if not entry.evicted:
+				break
+			# 락 대기 중 eviction된 항목이면 새 항목으로 다시 시도
+			entry.lock.release()
+		try:
+			now = time.monotonic()
+			if entry.collector is not None and now - entry.last_checked >= self.health_check_s:
+				if not self._healthy(entry.collector):
+					self._close(entry.collector)
+					entry.collector = None
+				entry.last_checked = now
+			if entry.collector is None:
+				entry.collector = factory()
+				entry.last_checked = now
+			try:
+				yield entry.collector
+			except Exception:
+				# 수집 중 예외가 난 연결은 버리고 다음 임대 시 재생성
+				self._close(entry.collector)
+				entry.collector = None
+				raise
+		finally:
+			entry.last_used = time.monotonic()
+			entry.lock.release()
+
+	def collect(self, target: str, params: Tuple[Any, ...], factory: Callable[[], Any]) -> Dict[str, Any]:
+		with self.lease(target, params, factory) as collector:
+			return collector.collect_all()
+
+	def evict_idle(self) -> int:
+		now = time.monotonic()
+		evicted = 0
+		with self._lock:
+			items = list(self._entries.items())
+		for key, entry in items:
+			if now - entry.last_used < self.idle_ttl_s:
+				continue
+			# 사용 중인 항목은 건너뜀
+			if not entry.lock.acquire(blocking=False):
+				continue
+			try:
+				if time.monotonic() - entry.last_used < self.idle_ttl_s:
+					continue
+				with self._lock:
+					if self._entries.get(key) is entry:
+						del self._entries[key]
+				entry.evicted = True
+				if entry.collector is not None:
+					self._close(entry.collector)
+					entry.collector = None
+				evicted += 1
+			finally:
+				entry.lock.release()
+		return evicted
+
+	def close_all(self):
+		with self._lock:
+			items = list(self._entries.items())
+			self._entries.clear()
+		for _, entry in items:
+			with entry.lock:
+				entry.evicted = True
+				if entry.collector is not None:
+					self._close(entry.collector)
+					entry.collector = None
+
+	def stats(self) -> Dict[str, int]:
+		with self._lock:
+			entries = list(self._entries.values())
+		return {
+			"entries": len(entries),
+			"warm": sum(1 for e in entries if e.collector is not None),
+		}
@@ -0,0 +1,293 @@
+import asyncio
+import json
+import struct
+import zlib
+from typing import Any, Dict, List, Tuple
+
+from core.tsdb import FLOAT_MODE, value_scale
+
+
+# 에이전트 → 수집기 푸시 프로토콜(TCP)
+# 연결 첫 바이트는 MAGIC, 이후 프레임 = 헤더(종류, 플래그, 길이) + 본문
+# HELLO(JSON: host, target, interval_s) 다음 BATCH가 이어짐. 응답은 없음(흐름 제어는 TCP에 맡김)
+MAGIC = b"STP1"
+FRAME_HEADER = struct.Struct("!BBI")
+FRAME_HELLO = 1
+FRAME_BATCH = 2
+# 본문이 연결 단위 deflate 스트림으로 압축됨(사전이 프레임 간 유지되어 작은 프레임도 잘 줄어듦)
+FLAG_DEFLATE = 0x01
+# 수신 측 연결당 메모리를 줄이려고 창을 4KB로 제한(raw deflate)
+DEFLATE_WBITS = -12
+DEFLATE_MEM_LEVEL = 5
+MAX_FRAME_BYTES = 4 << 20
+MAX_HELLO_BYTES = 4096
+# 필드 사전 상한: 프로세스 top-N처럼 키가 계속 바뀌는 섹션 때문에 사전이 커지면 에이전트가 새 연결로 초기화
+MAX_FIELDS = 1 << 16
+# 필드 경로 구분자: 마운트 경로·인터페이스 이름에 '.'이 들어갈 수 있어 NUL 사용
+PATH_SEP = "\x00"
+
+# 값 타입
+T_NONE = 0
+T_DELETE = 1
+T_TRUE = 2
+T_FALSE = 3
+T_INT = 4
+T_INT_DELTA = 5
+T_DECIMAL = 6
+T_FLOAT = 7
+T_STR = 8
+T_JSON = 9
+
+F64 = struct.Struct("!d")
+# 인코더 내부 표시: 이전 값 없음/삭제됨
+_MISSING = object()
+
+
+def write_varint(out: bytearray, n: int):
+	while n > 0x7F:
+		out.append((n & 0x7F) | 0x80)
+		n >>= 7
+	out.append(n)
+
+
+def read_varint(buf: bytes, pos: int) -> Tuple[int, int]:
+	n = 0
+	shift = 0
+	while True:
+		b = buf[pos]
+		pos += 1
+		n |= (b & 0x7F) << shift
+		if b < 0x80:
+			return n, pos
+		shift += 7
+
+
+def zigzag(n: int) -> int:
+	return (n << 1) if n >= 0 else ((-n << 1) - 1)
+
+
+def unzigzag(n: int) -> int:
+	return (n >> 1) if not n & 1 else -((n + 1) >> 1)
+
+
+def write_bytes(out: bytearray, data: bytes):
+	write_varint(out, len(data))
+	out += data
+
+
+def flatten_fields(data: Dict[str, Any], prefix: str = "", out: Dict[str, Any] | None = None) -> Dict[str, Any]:
+	# 중첩 dict → {경로: 스칼라}. 리스트 등은 그대로 두고 JSON 타입으로 전송
+	if out is None:
+		out = {}
+	for key, value in data.items():
+		path = f"{prefix}{key}"
+		if isinstance(value, dict):
+			flatten_fields(value, path + PATH_SEP, out)
+		else:
+			out[path] = value
+	return out
+
+
+def unflatten_fields(fields: Dict[str, Any]) -> Dict[str, Any]:
+	root: Dict[str, Any] = {}
+	for path, value in fields.items():
+		parts = path.split(PATH_SEP)
+		node = root
+		for part in parts[:-1]:
+			child = node.get(part)
+			if not isinstance(child, dict):
+				child = node[part] = {}
+			node = child
+		node[parts[-1]] = value
+	return root
+
+
+class DeltaEncoder:
+	# 연결 단위 상태: 필드 경로 → id(첫 등장 시 경로 정의를 함께 보냄), 직전 전송 값
+	# 샘플마다 바뀐 필드만 (id 간격, 타입, 값)으로 기록. 정수는 직전 값과의 차이, 소수 n자리 실수는 정수 가수
+	def __init__(self):
+		self.reset()
+
+	@property
+	def size(self) -> int:
+		return len(self._ids)
+
+	def reset(self):
+		self._ids: Dict[str, int] = {}
+		self._last: Dict[int, Any] = {}
+		self._prev_ts_ms = 0
+
+	def _value(self, out: bytearray, fid: int, value: Any):
+		prev = self._last.get(fid)
+		if value is None:
+			out.append(T_NONE)
+		elif value is True:
+			out.append(T_TRUE)
+		elif value is False:
+			out.append(T_FALSE)
+		elif isinstance(value, int):
+			if type(prev) is int:
+				out.append(T_INT_DELTA)
+				write_varint(out, zigzag(value - prev))
+			else:
+				out.append(T_INT)
+				write_varint(out, zigzag(value))
+		elif isinstance(value, float):
+			scale = value_scale(value)
+			if scale == FLOAT_MODE:
+				out.append(T_FLOAT)
+				out += F64.pack(value)
+			else:
+				out.append(T_DECIMAL)
+				out.append(scale)
+				write_varint(out, zigzag(round(value * 10 ** scale)))
+		elif isinstance(value, str):
+			out.append(T_STR)
+			write_bytes(out, value.encode("utf-8"))
+		else:
+			out.append(T_JSON)
+			write_bytes(out, json.dumps(value, separators=(",", ":"), default=str).encode("utf-8"))
+
+	def encode_sample(self, out: bytearray, ts: float, fields: Dict[str, Any]):
+		ts_ms = int(ts * 1000)
+		write_varint(out, zigzag(ts_ms - self._prev_ts_ms))
+		self._prev_ts_ms = ts_ms
+		new_paths = [path for path in fields if path not in self._ids]
+		write_varint(out, len(new_paths))
+		for path in new_paths:
+			self._ids[path] = len(self._ids)
+			write_bytes(out, path.encode("utf-8"))
+		changes: List[Tuple[int, Any]] = []
+		for path, value in fields.items():
+			fid = self._ids[path]
+			prev = self._last.get(fid, _MISSING)
+			# 1 == 1.0 == True이므로 타입까지 같아야 변화 없음으로 봄
+			if prev is _MISSING or type(prev) is not type(value) or prev != value:
+				changes.append((fid, value))
+		# 사라진 필드(마운트 해제된 디스크 등)는 삭제 표시
+		present = {self._ids[path] for path in fields}
+		changes.extend((fid, _MISSING) for fid in self._last if fid not in present)
+		changes.sort(key=lambda item: item[0])
+		write_varint(out, len(changes))
+		prev_id = -1
+		for fid, value in changes:
+			write_varint(out, fid - prev_id - 1)
+			prev_id = fid
+			if value is _MISSING:
+				out.append(T_DELETE)
+				del self._last[fid]
+				continue
+			self._value(out, fid, value)
+			self._last[fid] = value
+
+	def encode_batch(self, samples: List[Tuple[float, Dict[str, Any]]]) -> bytes:
+		out = bytearray()
+		write_varint(out, len(samples))
+		for ts, fields in samples:
+			self.encode_sample(out, ts, fields)
+		return bytes(out)
+
+
+class DeltaDecoder:
+	# DeltaEncoder의 역. state는 연결의 현재 전체 필드 값(경로 → 값)
+	def __init__(self):
+		self._paths: List[str] = []
+		self._last: Dict[int, Any] = {}
+		self._prev_ts_ms = 0
+		self.state: Dict[str, Any] = {}
+
+	def decode_batch(self, buf: bytes) -> List[float]:
+		# 샘플들을 state에 적용하고 샘플 시각 목록을 반환
+		count, pos = read_varint(buf, 0)
+		times: List[float] = []
+		for _ in range(count):
+			delta, pos = read_varint(buf, pos)
+			self._prev_ts_ms += unzigzag(delta)
+			times.append(self._prev_ts_ms / 1000.0)
+			n_new, pos = read_varint(buf, pos)
+			for _ in range(n_new):
+				size, pos = read_varint(buf, pos)
+				self._paths.append(buf[pos:pos + size].decode("utf-8"))
+				pos += size
+			n_changes, pos = read_varint(buf, pos)
+			fid = -1
+			for _ in range(n_changes):
+				gap, pos = read_varint(buf, pos)
+				fid += gap + 1
+				kind = buf[pos]
+				pos += 1
+				path = self._paths[fid]
+				if kind == T_DELETE:
+					self._last.pop(fid, None)
+					self.state.pop(path, None)
+					continue
+				if kind == T_NONE:
+					value = None
+				elif kind == T_TRUE:
+					value = True
+				elif kind == T_FALSE:
+					value = False
+				elif kind == T_INT:
+					n, pos = read_varint(buf, pos)
+					value = unzigzag(n)
+				elif kind == T_INT_DELTA:
+					n, pos = read_varint(buf, pos)
+					value = self._last[fid] + unzigzag(n)
+				elif kind == T_DECIMAL:
+					scale = buf[pos]
+					n, pos = read_varint(buf, pos + 1)
+					value = unzigzag(n) / 10 ** scale
+				elif kind == T_FLOAT:
+					value = F64.unpack_from(buf, pos)[0]
+					pos += F64.size
+				elif kind in (T_STR, T_JSON):
+					size, pos = read_varint(buf, pos)
+					text = buf[pos:pos + size].decode("utf-8")
+					pos += size
+					value = text if kind == T_STR else json.loads(text)
+				else:
+					raise ValueError(f"unknown value type {kind}")
+				self._last[fid] = value
+				self.state[path] = value
+		if pos != len(buf):
+			raise ValueError("trailing bytes in batch")
+		return times
+
+
+def new_compressor():
+	return zlib.compressobj(6, zlib.DEFLATED, DEFLATE_WBITS, DEFLATE_MEM_LEVEL)
+
+
+def new_decompressor():
+	return zlib.decompressobj(DEFLATE_WBITS)
+
+
+def encode_frame(kind: int, payload: bytes, compressor=None) -> bytes:
+	flags = 0
+	if compressor is not None:
+		# SYNC_FLUSH: 프레임 경계에서 바로 풀 수 있게 하되 사전은 유지
+		payload = compressor.compress(payload) + compressor.flush(zlib.Z_SYNC_FLUSH)
+		flags |= FLAG_DEFLATE
+	return FRAME_HEADER.pack(kind, flags, len(payload)) + payload
+
+
+def hello_frame(host: str, target: str, interval_s: float) -> bytes:
+	payload = json.dumps({"host": host, "target": target, "interval_s": interval_s}).encode("utf-8")
+	return MAGIC + encode_frame(FRAME_HELLO, payload)
+
+
+async def read_frame(reader: asyncio.StreamReader, decompressor=None, limit: int = MAX_FRAME_BYTES) -> Tuple[int, bytes, int]:
+	# (종류, 압축 해제된 본문, 수신 바이트 수)
+	header = await reader.readexactly(FRAME_HEADER.size)
+	kind, flags, size = FRAME_HEADER.unpack(header)
+	if size > limit:
+		raise ValueError(f"frame too large: {size} bytes")
+	payload = await reader.readexactly(size)
+	wire = FRAME_HEADER.size + size
+	if flags & FLAG_DEFLATE:
+		if decompressor is None:
+			raise ValueError("compressed frame before hello")
+		payload = decompressor.decompress(payload, MAX_FRAME_BYTES)
+		if decompressor.unconsumed_tail:
+			raise ValueError("decompressed frame too large")
+	return kind, payload, wire
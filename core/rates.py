@@ -0,0 +1,154 @@
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterator, Tuple
+
+
+# 대상별 단조 증가(누적) 카운터 경로. '*'는 임의 키(인터페이스 등)에 대응
+COUNTERS: Dict[str, Tuple[str, ...]] = {
+	"linux": (
+		"network.rx_bytes_total",
+		"network.tx_bytes_total",
+		"network.interfaces.*.rx_bytes",
+		"network.interfaces.*.rx_packets",
+		"network.interfaces.*.tx_bytes",
+		"network.interfaces.*.tx_packets",
+		"vmstat.oom_kill_total",
+		"cgroups.groups.*.memory_max_events_total",
+		"cgroups.groups.*.oom_kill_total",
+	),
+	"redis": (
+		"performance.total_commands_processed",
+		"performance.keyspace_hits",
+		"performance.keyspace_misses",
+		"performance.expired_keys",
+		"memory.evicted_keys",
+	),
+	"jvm": (
+		"gc.young_gc_count",
+		"gc.young_gc_time_ms",
+		"gc.old_gc_count",
+		"gc.old_gc_time_ms",
+		"classloading.total_loaded_class_count",
+		"cpu.process_cpu_time_ns",
+	),
+}
+# 클러스터 모드(redis/fanout.py)는 노드별, 플릿 모드(jvm/fleet.py)는 JVM별 카운터
+# 노드/엔드포인트 단위로 계산해 노드가 빠지거나 다시 붙어도 합계가 재시작처럼 보이지 않게 함
+COUNTERS["redis_cluster"] = (
+	"nodes.*.total_commands_processed",
+	"nodes.*.keyspace_hits",
+	"nodes.*.keyspace_misses",
+	"nodes.*.expired_keys",
+	"nodes.*.evicted_keys",
+)
+COUNTERS["jvm_fleet"] = (
+	"jvms.*.young_gc_count",
+	"jvms.*.old_gc_count",
+)
+# 에이전트 수집기(web/aggregator.py): 수신 누적 카운터 + 호스트별 linux 카운터
+COUNTERS["agents"] = (
+	"agents.samples_total",
+	"agents.frames_total",
+	"agents.bytes_total",
+	"agents.errors_total",
+) + tuple(f"hosts.*.{path}" for path in COUNTERS["linux"])
+
+# 구간 비율: 이름 -> (분자 카운터, 나머지 카운터) → 분자 / (분자 + 나머지)
+RATIOS: Dict[str, Dict[str, Tuple[str, str]]] = {
+	"redis": {
+		"performance.hit_rate": ("performance.keyspace_hits", "performance.keyspace_misses"),
+	},
+}
+
+# 카운터 비트 폭(wraparound 판별용). /proc 카운터는 커널 unsigned long 폭을 따름
+DEFAULT_COUNTER_WIDTH = 1 << 64
+COUNTER_WIDTHS: Dict[str, int] = {
+	"linux": 1 << 64 if sys.maxsize > 2 ** 32 else 1 << 32,
+}
+
+
+def iter_paths(data: Any, path: str) -> Iterator[Tuple[str, Any]]:
+	# "a.*.b" 형태 경로를 실제 키로 펼쳐 (구체 경로, 값)을 돌려줌
+	def walk(node: Any, parts: list, prefix: str):
+		if not parts:
+			yield prefix, node
+			return
+		if not isinstance(node, dict):
+			return
+		head, rest = parts[0], parts[1:]
+		keys = list(node.keys()) if head == "*" else [head]
+		for key in keys:
+			if key in node:
+				yield from walk(node[key], rest, f"{prefix}.{key}" if prefix else str(key))
+	yield from walk(data, path.split("."), "")
+
+
+def counter_delta(prev: int | float, cur: int | float, width: int = DEFAULT_COUNTER_WIDTH) -> int | float:
+	# 카운터가 줄었을 때: 직전 값이 폭의 상위 1/4에 있었고 현재 값이 하위 1/4이면 wraparound, 아니면 재시작(reset)
+	if cur >= prev:
+		return cur - prev
+	quarter = width // 4
+	if prev >= width - quarter and cur < quarter:
+		return width - prev + cur
+	# reset: 재시작 이후 누적분만 이번 구간 증가량으로 간주
+	return cur
+
+
+class RateEngine:
+	# 수집 결과의 누적 카운터를 직전 수집과 비교해 초당 변화율/구간 증가량으로 변환
+	def __init__(
+		self,
+		counters: Dict[str, Tuple[str, ...]] | None = None,
+		ratios: Dict[str, Dict[str, Tuple[str, str]]] | None = None,
+		widths: Dict[str, int] | None = None,
+	):
+		self.counters = COUNTERS if counters is None else counters
+		self.ratios = RATIOS if ratios is None else ratios
+		self.widths = COUNTER_WIDTHS if widths is None else widths
+		self._prev: Dict[str, Tuple[float, Dict[str, int | float]]] = {}
+		self._lock = threading.Lock()
+
+	def reset(self, target: str | None = None):
+		with self._lock:
+			if target is None:
+				self._prev.clear()
+			else:
+				self._prev.pop(target, None)
+
+	def _sample(self, target: str, metrics: Dict[str, Any]) -> Dict[str, int | float]:
+		values: Dict[str, int | float] = {}
+		for pattern in self.counters.get(target, ()):
+			for path, value in iter_paths(metrics, pattern):
+				if isinstance(value, (int, float)) and not isinstance(value, bool):
+					values[path] = value
+		return values
+
+	def apply(self, target: str, metrics: Dict[str, Any], at: float | None = None) -> Dict[str, Any]:
+		now = time.monotonic() if at is None else at
+		current = self._sample(target, metrics)
+		with self._lock:
+			prev = self._prev.get(target)
+			self._prev[target] = (now, current)
+		rates: Dict[str, Any] = {"interval_s": None, "per_sec": {}, "delta": {}, "ratio": {}}
+		if prev is not None and now > prev[0]:
+			interval = now - prev[0]
+			width = self.widths.get(target, DEFAULT_COUNTER_WIDTH)
+			rates["interval_s"] = round(interval, 3)
+			for path, value in current.items():
+				if path not in prev[1]:
+					continue
+				delta = counter_delta(prev[1][path], value, width)
+				rates["delta"][path] = delta
+				rates["per_sec"][path] = round(delta / interval, 3)
+			for name, (hit_path, other_path) in self.ratios.get(target, {}).items():
+				hits = rates["delta"].get(hit_path)
+				others = rates["delta"].get(other_path)
+				if hits is None or others is None:
+					rates["ratio"][name] = None
+					continue
+				total = hits + others
+				rates["ratio"][name] = round(hits / total, 6) if total > 0 else None
+		result = dict(metrics)
+		result["rates"] = rates
+		return result
@@ -0,0 +1,117 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+from core.scheduler import collect_safe
+
+
+class SnapshotCache:
+	# 대상별 최신 수집 결과(스냅샷)를 보관. 읽기는 수집을 유발하지 않음
+	def __init__(self):
+		self._snapshots: Dict[str, Dict[str, Any]] = {}
+		self._cond = threading.Condition()
+
+	def put(self, name: str, result: Dict[str, Any], duration_ms: float) -> Dict[str, Any]:
+		with self._cond:
+			prev = self._snapshots.get(name)
+			snapshot = {
+				"name": name,
+				"data": result.get("data"),
+				"error": result.get("error"),
+				"collected_at": time.time(),
+				"duration_ms": round(duration_ms, 3),
+				"seq": (prev["seq"] + 1) if prev else 1,
+			}
+			self._snapshots[name] = snapshot
+			self._cond.notify_all()
+			return snapshot
+
+	def get(self, name: str) -> Dict[str, Any] | None:
+		with self._cond:
+			return self._snapshots.get(name)
+
+	def wait_for(self, name: str, after_seq: int = 0, timeout: float | None = None) -> Dict[str, Any] | None:
+		# after_seq보다 새 스냅샷이 올 때까지 대기(timeout 초과 시 None)
+		with self._cond:
+			self._cond.wait_for(
+				lambda: (self._snapshots.get(name) or {}).get("seq", 0) > after_seq,
+				timeout=timeout,
+			)
+			snapshot = self._snapshots.get(name)
+			if snapshot is None or snapshot["seq"] <= after_seq:
+				return None
+			return snapshot
+
+	def read(self, names: List[str], wait_ms: int = 0) -> List[Dict[str, Any]]:
+		# 아직 첫 스냅샷이 없는 대상은 wait_ms 동안만 기다리고, 그래도 없으면 오류로 표시
+		deadline = time.monotonic() + max(0, wait_ms) / 1000.0
+		results: List[Dict[str, Any]] = []
+		now = time.time()
+		for name in names:
+			snapshot = self.get(name)
+			if snapshot is None:
+				snapshot = self.wait_for(name, 0, timeout=max(0.0, deadline - time.monotonic()))
+			if snapshot is None:
+				results.append({"name": name, "data": None, "error": "no snapshot yet", "collected_at": None, "age_s": None})
+				continue
+			item = dict(snapshot)
+			item["age_s"] = round(max(0.0, now - snapshot["collected_at"]), 1)
+			results.append(item)
+		return results
+
+
+class Sampler:
+	# 대상 하나를 interval 주기로 수집해 SnapshotCache에 기록하는 백그라운드 루프
+	def __init__(self, name: str, fn: Callable[[], Any], interval_s: float, cache: SnapshotCache):
+		self.name = name
+		self.fn = fn
+		self.interval_s = max(0.1, float(interval_s))
+		self.cache = cache
+		self._stop = threading.Event()
+		self._thread = threading.Thread(target=self._run, name=f"systools-sampler-{name}", daemon=True)
+
+	def start(self):
+		self._thread.start()
+
+	def stop(self):
+		self._stop.set()
+
+	def is_alive(self) -> bool:
+		return self._thread.is_alive()
+
+	def _run(self):
+		next_at = time.monotonic()
+		while not self._stop.is_set():
+			started = time.monotonic()
+			result = collect_safe(self.name, self.fn)
+			self.cache.put(self.name, result, (time.monotonic() - started) * 1000.0)
+			# 고정 주기로 다음 시각 계산, 수집이 주기보다 길면 밀린 틱은 건너뜀
+			next_at += self.interval_s
+			now = time.monotonic()
+			if next_at < now:
+				next_at = now
+			self._stop.wait(next_at - now)
+
+
+class SamplerGroup:
+	# 대상별 Sampler를 한 번만 띄우고 같은 SnapshotCache를 공유
+	def __init__(self, cache: SnapshotCache | None = None):
+		self.cache = cache or SnapshotCache()
+		self._samplers: Dict[str, Sampler] = {}
+		self._lock = threading.Lock()
+
+	def ensure(self, name: str, fn: Callable[[], Any], interval_s: float) -> Sampler:
+		with self._lock:
+			sampler = self._samplers.get(name)
+			if sampler is None or not sampler.is_alive():
+				sampler = Sampler(name, fn, interval_s, self.cache)
+				self._samplers[name] = sampler
+				sampler.start()
+			return sampler
+
+	def stop_all(self):
+		with self._lock:
+			samplers = list(self._samplers.values())
+			self._samplers.clear()
+		for sampler in samplers:
+			sampler.stop()
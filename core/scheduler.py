@@ -0,0 +1,45 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List
+
+
+def collect_safe(collector_name: str, fn):
+	try:
+		return {"name": collector_name, "data": fn(), "error": None}
+	except Exception as e:
+		return {"name": collector_name, "data": None, "error": str(e)}
+
+
+class CollectionScheduler:
+	# 여러 대상의 collect_all을 병렬로 실행하고, 대상별 데드라인을 넘기면 timeout 오류로 돌려준다.
+	# 늦은 수집은 백그라운드에서 계속 진행되며, 같은 대상은 동시에 하나만 실행된다.
+	def __init__(self, max_workers: int = 8, deadline_ms: int = 5000):
+		self.deadline_ms = max(1, int(deadline_ms))
+		self._executor = ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix="systools-collect")
+		self._inflight: Dict[str, Future] = {}
+		self._lock = threading.Lock()
+
+	def _submit(self, name: str, fn: Callable[[], Any]) -> Future:
+		with self._lock:
+			fut = self._inflight.get(name)
+			# 이전 수집이 아직 끝나지 않았으면 새로 제출하지 않고 그 결과를 기다림(느린 대상이 워커를 잠식하지 않도록)
+			if fut is not None and not fut.done():
+				return fut
+			fut = self._executor.submit(collect_safe, name, fn)
+			self._inflight[name] = fut
+			return fut
+
+	def run(self, jobs: Dict[str, Callable[[], Any]], deadline_ms: int | None = None) -> List[Dict[str, Any]]:
+		deadline_s = max(1, int(deadline_ms or self.deadline_ms)) / 1000.0
+		futures = [(name, self._submit(name, fn)) for name, fn in jobs.items()]
+		wait([fut for _, fut in futures], timeout=deadline_s)
+		results: List[Dict[str, Any]] = []
+		for name, fut in futures:
+			if fut.done():
+				results.append(fut.result())
+			else:
+				results.append({"name": name, "data": None, "error": f"timeout: no result within {deadline_s:g}s"})
+		return results
+
+	def shutdown(self):
+		self._executor.shutdown(wait=False, cancel_futures=True)
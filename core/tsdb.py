@@ -0,0 +1,683 @@
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+
+# 해상도 단계: (이름, 해상도 초, 보존 초, 세그먼트 파일 하나가 담는 기간 초). 첫 단계가 원본, 나머지는 수집 시 롤업
+LEVELS: Tuple[Tuple[str, int, int, int], ...] = (
+	("raw", 1, 7 * 86400, 86400),
+	("1m", 60, 30 * 86400, 7 * 86400),
+	("5m", 300, 90 * 86400, 30 * 86400),
+	("1h", 3600, 365 * 86400, 180 * 86400),
+)
+# 청크당 최대 점 개수(1초 간격이면 약 17분)
+CHUNK_POINTS = 1024
+# 디코딩 결과 캐시 청크 수
+DECODED_CACHE = 512
+# 조회 시 step을 지정하지 않으면 점 개수가 이 값 이하가 되도록 step 결정
+MAX_POINTS = 720
+# 열린 청크/롤업 버킷을 체크포인트 파일에 다시 쓰는 주기(초). 비정상 종료 시 유실을 이 구간으로 제한
+CHECKPOINT_S = 60
+# 청크 레코드 헤더: series_id, payload 바이트 수, 시작/끝 시각(초), 점 개수, 값 컬럼 수
+RECORD = struct.Struct("<IIqqHB")
+# 체크포인트 항목: (종류, 단계 번호) 다음에 청크면 RECORD + payload, 롤업 버킷이면 (series_id, bucket, min, max, sum, count)
+CKPT_ENTRY = struct.Struct("<BB")
+CKPT_ROLLUP = struct.Struct("<Iq4d")
+CKPT_CHUNK_KIND = 0
+CKPT_ROLLUP_KIND = 1
+_U32 = struct.Struct("<I")
+_F64 = struct.Struct("<d")
+_U64 = struct.Struct("<Q")
+
+# delta-of-delta 구간: (접두 비트, 접두 길이, 값 비트 수). 어디에도 안 맞으면 '1...1'(구간 수 + 1개) + wide 비트
+DOD_BUCKETS = ((0b10, 2, 7), (0b110, 3, 9), (0b1110, 4, 12))
+INT_BUCKETS = ((0b10, 2, 4), (0b110, 3, 8), (0b1110, 4, 14), (0b11110, 5, 22))
+# 값 컬럼 모드: 0~MAX_SCALE는 n / 10^k 정수 모드(delta-of-delta), FLOAT_MODE는 XOR 모드
+FLOAT_MODE = 0xFF
+MAX_SCALE = 6
+INT_LIMIT = 1 << 53
+
+
+class BitWriter:
+	def __init__(self):
+		self.acc = 0
+		self.nbits = 0
+
+	def write(self, value: int, nbits: int):
+		self.acc = (self.acc << nbits) | (value & ((1 << nbits) - 1))
+		self.nbits += nbits
+
+	def to_bytes(self) -> bytes:
+		pad = -self.nbits % 8
+		return (self.acc << pad).to_bytes((self.nbits + pad) // 8, "big")
+
+
+def _bits(data: bytes) -> str:
+	# 디코딩은 비트열을 '0'/'1' 문자열로 펼쳐 슬라이스로 읽음(파이썬에서 비트 단위 읽기 중 가장 빠름)
+	return bin(int.from_bytes(data, "big"))[2:].zfill(len(data) * 8) if data else ""
+
+
+def _signed(value: int, nbits: int) -> int:
+	return value - (1 << nbits) if value >= 1 << (nbits - 1) else value
+
+
+def _write_dod(w: BitWriter, dod: int, buckets: tuple, wide: int):
+	if dod == 0:
+		w.write(0, 1)
+		return
+	for prefix, plen, nbits in buckets:
+		if -(1 << (nbits - 1)) <= dod < 1 << (nbits - 1):
+			w.write(prefix, plen)
+			w.write(dod, nbits)
+			return
+	w.write((1 << (len(buckets) + 1)) - 1, len(buckets) + 1)
+	w.write(dod, wide)
+
+
+def _decode_dod(bits: str, pos: int, first: int, count: int, buckets: tuple, wide: int) -> List[int]:
+	widths = [b[2] for b in buckets]
+	nb = len(buckets)
+	out = [first]
+	prev, delta = first, 0
+	for _ in range(count - 1):
+		if bits[pos] == "1":
+			# 연속된 '1' 개수가 구간 번호, 구간 수 + 1개면 wide
+			ones = 1
+			while ones <= nb and bits[pos + ones] == "1":
+				ones += 1
+			if ones <= nb:
+				n = widths[ones - 1]
+				pos += ones + 1
+			else:
+				n = wide
+				pos += ones
+			delta += _signed(int(bits[pos:pos + n], 2), n)
+			pos += n
+		else:
+			pos += 1
+		prev += delta
+		out.append(prev)
+	return out
+
+
+class TimestampColumn:
+	# Gorilla 방식 시각 압축: 간격이 일정하면 점당 1비트
+	def __init__(self, start: int):
+		self.writer = BitWriter()
+		self.prev = start
+		self.prev_delta = 0
+
+	def append(self, ts: int):
+		delta = ts - self.prev
+		_write_dod(self.writer, delta - self.prev_delta, DOD_BUCKETS, 32)
+		self.prev, self.prev_delta = ts, delta
+
+
+def decode_timestamps(data: bytes, start: int, count: int) -> List[int]:
+	return _decode_dod(_bits(data), 0, start, count, DOD_BUCKETS, 32)
+
+
+def value_scale(value: float) -> int:
+	# 값을 손실 없이 정수 n / 10^k로 쓸 수 있는 최소 k(수집 값은 대부분 정수이거나 소수 2~6자리로 반올림됨)
+	if not math.isfinite(value) or (value == 0 and math.copysign(1.0, value) < 0):
+		return FLOAT_MODE
+	for k in range(MAX_SCALE + 1):
+		n = round(value * 10 ** k)
+		if abs(n) < INT_LIMIT and n / 10 ** k == value:
+			return k
+	return FLOAT_MODE
+
+
+class ValueColumn:
+	# 정수 모드: n = 값 x 10^k의 delta-of-delta(일정 속도 카운터·변화 적은 게이지는 점당 1~6비트)
+	# XOR 모드(Gorilla): 직전 값과 XOR, 같으면 1비트, 유효 비트 구간이 이전과 맞으면 창 재사용
+	# 모드는 청크의 첫 값(과 직전 청크 모드 힌트)으로 정하고, 안 맞는 값이 오면 청크를 새로 시작
+	def __init__(self, hint: int = 0):
+		self.writer = BitWriter()
+		self.hint = hint
+		self.mode: int | None = None
+		self.prev = 0
+		self.prev_delta = 0
+		self.lead = -1
+		self.trail = 0
+
+	def fits(self, value: float) -> bool:
+		# 정수 모드는 자릿수뿐 아니라 n = 값 x 10^k가 INT_LIMIT 안에 드는지도 확인(넘으면 봉인 후 넓은 모드로)
+		if self.mode is None or self.mode == FLOAT_MODE:
+			return True
+		return value_scale(value) <= self.mode and abs(round(value * 10 ** self.mode)) < INT_LIMIT
+
+	def append(self, value: float):
+		w = self.writer
+		if self.mode is None:
+			scale = value_scale(value)
+			self.mode = max(self.hint, scale)
+			# 힌트 모드로 올리면 범위를 넘는 값은 값 자체의 모드로
+			if self.mode != FLOAT_MODE and abs(round(value * 10 ** self.mode)) >= INT_LIMIT:
+				self.mode = scale
+			if self.mode == FLOAT_MODE:
+				self.prev = _U64.unpack(_F64.pack(value))[0]
+			else:
+				self.prev = round(value * 10 ** self.mode)
+			w.write(self.prev, 64)
+			return
+		if self.mode != FLOAT_MODE:
+			n = round(value * 10 ** self.mode)
+			delta = n - self.prev
+			_write_dod(w, delta - self.prev_delta, INT_BUCKETS, 64)
+			self.prev, self.prev_delta = n, delta
+			return
+		bits = _U64.unpack(_F64.pack(value))[0]
+		x = bits ^ self.prev
+		self.prev = bits
+		if x == 0:
+			w.write(0, 1)
+			return
+		lead = min(31, 64 - x.bit_length())
+		trail = (x & -x).bit_length() - 1
+		if self.lead >= 0 and lead >= self.lead and trail >= self.trail:
+			w.write(0b10, 2)
+			w.write(x >> self.trail, 64 - self.lead - self.trail)
+		else:
+			meaningful = 64 - lead - trail
+			w.write(0b11, 2)
+			w.write(lead, 5)
+			# 유효 비트 64개는 6비트에 0으로 기록
+			w.write(meaningful, 6)
+			w.write(x >> trail, meaningful)
+			self.lead, self.trail = lead, trail
+
+	def to_bytes(self) -> bytes:
+		return bytes((FLOAT_MODE if self.mode is None else self.mode,)) + self.writer.to_bytes()
+
+
+def decode_values(data: bytes, count: int) -> List[float]:
+	if count <= 0:
+		return []
+	mode = data[0]
+	bits = _bits(data[1:])
+	if mode != FLOAT_MODE:
+		ints = _decode_dod(bits, 64, _signed(int(bits[:64], 2), 64), count, INT_BUCKETS, 64)
+		scale = 10 ** mode
+		return [n / scale for n in ints]
+	unpack, pack = _F64.unpack, _U64.pack
+	v = int(bits[:64], 2)
+	out = [unpack(pack(v))[0]]
+	pos = 64
+	lead = size = 0
+	for _ in range(count - 1):
+		if bits[pos] == "1":
+			if bits[pos + 1] == "1":
+				lead = int(bits[pos + 2:pos + 7], 2)
+				size = int(bits[pos + 7:pos + 13], 2) or 64
+				pos += 13
+			else:
+				pos += 2
+			v ^= int(bits[pos:pos + size], 2) << (64 - lead - size)
+			pos += size
+		else:
+			pos += 1
+		out.append(unpack(pack(v))[0])
+	return out
+
+
+class Chunk:
+	# 봉인 전 청크: 시각 컬럼과 값 컬럼을 각각 따로 압축(컬럼형)
+	def __init__(self, start: int, ncols: int, hints: List[int] | None = None):
+		self.start = start
+		self.end = start
+		self.count = 0
+		self.ts = TimestampColumn(start)
+		self.cols = [ValueColumn(hints[i] if hints else 0) for i in range(ncols)]
+
+	def append(self, ts: int, values: Tuple[float, ...]) -> bool:
+		# 값 모드가 맞지 않으면 아무것도 쓰지 않고 False(호출 측이 청크를 봉인하고 새로 시작)
+		if not all(col.fits(value) for col, value in zip(self.cols, values)):
+			return False
+		if self.count:
+			self.ts.append(ts)
+		for col, value in zip(self.cols, values):
+			col.append(value)
+		self.end = ts
+		self.count += 1
+		return True
+
+	def hints(self) -> List[int]:
+		return [0 if col.mode is None else col.mode for col in self.cols]
+
+	def payload(self) -> bytes:
+		# 컬럼마다 (바이트 길이 u32, 바이트열). 값 컬럼은 첫 바이트가 모드
+		parts = []
+		for data in [self.ts.writer.to_bytes()] + [col.to_bytes() for col in self.cols]:
+			parts.append(_U32.pack(len(data)))
+			parts.append(data)
+		return b"".join(parts)
+
+
+def decode_chunk(payload: bytes, start: int, count: int, ncols: int) -> Tuple[List[int], List[List[float]]]:
+	columns = []
+	pos = 0
+	for _ in range(ncols + 1):
+		n = _U32.unpack_from(payload, pos)[0]
+		columns.append(payload[pos + 4:pos + 4 + n])
+		pos += 4 + n
+	return decode_timestamps(columns[0], start, count), [decode_values(col, count) for col in columns[1:]]
+
+
+class SegmentFile:
+	# 한 단계/기간의 청크 레코드를 이어 붙이는 파일. 쓰기는 append, 읽기는 mmap
+	def __init__(self, path: Path, period: int):
+		self.path = path
+		self.period = period
+		self._fh = None
+		self._map: mmap.mmap | None = None
+		self.size = path.stat().st_size if path.exists() else 0
+
+	def scan(self) -> Iterator[Tuple[int, int, int, int, int, int, int]]:
+		# 헤더만 읽어 (series_id, start, end, count, ncols, payload offset, nbytes). 중간에 잘린 꼬리 레코드는 잘라냄
+		if self.size == 0:
+			return
+		with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+			pos = 0
+			while pos + RECORD.size <= self.size:
+				sid, nbytes, start, end, count, ncols = RECORD.unpack_from(m, pos)
+				if pos + RECORD.size + nbytes > self.size:
+					break
+				yield sid, start, end, count, ncols, pos + RECORD.size, nbytes
+				pos += RECORD.size + nbytes
+		if pos < self.size:
+			os.truncate(self.path, pos)
+			self.size = pos
+
+	def append(self, sid: int, chunk: Chunk) -> Tuple[int, int]:
+		return self.append_raw(sid, chunk.start, chunk.end, chunk.count, len(chunk.cols), chunk.payload())
+
+	def append_raw(self, sid: int, start: int, end: int, count: int, ncols: int, payload: bytes) -> Tuple[int, int]:
+		if self._fh is None:
+			self._fh = open(self.path, "ab")
+		self._fh.write(RECORD.pack(sid, len(payload), start, end, count, ncols))
+		self._fh.write(payload)
+		# mmap 읽기에 바로 보이도록 flush(청크 봉인 시에만 호출되므로 드묾)
+		self._fh.flush()
+		offset = self.size + RECORD.size
+		self.size += RECORD.size + len(payload)
+		return offset, len(payload)
+
+	def read(self, offset: int, nbytes: int) -> bytes:
+		if self._map is None or len(self._map) < offset + nbytes:
+			if self._map is not None:
+				self._map.close()
+			with open(self.path, "rb") as f:
+				self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+		return self._map[offset:offset + nbytes]
+
+	def close(self):
+		if self._fh is not None:
+			self._fh.close()
+			self._fh = None
+		if self._map is not None:
+			self._map.close()
+			self._map = None
+
+
+def flatten_numeric(data: Any, prefix: str = "") -> Iterator[Tuple[str, float]]:
+	# 중첩 dict의 숫자 잎을 "a.b.c" 경로로 펼침(bool은 0/1)
+	if isinstance(data, dict):
+		for key, value in data.items():
+			yield from flatten_numeric(value, f"{prefix}.{key}" if prefix else str(key))
+	elif isinstance(data, (int, float)) and (not isinstance(data, float) or math.isfinite(data)):
+		yield prefix, float(data)
+
+
+# 기록하지 않는 경로 접두: meta(라벨성 값), rates(누적 카운터에서 조회 시 계산 가능, 잡음이 커 압축률을 크게 낮춤),
+# processes.top_*(PID별 키라 프로세스가 바뀔 때마다 시리즈가 새로 생김)
+RECORD_SKIP = ("meta", "rates", "processes.top_")
+
+
+class TimeSeriesStore:
+	# 로컬 append-only 시계열 저장소. 시리즈 키는 "대상:경로"(예: redis:performance.latency_ms)
+	# 원본 1초 해상도와 1m/5m/1h 롤업(min/max/sum/count)을 단계별 세그먼트 파일에 청크 단위로 기록
+	# 열린 청크는 봉인(1024점 또는 세그먼트 경계) 전까지 메모리에만 있으므로 checkpoint_s마다 체크포인트 파일로 통째로 다시 씀
+	# 재시작 시 체크포인트에서 아직 봉인되지 않은 청크는 봉인해 기록하고 롤업 버킷은 이어받음
+	def __init__(
+		self,
+		path: str | Path,
+		levels: Tuple[Tuple[str, int, int, int], ...] = LEVELS,
+		chunk_points: int = CHUNK_POINTS,
+		checkpoint_s: int = CHECKPOINT_S,
+	):
+		self.path = Path(path)
+		self.levels = levels
+		self.chunk_points = max(2, min(int(chunk_points), 0xFFFF))
+		self.checkpoint_s = max(1, int(checkpoint_s))
+		self._checkpoint_at = 0
+		self._closed = False
+		self._ids: Dict[str, int] = {}
+		self._keys: List[str] = []
+		# 단계 → series_id → [(start, end, count, ncols, 파일, payload offset, nbytes)] (시간순)
+		self._index: Dict[str, Dict[int, List[tuple]]] = {level[0]: {} for level in levels}
+		self._files: Dict[Tuple[str, int], SegmentFile] = {}
+		# (단계, series_id) → 열린 청크 / 마지막 기록 시각 / 진행 중인 롤업 버킷 [bucket, min, max, sum, count]
+		self._open: Dict[Tuple[str, int], Chunk] = {}
+		self._last: Dict[Tuple[str, int], int] = {}
+		self._rollups: Dict[Tuple[str, int], list] = {}
+		# 봉인된 청크의 값 모드(다음 청크가 같은 모드로 시작해 모드 전환으로 인한 잦은 봉인 방지)
+		self._hints: Dict[Tuple[str, int], List[int]] = {}
+		# 봉인된 청크는 불변이므로 디코딩 결과를 LRU로 보관(대시보드의 반복 조회)
+		self._decoded: "OrderedDict[Tuple[str, int], Tuple[List[int], List[List[float]]]]" = OrderedDict()
+		self._expired_at = 0
+		self._lock = threading.Lock()
+		self.path.mkdir(parents=True, exist_ok=True)
+		self._load()
+
+	def _load(self):
+		index_path = self.path / "series.idx"
+		if index_path.exists():
+			for line in index_path.read_text(encoding="utf-8").splitlines():
+				sid, _, key = line.partition("\t")
+				if key and int(sid) == len(self._keys):
+					self._ids[key] = int(sid)
+					self._keys.append(key)
+		self._series_fh = open(index_path, "a", encoding="utf-8")
+		for name, _, _, _ in self.levels:
+			level_dir = self.path / name
+			level_dir.mkdir(exist_ok=True)
+			for seg_path in sorted(level_dir.glob("*.seg"), key=lambda p: int(p.stem)):
+				seg = SegmentFile(seg_path, int(seg_path.stem))
+				self._files[(name, seg.period)] = seg
+				for sid, start, end, count, ncols, offset, nbytes in seg.scan():
+					self._index[name].setdefault(sid, []).append((start, end, count, ncols, seg, offset, nbytes))
+					self._last[(name, sid)] = max(self._last.get((name, sid), end), end)
+		self._restore_checkpoint()
+
+	def _restore_checkpoint(self):
+		# 체크포인트 이후 봉인된 청크는 같은 시작점에서 더 길게 기록되어 있으므로 끝 시각이 이미 기록된 것은 건너뜀
+		ckpt = self.path / "open.ckpt"
+		if not ckpt.exists():
+			return
+		data = ckpt.read_bytes()
+		pos = 0
+		while pos + CKPT_ENTRY.size <= len(data):
+			kind, lv = CKPT_ENTRY.unpack_from(data, pos)
+			pos += CKPT_ENTRY.size
+			if lv >= len(self.levels):
+				break
+			level = self.levels[lv]
+			if kind == CKPT_CHUNK_KIND:
+				if pos + RECORD.size > len(data):
+					break
+				sid, nbytes, start, end, count, ncols = RECORD.unpack_from(data, pos)
+				pos += RECORD.size
+				if pos + nbytes > len(data):
+					break
+				payload = data[pos:pos + nbytes]
+				pos += nbytes
+				if sid >= len(self._keys) or end <= self._last.get((level[0], sid), -1):
+					continue
+				seg = self._segment(level[0], start - start % level[3])
+				offset, nbytes = seg.append_raw(sid, start, end, count, ncols, payload)
+				self._index[level[0]].setdefault(sid, []).append((start, end, count, ncols, seg, offset, nbytes))
+				self._last[(level[0], sid)] = end
+			elif kind == CKPT_ROLLUP_KIND:
+				if pos + CKPT_ROLLUP.size > len(data):
+					break
+				sid, bucket, lo, hi, total, n = CKPT_ROLLUP.unpack_from(data, pos)
+				pos += CKPT_ROLLUP.size
+				if sid < len(self._keys) and bucket > self._last.get((level[0], sid), -1):
+					self._rollups[(level[0], sid)] = [bucket, lo, hi, total, n]
+			else:
+				break
+		ckpt.unlink()
+
+	def _checkpoint(self):
+		# 열린 청크와 진행 중인 롤업 버킷 전체를 임시 파일에 쓰고 교체(부분 기록된 체크포인트가 남지 않게)
+		level_no = {level[0]: i for i, level in enumerate(self.levels)}
+		parts = []
+		for (name, sid), chunk in self._open.items():
+			payload = chunk.payload()
+			parts.append(CKPT_ENTRY.pack(CKPT_CHUNK_KIND, level_no[name]))
+			parts.append(RECORD.pack(sid, len(payload), chunk.start, chunk.end, chunk.count, len(chunk.cols)))
+			parts.append(payload)
+		for (name, sid), acc in self._rollups.items():
+			parts.append(CKPT_ENTRY.pack(CKPT_ROLLUP_KIND, level_no[name]))
+			parts.append(CKPT_ROLLUP.pack(sid, acc[0], acc[1], acc[2], acc[3], acc[4]))
+		tmp = self.path / "open.ckpt.tmp"
+		with open(tmp, "wb") as f:
+			f.write(b"".join(parts))
+		os.replace(tmp, self.path / "open.ckpt")
+
+	def _series_id(self, key: str) -> int:
+		sid = self._ids.get(key)
+		if sid is None:
+			sid = self._ids[key] = len(self._keys)
+			self._keys.append(key)
+			self._series_fh.write(f"{sid}\t{key}\n")
+			self._series_fh.flush()
+		return sid
+
+	def _segment(self, name: str, period: int) -> SegmentFile:
+		seg = self._files.get((name, period))
+		if seg is None:
+			seg = self._files[(name, period)] = SegmentFile(self.path / name / f"{period}.seg", period)
+		return seg
+
+	def _seal(self, level: Tuple[str, int, int, int], sid: int, chunk: Chunk):
+		name, _, _, seg_s = level
+		seg = self._segment(name, chunk.start - chunk.start % seg_s)
+		offset, nbytes = seg.append(sid, chunk)
+		self._index[name].setdefault(sid, []).append((chunk.start, chunk.end, chunk.count, len(chunk.cols), seg, offset, nbytes))
+
+	def _append_level(self, level: Tuple[str, int, int, int], sid: int, ts: int, values: Tuple[float, ...]):
+		name, _, _, seg_s = level
+		key = (name, sid)
+		if ts <= self._last.get(key, -1):
+			return
+		chunk = self._open.get(key)
+		# 청크가 차거나 세그먼트 기간이 바뀌면 봉인(청크가 두 파일에 걸치지 않도록 해 보존 삭제를 파일 단위로)
+		if chunk is not None and (chunk.count >= self.chunk_points or ts // seg_s != chunk.start // seg_s):
+			self._hints[key] = chunk.hints()
+			self._seal(level, sid, chunk)
+			chunk = None
+		if chunk is not None and not chunk.append(ts, values):
+			# 값 모드 변경(정수 → 소수 자릿수 증가/실수): 봉인하고 직전 모드를 힌트로 새 청크
+			hints = chunk.hints()
+			self._seal(level, sid, chunk)
+			chunk = self._open[key] = Chunk(ts, len(values), hints)
+			chunk.append(ts, values)
+		elif chunk is None:
+			chunk = self._open[key] = Chunk(ts, len(values), self._hints.pop(key, None))
+			chunk.append(ts, values)
+		self._last[key] = ts
+
+	def _rollup(self, level: Tuple[str, int, int, int], sid: int, ts: int, value: float):
+		name, res = level[0], level[1]
+		bucket = ts - ts % res
+		acc = self._rollups.get((name, sid))
+		if acc is not None and acc[0] != bucket:
+			self._append_level(level, sid, acc[0], tuple(acc[1:]))
+			acc = None
+		if acc is None:
+			self._rollups[(name, sid)] = [bucket, value, value, value, 1.0]
+		else:
+			acc[1] = min(acc[1], value)
+			acc[2] = max(acc[2], value)
+			acc[3] += value
+			acc[4] += 1.0
+
+	def _expire(self, now: int):
+		# 보존 기간이 지난 세그먼트 파일을 통째로 삭제하고 색인에서 제거
+		for name, _, retention, seg_s in self.levels:
+			dead = [seg for (lv, period), seg in self._files.items() if lv == name and period + seg_s <= now - retention]
+			if not dead:
+				continue
+			for seg in dead:
+				seg.close()
+				del self._files[(name, seg.period)]
+				try:
+					seg.path.unlink()
+				except OSError:
+					pass
+			dead_ids = {id(seg) for seg in dead}
+			dead_paths = {str(seg.path) for seg in dead}
+			for cache_key in [k for k in self._decoded if k[0] in dead_paths]:
+				del self._decoded[cache_key]
+			for sid, entries in self._index[name].items():
+				if entries and id(entries[0][4]) in dead_ids:
+					entries[:] = [e for e in entries if id(e[4]) not in dead_ids]
+
+	def append(self, key: str, ts: float, value: float):
+		t = int(ts)
+		with self._lock:
+			# 종료(close) 후 늦게 도착한 수집 결과는 버림
+			if self._closed:
+				return
+			sid = self._series_id(key)
+			# 같은 초의 두 번째 점이나 과거 시각은 버림(append-only)
+			if t <= self._last.get((self.levels[0][0], sid), -1):
+				return
+			self._append_level(self.levels[0], sid, t, (float(value),))
+			for level in self.levels[1:]:
+				self._rollup(level, sid, t, float(value))
+			if t - self._expired_at >= 60:
+				self._expired_at = t
+				self._expire(t)
+			if t - self._checkpoint_at >= self.checkpoint_s:
+				self._checkpoint_at = t
+				try:
+					self._checkpoint()
+				except OSError:
+					pass
+
+	def record(self, target: str, metrics: Dict[str, Any], ts: float | None = None) -> Dict[str, Any]:
+		# collect_all 결과의 모든 숫자 메트릭을 기록하고 그대로 돌려줌(수집 함수에 끼워 쓰기 위함)
+		now = time.time() if ts is None else ts
+		for path, value in flatten_numeric(metrics):
+			if path.startswith(RECORD_SKIP):
+				continue
+			self.append(f"{target}:{path}", now, value)
+		return metrics
+
+	def series(self, prefix: str = "") -> List[str]:
+		with self._lock:
+			return sorted(key for key in self._keys if key.startswith(prefix))
+
+	def _pick_level(self, start: int, step: int, now: int) -> Tuple[str, int, int, int]:
+		# 시작 시각을 보존 중인 단계 중 해상도가 step 이하인 가장 거친 단계(디코딩할 점 최소화)
+		covering = [level for level in self.levels if now - level[2] <= start] or [self.levels[-1]]
+		fitting = [level for level in covering if level[1] <= step]
+		return fitting[-1] if fitting else covering[0]
+
+	def query(self, key: str, start: float, end: float | None = None, step: int | None = None, max_points: int = MAX_POINTS) -> Dict[str, Any]:
+		# [start, end] 구간을 step초 버킷으로 묶은 [ts, avg, min, max] 목록
+		now = int(time.time())
+		end_i = int(end) if end is not None else now
+		start_i = int(start)
+		if not step or step <= 0:
+			step = max(1, math.ceil(max(1, end_i - start_i) / max(1, max_points)))
+		step = int(step)
+		result: Dict[str, Any] = {"key": key, "resolution_s": None, "step_s": step, "points": []}
+		sid = self._ids.get(key)
+		if sid is None or end_i < start_i:
+			return result
+		level = self._pick_level(start_i, step, now)
+		name = level[0]
+		rollup = name != self.levels[0][0]
+		result["resolution_s"] = level[1]
+
+		# 잠금 안에서는 캐시 조회와 바이트 복사만, 디코딩은 잠금 밖에서
+		decoded: List[Tuple[List[int], List[List[float]]]] = []
+		blobs = []
+		tail: List[tuple] = []
+		with self._lock:
+			for c_start, c_end, count, ncols, seg, offset, nbytes in self._index[name].get(sid, ()):
+				if c_end < start_i or c_start > end_i:
+					continue
+				cache_key = (str(seg.path), offset)
+				hit = self._decoded.get(cache_key)
+				if hit is not None:
+					self._decoded.move_to_end(cache_key)
+					decoded.append(hit)
+				else:
+					blobs.append((seg.read(offset, nbytes), c_start, count, ncols, cache_key))
+			chunk = self._open.get((name, sid))
+			if chunk is not None and chunk.end >= start_i and chunk.start <= end_i:
+				blobs.append((chunk.payload(), chunk.start, chunk.count, len(chunk.cols), None))
+			acc = self._rollups.get((name, sid))
+			if rollup and acc is not None and start_i <= acc[0] <= end_i:
+				# 진행 중인 버킷도 포함
+				tail.append(tuple(acc))
+
+		buckets: Dict[int, list] = {}
+		order: List[int] = []
+
+		def add(ts: int, lo: float, hi: float, total: float, n: float):
+			if ts < start_i or ts > end_i:
+				return
+			b = ts - ts % step
+			cur = buckets.get(b)
+			if cur is None:
+				buckets[b] = [lo, hi, total, n]
+				order.append(b)
+			else:
+				cur[0] = min(cur[0], lo)
+				cur[1] = max(cur[1], hi)
+				cur[2] += total
+				cur[3] += n
+
+		fresh = []
+		for payload, c_start, count, ncols, cache_key in blobs:
+			item = decode_chunk(payload, c_start, count, ncols)
+			decoded.append(item)
+			if cache_key is not None:
+				fresh.append((cache_key, item))
+		if fresh:
+			with self._lock:
+				for cache_key, item in fresh:
+					self._decoded[cache_key] = item
+				while len(self._decoded) > DECODED_CACHE:
+					self._decoded.popitem(last=False)
+
+		for times, cols in decoded:
+			if rollup:
+				for ts, lo, hi, total, n in zip(times, *cols):
+					add(ts, lo, hi, total, n)
+			else:
+				for ts, v in zip(times, cols[0]):
+					add(ts, v, v, v, 1.0)
+		for ts, lo, hi, total, n in tail:
+			add(ts, lo, hi, total, n)
+		result["points"] = [[b, buckets[b][2] / buckets[b][3], buckets[b][0], buckets[b][1]] for b in sorted(order)]
+		return result
+
+	def disk_bytes(self) -> int:
+		with self._lock:
+			return sum(seg.size for seg in self._files.values())
+
+	def close(self):
+		# 진행 중인 롤업 버킷과 열린 청크를 기록(재시작 후 같은 버킷의 나머지 점은 버려짐)
+		with self._lock:
+			if self._closed:
+				return
+			self._closed = True
+			for (name, sid), acc in list(self._rollups.items()):
+				level = next(lv for lv in self.levels if lv[0] == name)
+				self._append_level(level, sid, acc[0], tuple(acc[1:]))
+			self._rollups.clear()
+			for (name, sid), chunk in list(self._open.items()):
+				level = next(lv for lv in self.levels if lv[0] == name)
+				self._seal(level, sid, chunk)
+			self._open.clear()
+			for seg in self._files.values():
+				seg.close()
+			self._series_fh.close()
+			# 모두 봉인했으므로 체크포인트는 필요 없음
+			try:
+				(self.path / "open.ckpt").unlink()
+			except OSError:
+				pass
@@ -1,13 +1,283 @@
+import asyncio
+import json
+import re
 import time
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
+
+from jvm.jolokia import AsyncJolokiaConnection, JolokiaClient, JolokiaError
+
+
+# 한 번의 bulk POST로 읽는 MBean 요청 (키, 요청). ignoreErrors: 없는 속성은 요청 전체 실패 대신 해당 값만 오류 처리
+_IGNORE = {"ignoreErrors": True}
+JOLOKIA_REQUESTS: Tuple[Tuple[str, Dict[str, Any]], ...] = (
+	("memory", {"type": "read", "mbean": "java.lang:type=Memory", "attribute": ["HeapMemoryUsage", "NonHeapMemoryUsage"], "config": _IGNORE}),
+	("gc", {"type": "read", "mbean": "java.lang:type=GarbageCollector,name=*", "attribute": ["CollectionCount", "CollectionTime", "LastGcInfo"], "config": _IGNORE}),
+	# CollectionUsage: 마지막 GC 직후 풀 사용량
+	("pools", {"type": "read", "mbean": "java.lang:type=MemoryPool,name=*", "attribute": ["Usage", "CollectionUsage"], "config": _IGNORE}),
+	("threading", {"type": "read", "mbean": "java.lang:type=Threading", "attribute": ["ThreadCount", "DaemonThreadCount", "PeakThreadCount"], "config": _IGNORE}),
+	("deadlocked", {"type": "exec", "mbean": "java.lang:type=Threading", "operation": "findDeadlockedThreads"}),
+	("classloading", {"type": "read", "mbean": "java.lang:type=ClassLoading", "attribute": ["LoadedClassCount", "TotalLoadedClassCount", "UnloadedClassCount"], "config": _IGNORE}),
+	("os", {"type": "read", "mbean": "java.lang:type=OperatingSystem", "attribute": ["ProcessCpuLoad", "SystemCpuLoad", "ProcessCpuTime"], "config": _IGNORE}),
+	("runtime", {"type": "read", "mbean": "java.lang:type=Runtime", "attribute": ["Uptime", "VmName", "VmVersion"], "config": _IGNORE}),
+	("compilation", {"type": "read", "mbean": "java.lang:type=Compilation", "attribute": ["TotalCompilationTime"], "config": _IGNORE}),
+	# HotSpot 내부 MBean: 등록되지 않은 JVM에서는 404 → None
+	("safepoint", {"type": "read", "mbean": "sun.management:type=HotspotRuntime", "attribute": ["SafepointCount"], "config": _IGNORE}),
+)
+
+# Young 컬렉터 이름(G1/Parallel/Serial/CMS/ZGC 세대형). 그 외 컬렉터는 old로 집계
+YOUNG_GC_NAMES = frozenset(("G1 Young Generation", "PS Scavenge", "ParNew", "Copy", "ZGC Minor Pauses"))
+# ZGC/Shenandoah는 같은 수집을 Cycles(동시 진행 시간 포함)와 Pauses(STW) 빈 두 개로 보고 → Pauses만 집계(중복 합산 방지)
+SKIP_GC_NAMES = frozenset(("ZGC Cycles", "ZGC Minor Cycles", "ZGC Major Cycles", "Shenandoah Cycles"))
+MBEAN_NAME_RE = re.compile(r"[:,]name=([^,]+)")
+# 할당/승격 추정에 쓰는 풀 이름 조각(G1/Parallel/Serial/CMS)
+EDEN_POOL_MARKERS = ("Eden Space",)
+OLD_POOL_MARKERS = ("Old Gen", "Tenured Gen")
+
+
+def _num(value: Any) -> int | float | None:
+	# ignoreErrors 시 실패한 속성 값은 오류 문자열로 오므로 숫자만 채택, 음수(-1: 미지원)는 None
+	if isinstance(value, bool) or not isinstance(value, (int, float)):
+		return None
+	return value if value >= 0 else None
+
+
+def _get(section: Any, key: str) -> Any:
+	return section.get(key) if isinstance(section, dict) else None
+
+
+def _by_name(value: Any) -> Dict[str, Dict[str, Any]]:
+	# 패턴(name=*) 읽기 응답 {"java.lang:name=X,type=...": {...}} → {"X": {...}}
+	result: Dict[str, Dict[str, Any]] = {}
+	if not isinstance(value, dict):
+		return result
+	for mbean, attrs in value.items():
+		m = MBEAN_NAME_RE.search(mbean)
+		if m and isinstance(attrs, dict):
+			result[m.group(1)] = attrs
+	return result
+
+
+def _usage_map(value: Any) -> Dict[str, Any]:
+	# LastGcInfo의 memoryUsageBefore/AfterGc: Jolokia는 {풀: usage} 맵, 구버전은 [{"key", "value"}] 목록
+	if isinstance(value, dict):
+		return value
+	if isinstance(value, list):
+		return {item.get("key"): item.get("value") for item in value if isinstance(item, dict)}
+	return {}
+
+
+def _pool_used(usages: Dict[str, Any], markers: Tuple[str, ...]) -> int | None:
+	total = None
+	for name, usage in usages.items():
+		if isinstance(name, str) and any(m in name for m in markers):
+			used = _num(_get(usage, "used"))
+			if used is not None:
+				total = (total or 0) + used
+	return total
+
+
+def parse_jolokia(responses: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+	# bulk 응답을 24개 필드 스키마로 변환. 개별 요청 실패는 해당 필드만 None
+	values: Dict[str, Any] = {}
+	ok = set()
+	for (key, _), resp in zip(JOLOKIA_REQUESTS, responses):
+		if isinstance(resp, dict) and resp.get("status") == 200:
+			values[key] = resp.get("value")
+			ok.add(key)
+		else:
+			values[key] = None
+	if "memory" not in ok:
+		error = responses[0].get("error") if responses and isinstance(responses[0], dict) else None
+		raise JolokiaError(f"memory read failed: {error}")
+
+	heap = _get(values["memory"], "HeapMemoryUsage")
+	non_heap = _get(values["memory"], "NonHeapMemoryUsage")
+	metaspace = _get(_by_name(values["pools"]).get("Metaspace"), "Usage")
+	memory = {
+		"heap_used_bytes": _num(_get(heap, "used")),
+		"heap_committed_bytes": _num(_get(heap, "committed")),
+		"heap_max_bytes": _num(_get(heap, "max")),
+		"non_heap_used_bytes": _num(_get(non_heap, "used")),
+		"non_heap_committed_bytes": _num(_get(non_heap, "committed")),
+		"metaspace_used_bytes": _num(_get(metaspace, "used")),
+		"metaspace_committed_bytes": _num(_get(metaspace, "committed")),
+	}
+
+	pools: Dict[str, Dict[str, Any]] = {}
+	for name, attrs in _by_name(values["pools"]).items():
+		usage = attrs.get("Usage")
+		after_gc = attrs.get("CollectionUsage")
+		pools[name] = {
+			"used_bytes": _num(_get(usage, "used")),
+			"committed_bytes": _num(_get(usage, "committed")),
+			"max_bytes": _num(_get(usage, "max")),
+			# GC 대상이 아닌 풀(Metaspace 등)이나 아직 GC 전이면 None
+			"used_after_gc_bytes": _num(_get(after_gc, "used")),
+		}
+
+	gc: Dict[str, Any] = {"young_gc_count": None, "young_gc_time_ms": None, "old_gc_count": None, "old_gc_time_ms": None}
+	last_young: Dict[str, Any] | None = None
+	for name, attrs in _by_name(values["gc"]).items():
+		if name in SKIP_GC_NAMES:
+			continue
+		prefix = "young" if name in YOUNG_GC_NAMES else "old"
+		for field, attr in (("count", "CollectionCount"), ("time_ms", "CollectionTime")):
+			v = _num(attrs.get(attr))
+			if v is not None:
+				gc[f"{prefix}_gc_{field}"] = (gc[f"{prefix}_gc_{field}"] or 0) + v
+		info = attrs.get("LastGcInfo")
+		if prefix == "young" and isinstance(info, dict):
+			# 마지막 young GC 전후 Eden/Old 사용량: 할당량·승격량 추정 근거
+			before = _usage_map(info.get("memoryUsageBeforeGc"))
+			after = _usage_map(info.get("memoryUsageAfterGc"))
+			last_young = {
+				"eden_before_bytes": _pool_used(before, EDEN_POOL_MARKERS),
+				"eden_after_bytes": _pool_used(after, EDEN_POOL_MARKERS),
+				"old_before_bytes": _pool_used(before, OLD_POOL_MARKERS),
+				"old_after_bytes": _pool_used(after, OLD_POOL_MARKERS),
+			}
+
+	threading_ = values["threading"]
+	deadlocked = values["deadlocked"]
+	threads = {
+		"thread_count": _num(_get(threading_, "ThreadCount")),
+		"daemon_thread_count": _num(_get(threading_, "DaemonThreadCount")),
+		"peak_thread_count": _num(_get(threading_, "PeakThreadCount")),
+		# findDeadlockedThreads: 교착 없으면 null
+		"deadlocked_thread_count": len(deadlocked) if isinstance(deadlocked, list) else (0 if "deadlocked" in ok else None),
+	}
+	classloading = {
+		"loaded_class_count": _num(_get(values["classloading"], "LoadedClassCount")),
+		"total_loaded_class_count": _num(_get(values["classloading"], "TotalLoadedClassCount")),
+		"unloaded_class_count": _num(_get(values["classloading"], "UnloadedClassCount")),
+	}
+	cpu = {
+		"process_cpu_load": _num(_get(values["os"], "ProcessCpuLoad")),
+		"system_cpu_load": _num(_get(values["os"], "SystemCpuLoad")),
+		"process_cpu_time_ns": _num(_get(values["os"], "ProcessCpuTime")),
+	}
+	runtime = {
+		"uptime_ms": _num(_get(values["runtime"], "Uptime")),
+		"compiler_total_time_ms": _num(_get(values["compilation"], "TotalCompilationTime")),
+		"safepoint_count": _num(_get(values["safepoint"], "SafepointCount")),
+	}
+	vm = values["runtime"] if isinstance(values["runtime"], dict) else {}
+	return {
+		"memory": memory,
+		"gc": gc,
+		"threads": threads,
+		"classloading": classloading,
+		"cpu": cpu,
+		"runtime": runtime,
+		"pools": pools,
+		"vm": {"name": vm.get("VmName"), "version": vm.get("VmVersion")},
+		"last_young_gc": last_young,
+	}
+
+
+def _delta(prev: Dict[str, Any], cur: Dict[str, Any], key: str) -> int | float | None:
+	if prev.get(key) is None or cur.get(key) is None or cur[key] < prev[key]:
+		return None
+	return cur[key] - prev[key]
+
+
+def _eden_used(metrics: Dict[str, Any]) -> int | None:
+	usages = {name: {"used": pool["used_bytes"]} for name, pool in metrics["pools"].items()}
+	return _pool_used(usages, EDEN_POOL_MARKERS)
+
+
+def gc_interval(prev: Dict[str, Any] | None, cur: Dict[str, Any]) -> Dict[str, Any]:
+	# 직전 샘플 대비 구간 GC 지표. 구간 길이는 JVM 업타임 증가분(재시작으로 줄면 None)
+	result: Dict[str, Any] = {
+		"interval_s": None,
+		"gc_time_pct": None,
+		"young_gcs": None,
+		"young_gc_avg_pause_ms": None,
+		"old_gcs": None,
+		"old_gc_avg_pause_ms": None,
+		"allocation_rate_bytes_per_sec": None,
+		"promotion_rate_bytes_per_sec": None,
+	}
+	if prev is None:
+		return result
+	elapsed_ms = _delta(prev["runtime"], cur["runtime"], "uptime_ms")
+	if not elapsed_ms:
+		return result
+	interval_s = elapsed_ms / 1000.0
+	result["interval_s"] = round(interval_s, 3)
+	young_n = _delta(prev["gc"], cur["gc"], "young_gc_count")
+	young_ms = _delta(prev["gc"], cur["gc"], "young_gc_time_ms")
+	old_n = _delta(prev["gc"], cur["gc"], "old_gc_count")
+	old_ms = _delta(prev["gc"], cur["gc"], "old_gc_time_ms")
+	result["young_gcs"] = young_n
+	result["old_gcs"] = old_n
+	if young_ms is not None or old_ms is not None:
+		result["gc_time_pct"] = round(((young_ms or 0) + (old_ms or 0)) / elapsed_ms * 100.0, 3)
+	if young_n and young_ms is not None:
+		result["young_gc_avg_pause_ms"] = round(young_ms / young_n, 3)
+	if old_n and old_ms is not None:
+		result["old_gc_avg_pause_ms"] = round(old_ms / old_n, 3)
+
+	# 할당량: Eden 증가분. 구간 내 young GC가 k번이면 마지막 GC의 전후 Eden 사용량으로
+	# (첫 GC까지 증가) + (GC 사이 k-1회 채움) + (마지막 GC 이후 증가)를 추정
+	eden_prev = _eden_used(prev)
+	eden_cur = _eden_used(cur)
+	last = cur.get("last_young_gc") or {}
+	if young_n is not None and old_n is not None and eden_prev is not None and eden_cur is not None:
+		if young_n == 0 and old_n == 0:
+			result["allocation_rate_bytes_per_sec"] = round(max(0, eden_cur - eden_prev) / interval_s, 1)
+		elif young_n > 0 and last.get("eden_before_bytes") is not None and last.get("eden_after_bytes") is not None:
+			before, after = last["eden_before_bytes"], last["eden_after_bytes"]
+			allocated = max(0, before - eden_prev) + (young_n - 1) * max(0, before - after) + max(0, eden_cur - after)
+			result["allocation_rate_bytes_per_sec"] = round(allocated / interval_s, 1)
+	# 승격량: young GC 한 번당 Old 증가분(마지막 GC 기준) x 구간 GC 횟수
+	if young_n == 0:
+		result["promotion_rate_bytes_per_sec"] = 0.0
+	elif young_n and last.get("old_before_bytes") is not None and last.get("old_after_bytes") is not None:
+		promoted = max(0, last["old_after_bytes"] - last["old_before_bytes"]) * young_n
+		result["promotion_rate_bytes_per_sec"] = round(promoted / interval_s, 1)
+	return result
 
 
 class JvmMetricsCollector:
-	def __init__(self, jmx_url: str | None = None):
-		# 실제 구현은 JMX 연동(jolokia/pyjmx 등)을 통해 값 채움
+	def __init__(self, jmx_url: str | None = None, timeout_ms: int = 3000):
+		# jmx_url: Jolokia 에이전트 URL(예: http://host:8778/jolokia). 없으면 필드는 모두 None
 		self.jmx_url = jmx_url
+		self.timeout_ms = max(1, int(timeout_ms))
+		# keep-alive 연결을 수집 간 재사용
+		self._client: JolokiaClient | None = None
+		# collect_all_async용 asyncio 연결(연결이 묶인 루프가 바뀌면 새로 만듦)
+		self._aconn: AsyncJolokiaConnection | None = None
+		self._aloop: asyncio.AbstractEventLoop | None = None
+		# 구간 GC 지표(gc_interval) 계산용 직전 샘플
+		self._prev: Dict[str, Any] | None = None
 
-	def collect_all(self) -> Dict[str, Dict[str, Any]]:
+	def _get_client(self) -> JolokiaClient | None:
+		if self._client is None and self.jmx_url:
+			self._client = JolokiaClient(self.jmx_url, timeout_s=self.timeout_ms / 1000.0)
+		return self._client
+
+	def healthy(self) -> bool:
+		return True
+
+	def close(self):
+		if self._client is not None:
+			self._client.close()
+			self._client = None
+		if self._aconn is not None:
+			self._aconn.close()
+			self._aconn = None
+
+	def _async_conn(self) -> AsyncJolokiaConnection | None:
+		loop = asyncio.get_running_loop()
+		if self.jmx_url and (self._aconn is None or self._aloop is not loop):
+			if self._aconn is not None:
+				self._aconn.close()
+			self._aconn = AsyncJolokiaConnection(self.jmx_url)
+			self._aloop = loop
+		return self._aconn
+
+	def _empty(self) -> Dict[str, Dict[str, Any]]:
 		# 24개 대표 메트릭 필드(기본 None) - 구조 확정
 		memory = {
 			"heap_used_bytes": None,              # 1
@@ -52,11 +322,43 @@ class JvmMetricsCollector:
 			"classloading": classloading,
 			"cpu": cpu,
 			"runtime": runtime,
-			"meta": {
-				"timestamp": int(time.time()),
-				"jmx_url": self.jmx_url,
-				"not_implemented": True,
-			},
+			"pools": {},
+			"gc_interval": gc_interval(None, {}),
 		}
 
+	def collect_all(self) -> Dict[str, Dict[str, Any]]:
+		client = self._get_client()
+		if client is None:
+			return self._finish(None)
+		# 모든 MBean을 bulk POST 한 번(왕복 1회)으로 읽음
+		return self._finish(client.bulk([req for _, req in JOLOKIA_REQUESTS]))
+
+	async def collect_all_async(self) -> Dict[str, Dict[str, Any]]:
+		conn = self._async_conn()
+		if conn is None:
+			return self._finish(None)
+		body = json.dumps([req for _, req in JOLOKIA_REQUESTS]).encode()
+		timeout_s = self.timeout_ms / 1000.0
+		try:
+			responses = await asyncio.wait_for(conn.bulk(body, len(JOLOKIA_REQUESTS)), timeout_s)
+		except asyncio.TimeoutError:
+			raise TimeoutError(f"timeout: no response within {timeout_s:g}s") from None
+		return self._finish(responses)
 
+	def _finish(self, responses: List[Dict[str, Any]] | None) -> Dict[str, Dict[str, Any]]:
+		if responses is None:
+			metrics = self._empty()
+			vm = {"name": None, "version": None}
+		else:
+			metrics = parse_jolokia(responses)
+			vm = metrics.pop("vm")
+			metrics["gc_interval"] = gc_interval(self._prev, metrics)
+			self._prev = dict(metrics)
+			metrics.pop("last_young_gc")
+		metrics["meta"] = {
+			"timestamp": int(time.time()),
+			"jmx_url": self.jmx_url,
+			"vm_name": vm["name"],
+			"vm_version": vm["version"],
+		}
+		return metrics
@@ -0,0 +1,205 @@
+import asyncio
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from jvm.collector import JOLOKIA_REQUESTS, gc_interval, parse_jolokia
+from jvm.jolokia import AsyncJolokiaConnection
+
+
+def load_endpoints(spec: str | None) -> List[str]:
+	# 쉼표 구분 URL 목록 또는 '@파일'(한 줄에 URL 하나, '#' 주석)
+	if not spec:
+		return []
+	if spec.startswith("@"):
+		lines = Path(spec[1:]).read_text(encoding="utf-8").splitlines()
+		items = [line.split("#", 1)[0].strip() for line in lines]
+	else:
+		items = [item.strip() for item in spec.split(",")]
+	return list(dict.fromkeys(item for item in items if item))
+
+
+def display_url(url: str) -> str:
+	# 결과 키에는 인증 정보를 남기지 않음
+	parts = urlsplit(url)
+	netloc = parts.netloc.rpartition("@")[2]
+	return urlunsplit((parts.scheme, netloc, parts.path, parts.query, parts.fragment))
+
+
+def percentile(sorted_values: List[float], q: float) -> float | None:
+	# nearest-rank 백분위
+	if not sorted_values:
+		return None
+	idx = min(len(sorted_values) - 1, max(0, int(q * len(sorted_values) + 0.999999) - 1))
+	return sorted_values[idx]
+
+
+class JvmFleetCollector:
+	# 수백 개 Jolokia 엔드포인트를 asyncio로 동시 수집(동시성 상한, 엔드포인트별 타임아웃, 스윕 전체 데드라인)
+	# 이벤트 루프는 전용 스레드에서 계속 돌며 엔드포인트별 keep-alive 연결을 스윕 간 재사용
+	def __init__(
+		self,
+		endpoints: List[str],
+		concurrency: int = 64,
+		timeout_ms: int = 2000,
+		sweep_deadline_ms: int = 5000,
+	):
+		self.endpoints = list(dict.fromkeys(endpoints))
+		self.concurrency = max(1, int(concurrency))
+		self.timeout_s = max(1, int(timeout_ms)) / 1000.0
+		self.sweep_deadline_s = max(self.timeout_s, max(1, int(sweep_deadline_ms)) / 1000.0)
+		self._body = json.dumps([req for _, req in JOLOKIA_REQUESTS]).encode()
+		self._conns: Dict[str, AsyncJolokiaConnection] = {}
+		# 엔드포인트별 직전 샘플: 구간 GC 지표(gc_interval) 계산용
+		self._prev: Dict[str, Dict[str, Any]] = {}
+		# 동기 collect_all용 전용 루프 스레드는 첫 호출 때 시작(collect_all_async만 쓰면 호출한 루프에서 실행)
+		self._loop: asyncio.AbstractEventLoop | None = None
+		self._thread: threading.Thread | None = None
+		# 연결이 묶인 이벤트 루프(다른 루프에서 스윕하면 연결을 새로 만듦)
+		self._conns_loop: asyncio.AbstractEventLoop | None = None
+
+	def healthy(self) -> bool:
+		return self._thread is None or self._thread.is_alive()
+
+	def _close_conns(self):
+		for conn in self._conns.values():
+			conn.close()
+		self._conns.clear()
+
+	def close(self):
+		if self._loop is not None and self._loop.is_running():
+			async def _close():
+				self._close_conns()
+			try:
+				asyncio.run_coroutine_threadsafe(_close(), self._loop).result(timeout=self.timeout_s)
+			except Exception:
+				pass
+			self._loop.call_soon_threadsafe(self._loop.stop)
+		else:
+			self._close_conns()
+
+	async def close_async(self):
+		if self._loop is not None and self._loop.is_running():
+			await asyncio.get_running_loop().run_in_executor(None, self.close)
+		else:
+			self._close_conns()
+
+	async def _scrape(self, url: str, sem: asyncio.Semaphore) -> Dict[str, Any]:
+		async with sem:
+			conn = self._conns.get(url)
+			if conn is None:
+				conn = self._conns[url] = AsyncJolokiaConnection(url)
+			try:
+				responses = await asyncio.wait_for(conn.bulk(self._body, len(JOLOKIA_REQUESTS)), self.timeout_s)
+			except asyncio.TimeoutError:
+				raise TimeoutError(f"timeout: no response within {self.timeout_s:g}s") from None
+			return parse_jolokia(responses)
+
+	async def _sweep(self) -> Dict[str, Tuple[Dict[str, Any] | None, str | None]]:
+		loop = asyncio.get_running_loop()
+		if self._conns_loop is not loop:
+			self._close_conns()
+			self._conns_loop = loop
+		sem = asyncio.Semaphore(self.concurrency)
+		tasks = {asyncio.ensure_future(self._scrape(url, sem)): url for url in self.endpoints}
+		if not tasks:
+			return {}
+		_, pending = await asyncio.wait(tasks, timeout=self.sweep_deadline_s)
+		for task in pending:
+			task.cancel()
+		await asyncio.gather(*pending, return_exceptions=True)
+		results: Dict[str, Tuple[Dict[str, Any] | None, str | None]] = {}
+		for task, url in tasks.items():
+			if task in pending:
+				results[url] = (None, f"timeout: sweep deadline {self.sweep_deadline_s:g}s exceeded")
+			elif task.exception() is not None:
+				exc = task.exception()
+				results[url] = (None, str(exc) or type(exc).__name__)
+			else:
+				results[url] = (task.result(), None)
+		return results
+
+	def collect_all(self) -> Dict[str, Dict[str, Any]]:
+		if self._thread is None:
+			self._loop = asyncio.new_event_loop()
+			self._thread = threading.Thread(target=self._loop.run_forever, name="systools-jvm-fleet", daemon=True)
+			self._thread.start()
+		start = time.monotonic()
+		results = asyncio.run_coroutine_threadsafe(self._sweep(), self._loop).result()
+		return self._summarize(results, (time.monotonic() - start) * 1000.0)
+
+	async def collect_all_async(self) -> Dict[str, Dict[str, Any]]:
+		start = time.monotonic()
+		results = await self._sweep()
+		return self._summarize(results, (time.monotonic() - start) * 1000.0)
+
+	def _summarize(self, results: Dict[str, Tuple[Dict[str, Any] | None, str | None]], sweep_ms: float) -> Dict[str, Dict[str, Any]]:
+		jvms: Dict[str, Dict[str, Any]] = {}
+		heap_pcts: List[float] = []
+		worst_gc: Tuple[float, str] | None = None
+		failed = 0
+		deadlocked = 0
+		for url, (metrics, error) in results.items():
+			key = display_url(url)
+			if metrics is None:
+				failed += 1
+				jvms[key] = {"error": error}
+				continue
+			mem = metrics["memory"]
+			limit = mem["heap_max_bytes"] or mem["heap_committed_bytes"]
+			heap_pct = round(mem["heap_used_bytes"] / limit * 100.0, 2) if mem["heap_used_bytes"] is not None and limit else None
+			interval = gc_interval(self._prev.get(url), metrics)
+			self._prev[url] = metrics
+			# 직전 스윕 이후 GC 시간 / JVM 업타임 증가분
+			gc_ratio = round(interval["gc_time_pct"] / 100.0, 6) if interval["gc_time_pct"] is not None else None
+			if heap_pct is not None:
+				heap_pcts.append(heap_pct)
+			if gc_ratio is not None and (worst_gc is None or gc_ratio > worst_gc[0]):
+				worst_gc = (gc_ratio, key)
+			if metrics["threads"]["deadlocked_thread_count"]:
+				deadlocked += 1
+			jvms[key] = {
+				"error": None,
+				"heap_used_bytes": mem["heap_used_bytes"],
+				"heap_max_bytes": mem["heap_max_bytes"],
+				"heap_used_pct": heap_pct,
+				"gc_time_ratio": gc_ratio,
+				"allocation_rate_bytes_per_sec": interval["allocation_rate_bytes_per_sec"],
+				"young_gc_count": metrics["gc"]["young_gc_count"],
+				"old_gc_count": metrics["gc"]["old_gc_count"],
+				"thread_count": metrics["threads"]["thread_count"],
+				"deadlocked_thread_count": metrics["threads"]["deadlocked_thread_count"],
+				"process_cpu_load": metrics["cpu"]["process_cpu_load"],
+				"uptime_ms": metrics["runtime"]["uptime_ms"],
+			}
+		# 목록에서 빠진 엔드포인트의 기준값 정리
+		for url in list(self._prev):
+			if url not in results:
+				del self._prev[url]
+		heap_pcts.sort()
+		return {
+			"fleet": {
+				"endpoints": len(results),
+				"ok": len(results) - failed,
+				"failed": failed,
+				"sweep_ms": round(sweep_ms, 1),
+				"heap_used_pct_p50": percentile(heap_pcts, 0.50),
+				"heap_used_pct_p90": percentile(heap_pcts, 0.90),
+				"heap_used_pct_p99": percentile(heap_pcts, 0.99),
+				"heap_used_pct_max": heap_pcts[-1] if heap_pcts else None,
+				# 직전 스윕 이후 GC 시간 비율이 가장 높은 JVM(첫 스윕은 None)
+				"gc_time_ratio_max": worst_gc[0] if worst_gc else None,
+				"gc_time_ratio_worst": worst_gc[1] if worst_gc else None,
+				"deadlocked_jvms": deadlocked,
+			},
+			"jvms": jvms,
+			"meta": {
+				"timestamp": int(time.time()),
+				"concurrency": self.concurrency,
+				"timeout_s": self.timeout_s,
+				"sweep_deadline_s": self.sweep_deadline_s,
+			},
+		}
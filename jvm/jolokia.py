@@ -0,0 +1,184 @@
+import asyncio
+import base64
+import http.client
+import json
+import socket
+import threading
+from typing import Any, Dict, List, Tuple
+from urllib.parse import unquote, urlsplit
+
+
+class JolokiaError(Exception):
+	pass
+
+
+def jolokia_headers(url: str) -> Dict[str, str]:
+	# URL의 user:password는 Basic 인증 헤더로 변환
+	parts = urlsplit(url)
+	headers = {"Content-Type": "application/json"}
+	if parts.username:
+		token = base64.b64encode(f"{unquote(parts.username)}:{unquote(parts.password or '')}".encode()).decode()
+		headers["Authorization"] = f"Basic {token}"
+	return headers
+
+
+def parse_bulk_response(status: int, body: bytes, expected: int) -> List[Dict[str, Any]]:
+	# bulk 응답은 요청 순서대로의 JSON 배열. 개별 요청 실패는 항목의 status/error로 전달됨
+	if status != 200:
+		raise JolokiaError(f"HTTP {status}")
+	result = json.loads(body)
+	if isinstance(result, dict):
+		# 에이전트 수준 오류(잘못된 요청 등)
+		raise JolokiaError(result.get("error") or "unexpected response")
+	if not isinstance(result, list) or len(result) != expected:
+		raise JolokiaError("bulk response size mismatch")
+	return result
+
+
+class JolokiaClient:
+	# Jolokia 에이전트 bulk read: 여러 MBean 요청을 JSON 배열 POST 한 번으로 보내고 연결은 keep-alive로 재사용
+	def __init__(self, url: str, timeout_s: float = 3.0):
+		parts = urlsplit(url)
+		if parts.scheme not in ("http", "https") or not parts.hostname:
+			raise ValueError(f"unsupported jolokia url: {url}")
+		self.url = url
+		self.timeout_s = timeout_s
+		self._https = parts.scheme == "https"
+		self._host = parts.hostname
+		self._port = parts.port
+		self._path = parts.path or "/jolokia"
+		self._headers = jolokia_headers(url)
+		self._conn: http.client.HTTPConnection | None = None
+		self._lock = threading.Lock()
+
+	def _connection(self) -> http.client.HTTPConnection:
+		if self._conn is None:
+			cls = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+			self._conn = cls(self._host, self._port, timeout=self.timeout_s)
+			self._conn.connect()
+			# 헤더와 본문이 나뉘어 전송될 때 Nagle + delayed ACK로 요청마다 ~40ms 지연되는 것을 방지
+			self._conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+		return self._conn
+
+	def _drop(self):
+		if self._conn is not None:
+			try:
+				self._conn.close()
+			except Exception:
+				pass
+			self._conn = None
+
+	def bulk(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+		body = json.dumps(requests).encode()
+		with self._lock:
+			# 유휴 중 서버가 끊은 keep-alive 연결이면 새 연결로 한 번만 재시도(읽기 요청이라 재전송 안전)
+			for attempt in (0, 1):
+				conn = self._connection()
+				try:
+					conn.request("POST", self._path, body=body, headers=self._headers)
+					resp = conn.getresponse()
+					data = resp.read()
+				except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+					self._drop()
+					if attempt == 0:
+						continue
+					raise
+				except Exception:
+					self._drop()
+					raise
+				if resp.will_close:
+					self._drop()
+				return parse_bulk_response(resp.status, data, len(requests))
+		raise JolokiaError("unreachable")
+
+	def close(self):
+		with self._lock:
+			self._drop()
+
+
+class AsyncJolokiaConnection:
+	# 엔드포인트당 keep-alive 연결 하나를 유지하는 최소 HTTP/1.1 클라이언트(asyncio 스트림)
+	def __init__(self, url: str):
+		parts = urlsplit(url)
+		if parts.scheme not in ("http", "https") or not parts.hostname:
+			raise ValueError(f"unsupported jolokia url: {url}")
+		self.host = parts.hostname
+		self.port = parts.port or (443 if parts.scheme == "https" else 80)
+		self.ssl = parts.scheme == "https"
+		path = parts.path or "/jolokia"
+		headers = jolokia_headers(url)
+		headers["Host"] = f"{self.host}:{self.port}"
+		headers["Connection"] = "keep-alive"
+		self._head = f"POST {path} HTTP/1.1\r\n" + "".join(f"{k}: {v}\r\n" for k, v in headers.items())
+		self.reader: asyncio.StreamReader | None = None
+		self.writer: asyncio.StreamWriter | None = None
+
+	async def _connect(self):
+		self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl or None)
+		sock = self.writer.get_extra_info("socket")
+		if sock is not None:
+			sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+	def close(self):
+		if self.writer is not None:
+			try:
+				self.writer.close()
+			except Exception:
+				pass
+		self.reader = self.writer = None
+
+	async def _read_response(self) -> Tuple[int, Dict[str, str], bytes]:
+		line = await self.reader.readline()
+		if not line:
+			raise ConnectionResetError("connection closed by peer")
+		status = int(line.split(None, 2)[1])
+		headers: Dict[str, str] = {}
+		while True:
+			line = await self.reader.readline()
+			if line in (b"\r\n", b"\n", b""):
+				break
+			key, _, value = line.decode("latin-1").partition(":")
+			headers[key.strip().lower()] = value.strip()
+		if headers.get("transfer-encoding", "").lower() == "chunked":
+			chunks = []
+			while True:
+				size = int((await self.reader.readline()).split(b";", 1)[0], 16)
+				if size == 0:
+					# trailer 건너뜀
+					while (await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+						pass
+					break
+				chunks.append(await self.reader.readexactly(size))
+				await self.reader.readexactly(2)
+			body = b"".join(chunks)
+		elif "content-length" in headers:
+			body = await self.reader.readexactly(int(headers["content-length"]))
+		else:
+			body = await self.reader.read()
+			headers["connection"] = "close"
+		return status, headers, body
+
+	async def bulk(self, body: bytes, expected: int) -> List[Dict[str, Any]]:
+		request = (self._head + f"Content-Length: {len(body)}\r\n\r\n").encode() + body
+		for attempt in (0, 1):
+			reused = self.writer is not None
+			try:
+				if self.writer is None:
+					await self._connect()
+				self.writer.write(request)
+				await self.writer.drain()
+				status, headers, data = await self._read_response()
+			except (ConnectionError, asyncio.IncompleteReadError):
+				self.close()
+				# 유휴 중 끊긴 재사용 연결이면 새 연결로 한 번만 재시도
+				if attempt == 0 and reused:
+					continue
+				raise
+			except BaseException:
+				# 타임아웃 취소 등: 응답 경계를 알 수 없으므로 연결 폐기
+				self.close()
+				raise
+			if headers.get("connection", "").lower() == "close":
+				self.close()
+			return parse_bulk_response(status, data, expected)
+		raise ConnectionError("unreachable")
@@ -1,21 +1,143 @@
 from __future__ import annotations
+import asyncio
 import time
-from typing import Any, Dict, List
+from array import array
+from collections import deque
+from fnmatch import fnmatchcase
+from typing import Any, Dict, List, Tuple
 
 try:
-	from kafka import KafkaConsumer, TopicPartition
+	from kafka import KafkaAdminClient, KafkaConsumer, TopicPartition
 	from kafka.errors import KafkaError
 except Exception:  # pragma: no cover
+	KafkaAdminClient = None
 	KafkaConsumer = None
 	TopicPartition = None
 	KafkaError = Exception
 
 
+class KafkaTopology:
+	# 장수명 consumer의 클러스터 메타데이터에서 브로커/토픽/파티션/리더/ISR을 캐시
+	# max_age_s가 지났을 때만 전체 메타데이터를 다시 받고(MetadataRequest 1회), 내용이 바뀐 토픽의 요약만 다시 계산
+	def __init__(self, max_age_s: float = 30.0):
+		self.max_age_s = max(0.0, float(max_age_s))
+		self.brokers: Dict[int, Any] = {}
+		self.controller_id: int | None = None
+		# 토픽 → {파티션: PartitionMetadata}(직전 갱신 기준), 토픽 → 요약
+		self._partitions: Dict[str, Dict[int, Any]] = {}
+		self._summary: Dict[str, Dict[str, int]] = {}
+		# 토픽 → {파티션: 리더 브로커 id}(온라인 파티션만). 처리량 샘플링 대상
+		self.leaders: Dict[str, Dict[int, int]] = {}
+		self._refreshed_at: float | None = None
+		self.refreshes = 0
+		self.topics_changed = 0
+
+	def age_s(self) -> float | None:
+		if self._refreshed_at is None:
+			return None
+		return time.monotonic() - self._refreshed_at
+
+	def refresh(self, consumer: "KafkaConsumer", force: bool = False) -> bool:
+		age = self.age_s()
+		if not force and age is not None and age < self.max_age_s:
+			return False
+		# consumer.topics()는 항상 전체 토픽 메타데이터를 새로 받음. 응답 직후 클러스터 상태를 스냅샷
+		topics = consumer.topics() or set()
+		cluster = consumer._client.cluster
+		partitions = getattr(cluster, "_partitions", {})
+		brokers = {b.nodeId: b for b in cluster.brokers()}
+		# 오프라인 판정은 브로커 목록에도 의존하므로 브로커 구성이 바뀌면 모든 토픽을 다시 계산
+		brokers_changed = set(brokers) != set(self.brokers)
+		self.brokers = brokers
+		controller = getattr(cluster, "controller", None)
+		self.controller_id = controller.nodeId if controller is not None else None
+		changed = 0
+		for topic in topics:
+			current = partitions.get(topic)
+			if current is None:
+				continue
+			if not brokers_changed and self._partitions.get(topic) == current and topic in self._summary:
+				continue
+			self._partitions[topic] = dict(current)
+			self._summary[topic] = self._summarize(current)
+			self.leaders[topic] = {p: m.leader for p, m in current.items() if m.leader in self.brokers}
+			changed += 1
+		for topic in list(self._partitions):
+			if topic not in topics:
+				del self._partitions[topic]
+				self._summary.pop(topic, None)
+				self.leaders.pop(topic, None)
+				changed += 1
+		self.topics_changed = changed
+		self._refreshed_at = time.monotonic()
+		self.refreshes += 1
+		return True
+
+	def _summarize(self, partitions: Dict[int, Any]) -> Dict[str, int]:
+		# under-replicated: ISR < 복제본 수, offline: 리더 없음(-1) 또는 리더 브로커가 메타데이터에 없음
+		under = offline = 0
+		for meta in partitions.values():
+			if len(meta.isr) < len(meta.replicas):
+				under += 1
+			if meta.leader == -1 or meta.leader not in self.brokers:
+				offline += 1
+		return {"partitions": len(partitions), "under_replicated": under, "offline": offline}
+
+	def summary(self) -> Dict[str, Any]:
+		issues = {
+			topic: {"under_replicated": s["under_replicated"], "offline": s["offline"]}
+			for topic, s in sorted(self._summary.items())
+			if s["under_replicated"] or s["offline"]
+		}
+		age = self.age_s()
+		return {
+			"num_brokers": len(self.brokers),
+			"controller_id": self.controller_id,
+			"num_topics": len(self._summary),
+			"num_partitions": sum(s["partitions"] for s in self._summary.values()),
+			"under_replicated_partitions": sum(s["under_replicated"] for s in self._summary.values()),
+			"offline_partitions": sum(s["offline"] for s in self._summary.values()),
+			# 복제 이상이 있는 토픽만 나열
+			"topics_with_issues": issues,
+			"metadata_age_s": round(age, 1) if age is not None else None,
+		}
+
+
 class KafkaMetricsCollector:
-	def __init__(self, bootstrap_servers: str | None = None, group_id: str | None = None, timeout_ms: int = 3000):
+	def __init__(
+		self,
+		bootstrap_servers: str | None = None,
+		group_id: str | None = None,
+		timeout_ms: int = 3000,
+		group_pattern: str | None = None,
+		offset_history: int = 10,
+		metadata_max_age_s: float = 30.0,
+		throughput: bool = True,
+		throughput_top_k: int = 20,
+	):
 		self.bootstrap_servers = bootstrap_servers
 		self.group_id = group_id
 		self.timeout_ms = timeout_ms
+		# 다중 그룹 모드: 패턴(glob, '*'이면 전체)에 맞는 모든 그룹의 랙을 한 번에 계산
+		self.group_pattern = group_pattern or None
+		# 파티션별 최근 끝 오프셋 (monotonic 시각, 오프셋) 링. 랙을 시간(초)으로 환산할 때 사용
+		self.offset_history = max(2, int(offset_history))
+		self._end_history: Dict["TopicPartition", deque] = {}
+		# 그룹 → 코디네이터 브로커 id 캐시(조회 실패 시 해당 그룹만 다시 찾음)
+		self._coordinators: Dict[str, int] = {}
+		# 클러스터 토폴로지 캐시: metadata_max_age_s 주기로만 전체 메타데이터 갱신
+		self.metadata_max_age_s = max(1.0, float(metadata_max_age_s))
+		self._topology = KafkaTopology(self.metadata_max_age_s)
+		# 처리량: 매 수집마다 모든 온라인 파티션의 끝 오프셋을 샘플링해 직전 값과의 차이로 초당 메시지 수 계산
+		# 직전 값은 토픽별 array('q')(파티션 번호 인덱스, -1은 값 없음)로만 보관
+		self.throughput = bool(throughput)
+		self.throughput_top_k = max(1, int(throughput_top_k))
+		self._offsets_prev: Dict[str, array] = {}
+		self._offsets_at: float | None = None
+		# 수집마다 KafkaConsumer를 만들고 닫지 않도록 한 번 만든 consumer를 재사용
+		self._consumer: "KafkaConsumer | None" = None
+		# 그룹 커밋 오프셋 조회(OffsetFetch)용 admin client도 한 번 만들어 재사용
+		self._admin: "KafkaAdminClient | None" = None
 
 	def _build_consumer(self) -> "KafkaConsumer | None":
 		if KafkaConsumer is None or not self.bootstrap_servers:
@@ -28,90 +150,345 @@ class KafkaMetricsCollector:
 				enable_auto_commit=False,
 				consumer_timeout_ms=self.timeout_ms,
 				request_timeout_ms=max(self.timeout_ms, 5000),
-				metadata_max_age_ms=5000,
+				# 클라이언트 자체 주기 갱신도 토폴로지 캐시 정책에 맞춤
+				metadata_max_age_ms=int(self.metadata_max_age_s * 1000),
 				api_version_auto_timeout_ms=3000,
 			)
 			return consumer
 		except Exception:
 			return None
 
-	def _compute_topics_partitions(self, consumer: "KafkaConsumer") -> Dict[str, int]:
-		num_topics = 0
-		num_partitions = 0
+	def _get_consumer(self) -> "KafkaConsumer | None":
+		if self._consumer is None:
+			self._consumer = self._build_consumer()
+		return self._consumer
+
+	def _get_admin(self) -> "KafkaAdminClient | None":
+		if self._admin is None and KafkaAdminClient is not None and self.bootstrap_servers:
+			try:
+				self._admin = KafkaAdminClient(
+					bootstrap_servers=self.bootstrap_servers,
+					client_id="systools-kafka-admin",
+					request_timeout_ms=max(self.timeout_ms, 5000),
+					api_version_auto_timeout_ms=3000,
+				)
+			except Exception:
+				self._admin = None
+		return self._admin
+
+	def healthy(self) -> bool:
+		if self._consumer is None:
+			return True
+		try:
+			return bool(self._consumer._client.cluster.brokers())
+		except Exception:
+			return False
+
+	def close(self):
+		for client in (self._consumer, self._admin):
+			if client is None:
+				continue
+			try:
+				client.close()
+			except Exception:
+				pass
+		self._consumer = None
+		self._admin = None
+		self._topology = KafkaTopology(self.metadata_max_age_s)
+		self._offsets_prev = {}
+		self._offsets_at = None
+
+	def _sample_throughput(self, consumer: "KafkaConsumer") -> Tuple[Dict["TopicPartition", int], Dict[str, Any]]:
+		# 토폴로지 캐시의 온라인 파티션 전체 끝 오프셋을 한 번에 조회(consumer.end_offsets가 리더 브로커별 ListOffsets 1회로 묶음)
+		# 조회한 끝 오프셋은 그룹 랙 계산에서 재사용
+		leaders = self._topology.leaders
+		tps = [TopicPartition(topic, p) for topic, parts in leaders.items() for p in parts]
+		end_offsets = consumer.end_offsets(tps) if tps else {}
+		now = time.monotonic()
+		current: Dict[str, array] = {}
+		for tp, end in end_offsets.items():
+			arr = current.get(tp.topic)
+			if arr is None:
+				arr = current[tp.topic] = array("q", [-1]) * (max(leaders.get(tp.topic) or {tp.partition: 0}) + 1)
+			if tp.partition < len(arr):
+				arr[tp.partition] = end
+		result: Dict[str, Any] = {
+			"interval_s": None,
+			"partitions_sampled": len(end_offsets),
+			"messages_in_per_sec": None,
+			"topics": None,
+			"brokers": None,
+		}
+		interval = now - self._offsets_at if self._offsets_at is not None else 0.0
+		if interval > 0:
+			by_topic: Dict[str, int] = {}
+			by_broker: Dict[int, int] = {}
+			for topic, arr in current.items():
+				prev = self._offsets_prev.get(topic)
+				if prev is None:
+					continue
+				parts = leaders.get(topic, {})
+				total = 0
+				for p in range(min(len(arr), len(prev))):
+					cur_off, prev_off = arr[p], prev[p]
+					# 값 없음(-1) 또는 감소(토픽 재생성 등)는 이번 구간에서 제외
+					if cur_off < 0 or prev_off < 0 or cur_off < prev_off:
+						continue
+					delta = cur_off - prev_off
+					total += delta
+					leader = parts.get(p)
+					if leader is not None:
+						by_broker[leader] = by_broker.get(leader, 0) + delta
+				by_topic[topic] = total
+			top = sorted(by_topic.items(), key=lambda kv: kv[1], reverse=True)[: self.throughput_top_k]
+			result["interval_s"] = round(interval, 3)
+			result["messages_in_per_sec"] = round(sum(by_topic.values()) / interval, 3)
+			# 초당 메시지 수 상위 토픽, 리더 브로커별 합
+			result["topics"] = {topic: round(n / interval, 3) for topic, n in top}
+			result["brokers"] = {broker: round(n / interval, 3) for broker, n in sorted(by_broker.items())}
+		# 사라진 토픽은 자연히 빠지도록 이번 샘플로 교체
+		self._offsets_prev = current
+		self._offsets_at = now
+		return end_offsets, result
+
+	def _list_groups(self) -> List[str]:
+		# 모든 브로커에 ListGroups를 보내 컨슈머 그룹 목록 조회 후 패턴 필터(connect 등 다른 프로토콜 그룹 제외)
+		admin = self._get_admin()
+		if admin is None:
+			raise KafkaError("admin client unavailable")
+		groups = admin.list_consumer_groups()
+		return sorted(
+			gid for gid, protocol in groups
+			if protocol in ("consumer", "") and fnmatchcase(gid, self.group_pattern or "*")
+		)
+
+	def _find_coordinators(self, group_ids: List[str]):
+		# 캐시에 없는 그룹의 코디네이터만 FindCoordinator로 한 번에 조회
+		missing = [gid for gid in group_ids if gid not in self._coordinators]
+		if not missing:
+			return
+		admin = self._get_admin()
 		try:
-			topics = consumer.topics()
-			num_topics = len(topics or [])
-			for t in topics or []:
-				parts = consumer.partitions_for_topic(t)
-				if parts:
-					num_partitions += len(parts)
+			self._coordinators.update(admin._find_coordinator_ids(missing))
 		except Exception:
+			# 일괄 조회 실패 시 그룹별 조회(list_consumer_group_offsets)에 맡김
 			pass
-		return {"num_topics": num_topics, "num_partitions": num_partitions}
 
-	def _num_brokers(self, consumer: "KafkaConsumer") -> int | None:
+	def _group_offsets(self, group_id: str) -> Dict["TopicPartition", int]:
+		# 그룹 코디네이터에 OffsetFetch 한 번으로 그룹의 모든 커밋 오프셋 조회(커밋 없는 파티션(-1)은 제외)
+		admin = self._get_admin()
+		if admin is None:
+			raise KafkaError("admin client unavailable")
 		try:
-			cluster = consumer._client.cluster  # 내부 속성 사용(없으면 None)
-			if cluster:
-				return len(cluster.brokers())
+			offsets = admin.list_consumer_group_offsets(group_id, group_coordinator_id=self._coordinators.get(group_id))
 		except Exception:
-			return None
-		return None
+			# 코디네이터 이동 등: 다음 수집에서 다시 찾음
+			self._coordinators.pop(group_id, None)
+			raise
+		return {tp: meta.offset for tp, meta in offsets.items() if meta.offset is not None and meta.offset >= 0}
 
-	def _group_lag(self, consumer: "KafkaConsumer") -> int | None:
-		if not self.group_id:
+	def _record_end_offsets(self, end_offsets: Dict["TopicPartition", int], now: float):
+		# 이번에 조회한 파티션만 링 유지(더 이상 소비되지 않는 파티션은 제거해 메모리 상한 유지)
+		for tp in list(self._end_history):
+			if tp not in end_offsets:
+				del self._end_history[tp]
+		for tp, end in end_offsets.items():
+			history = self._end_history.get(tp)
+			if history is None:
+				history = self._end_history[tp] = deque(maxlen=self.offset_history)
+			history.append((now, end))
+
+	def _lag_seconds(self, tp: "TopicPartition", committed: int, now: float) -> float | None:
+		# 커밋 오프셋이 끝 오프셋이었던 시각(=해당 메시지가 생산된 시각)을 끝 오프셋 링에서 선형 보간해 현재와의 차이로 추정
+		# 링보다 오래된 오프셋은 링 구간 평균 생산 속도로 외삽, 링 구간에 생산이 없으면 추정 불가(None)
+		history = self._end_history.get(tp)
+		if not history:
 			return None
-		try:
-			topics = list(consumer.topics() or [])
-			tps: List["TopicPartition"] = []
-			for t in topics:
-				parts = consumer.partitions_for_topic(t) or []
-				for p in parts:
-					tps.append(TopicPartition(t, p))
-			if not tps:
-				return 0
-			end_offsets = consumer.end_offsets(tps)
+		latest_t, latest_off = history[-1]
+		if committed >= latest_off:
+			return 0.0
+		prev_t, prev_off = history[0]
+		if committed < prev_off:
+			if latest_t <= prev_t or latest_off <= prev_off:
+				return None
+			rate = (latest_off - prev_off) / (latest_t - prev_t)
+			return round(now - (prev_t - (prev_off - committed) / rate), 3)
+		for t, off in history:
+			if off > committed:
+				produced_at = prev_t + (t - prev_t) * (committed - prev_off) / (off - prev_off)
+				return round(now - produced_at, 3)
+			prev_t, prev_off = t, off
+		return 0.0
+
+	def _groups_lag(
+		self,
+		consumer: "KafkaConsumer",
+		group_ids: List[str],
+		detail: bool = False,
+		sampled: Dict["TopicPartition", int] | None = None,
+	) -> Dict[str, Dict[str, Any]]:
+		# 그룹이 실제로 커밋한 파티션만 대상으로 랙 계산
+		# - 커밋 오프셋: 그룹마다 OffsetFetch 1회(코디네이터 캐시)
+		# - 끝 오프셋: 모든 그룹 파티션의 합집합을 consumer.end_offsets 한 번으로 조회(처리량 샘플이 있으면 재사용)
+		#   (파티션을 리더 브로커별로 묶어 ListOffsets를 브로커당 1회 전송)
+		self._find_coordinators(group_ids)
+		committed_by_group: Dict[str, Dict["TopicPartition", int]] = {}
+		results: Dict[str, Dict[str, Any]] = {}
+		for gid in group_ids:
+			try:
+				committed_by_group[gid] = self._group_offsets(gid)
+			except Exception as e:
+				results[gid] = {"error": str(e)}
+		tps = set()
+		for committed in committed_by_group.values():
+			tps.update(committed)
+		# 처리량 샘플에 있는 파티션은 재사용하고 나머지만 조회
+		sampled = sampled or {}
+		end_offsets = {tp: sampled[tp] for tp in tps if tp in sampled}
+		missing = [tp for tp in tps if tp not in end_offsets]
+		if missing:
+			end_offsets.update(consumer.end_offsets(missing))
+		now = time.monotonic()
+		self._record_end_offsets(end_offsets, now)
+
+		for gid, committed in committed_by_group.items():
 			total_lag = 0
-			for tp in tps:
-				committed = consumer.committed(tp)
-				end = end_offsets.get(tp, None)
-				if committed is None or end is None:
+			max_lag = 0
+			max_seconds = 0.0
+			# 랙이 있는데 시간 환산이 불가한 파티션이 있으면 최댓값을 알 수 없으므로 None
+			unknown_topics = set()
+			topics: Dict[str, Dict[str, Any]] = {}
+			for tp, offset in committed.items():
+				end = end_offsets.get(tp)
+				if end is None:
 					continue
-				lag = max(end - committed, 0)
+				lag = max(end - offset, 0)
+				seconds = self._lag_seconds(tp, offset, now)
 				total_lag += lag
-			return total_lag
+				max_lag = max(max_lag, lag)
+				topic = topics.get(tp.topic)
+				if topic is None:
+					topic = topics[tp.topic] = {"lag": 0, "lag_seconds": None}
+					if detail:
+						topic["partitions"] = {}
+				topic["lag"] += lag
+				if seconds is None and lag > 0:
+					unknown_topics.add(tp.topic)
+				elif seconds is not None:
+					topic["lag_seconds"] = max(topic["lag_seconds"] or 0.0, seconds)
+					max_seconds = max(max_seconds, seconds)
+				if detail:
+					topic["partitions"][tp.partition] = lag
+			for name, topic in topics.items():
+				if name in unknown_topics:
+					topic["lag_seconds"] = None
+				if detail:
+					topic["partitions"] = dict(sorted(topic["partitions"].items()))
+			results[gid] = {
+				"total": total_lag,
+				"partitions": len(committed),
+				"max_partition_lag": max_lag,
+				# 가장 뒤처진 파티션 기준 시간 랙(초). 끝 오프셋 표본이 2개 이상 쌓여야 추정 가능
+				"lag_seconds": None if unknown_topics else max_seconds,
+				"topics": dict(sorted(topics.items(), key=lambda kv: kv[1]["lag"], reverse=True)),
+			}
+		return results
+
+	def _group_lag(self, consumer: "KafkaConsumer", sampled: Dict["TopicPartition", int] | None = None) -> Dict[str, Any] | None:
+		if not self.group_id:
+			return None
+		try:
+			result = self._groups_lag(consumer, [self.group_id], detail=True, sampled=sampled)[self.group_id]
+			return None if "error" in result else result
 		except Exception:
 			return None
 
+	def _multi_group_lag(self, consumer: "KafkaConsumer | None", sampled: Dict["TopicPartition", int] | None = None) -> Dict[str, Any]:
+		lag: Dict[str, Any] = {
+			"group_pattern": self.group_pattern,
+			"groups_matched": None,
+			"consumer_lag_total": None,
+			"max_lag_seconds": None,
+			"groups": None,
+		}
+		if consumer is None:
+			return lag
+		try:
+			group_ids = self._list_groups()
+			groups = self._groups_lag(consumer, group_ids, sampled=sampled)
+		except Exception:
+			return lag
+		ok = [g for g in groups.values() if "error" not in g]
+		seconds = [g["lag_seconds"] for g in ok if g["lag_seconds"] is not None]
+		lag["groups_matched"] = len(group_ids)
+		lag["consumer_lag_total"] = sum(g["total"] for g in ok)
+		lag["max_lag_seconds"] = max(seconds) if seconds else None
+		# 랙이 큰 그룹부터(조회 실패 그룹은 마지막)
+		lag["groups"] = dict(sorted(groups.items(), key=lambda kv: kv[1].get("total", -1), reverse=True))
+		return lag
+
+	async def collect_all_async(self) -> Dict[str, Dict[str, Any]]:
+		# kafka-python은 블로킹 클라이언트라 기본 executor 스레드에서 실행(대상당 동시에 하나만 호출된다는 전제)
+		return await asyncio.get_running_loop().run_in_executor(None, self.collect_all)
+
 	def collect_all(self) -> Dict[str, Dict[str, Any]]:
-		consumer = self._build_consumer()
+		consumer = self._get_consumer()
 
-		num_brokers = None
-		topics_info = {"num_topics": None, "num_partitions": None}
-		group_lag_total = None
+		topology = None
+		group_lag = None
+		throughput = None
+		sampled = None
 
 		if consumer:
-			num_brokers = self._num_brokers(consumer)
-			topics_info = self._compute_topics_partitions(consumer)
-			group_lag_total = self._group_lag(consumer)
 			try:
-				consumer.close()
+				self._topology.refresh(consumer)
+				topology = self._topology.summary()
 			except Exception:
-				pass
+				topology = None
+			if self.throughput and topology is not None:
+				try:
+					sampled, throughput = self._sample_throughput(consumer)
+				except Exception:
+					throughput = None
+
+		if self.group_pattern:
+			lag = self._multi_group_lag(consumer, sampled)
+		else:
+			if consumer:
+				group_lag = self._group_lag(consumer, sampled)
+			lag = {
+				"consumer_group_id": self.group_id,
+				"consumer_lag_total": group_lag["total"] if group_lag else None,
+				"partitions_consumed": group_lag["partitions"] if group_lag else None,
+				"max_partition_lag": group_lag["max_partition_lag"] if group_lag else None,
+				"lag_seconds": group_lag["lag_seconds"] if group_lag else None,
+				# 토픽별 랙(큰 순)과 파티션별 랙
+				"topics": group_lag["topics"] if group_lag else None,
+			}
 
 		return {
 			"broker": {
-				"num_brokers": num_brokers,
+				"num_brokers": topology["num_brokers"] if topology else None,
+				"controller_id": topology["controller_id"] if topology else None,
 			},
-			"topics": topics_info,
-			"lag": {
-				"consumer_group_id": self.group_id,
-				"consumer_lag_total": group_lag_total,
+			"topics": {
+				"num_topics": topology["num_topics"] if topology else None,
+				"num_partitions": topology["num_partitions"] if topology else None,
+				"under_replicated_partitions": topology["under_replicated_partitions"] if topology else None,
+				"offline_partitions": topology["offline_partitions"] if topology else None,
+				"topics_with_issues": topology["topics_with_issues"] if topology else None,
 			},
+			"throughput": throughput or {
+				"interval_s": None,
+				"partitions_sampled": None,
+				"messages_in_per_sec": None,
+				"topics": None,
+				"brokers": None,
+			},
+			"lag": lag,
 			"meta": {
 				"timestamp": int(time.time()),
 				"bootstrap_servers": self.bootstrap_servers,
+				"metadata_age_s": topology["metadata_age_s"] if topology else None,
 			},
 		}
-
-
@@ -0,0 +1,125 @@
+import collections
+import socket
+import sys
+import threading
+import time
+from typing import Any, Callable, Deque, Dict, Tuple
+
+from core.push import FRAME_BATCH, MAX_FIELDS, DeltaEncoder, encode_frame, flatten_fields, hello_frame, new_compressor
+
+
+def parse_address(spec: str, default_port: int = 9100) -> Tuple[str, int]:
+	# host:port (IPv6는 [::1]:9100)
+	host, sep, port = spec.rpartition(":")
+	if not sep or "]" in port:
+		return spec.strip("[]"), default_port
+	return host.strip("[]") or "127.0.0.1", int(port)
+
+
+class PushAgent:
+	# 에이전트 모드: 수집 결과를 로컬에 출력하는 대신 중앙 수집기(web/aggregator.py)로 푸시
+	# batch개 샘플마다 한 프레임으로 전송. 연결이 끊기면 원본 샘플을 max_buffer개까지 보관했다가
+	# 재연결 후 전체 상태(새 필드 사전)부터 다시 보냄
+	def __init__(
+		self,
+		address: str,
+		collect: Callable[[], Dict[str, Any]],
+		host: str | None = None,
+		target: str = "linux",
+		interval_s: float = 5.0,
+		batch: int = 1,
+		max_buffer: int = 720,
+		timeout_s: float = 5.0,
+	):
+		self.address = parse_address(address)
+		self.collect = collect
+		self.host = host or socket.gethostname()
+		self.target = target
+		self.interval_s = max(0.1, float(interval_s))
+		self.batch = max(1, int(batch))
+		self.timeout_s = float(timeout_s)
+		self._pending: Deque[Tuple[float, Dict[str, Any]]] = collections.deque(maxlen=max(self.batch, int(max_buffer)))
+		self._sock: socket.socket | None = None
+		self._encoder = DeltaEncoder()
+		self._compressor = None
+		self._retry_at = 0.0
+		self._backoff_s = 1.0
+		self._stop = threading.Event()
+		self.sent_bytes = 0
+		self.sent_samples = 0
+		self.dropped_samples = 0
+
+	def _connect(self):
+		sock = socket.create_connection(self.address, timeout=self.timeout_s)
+		sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+		sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+		# 새 연결은 빈 사전에서 시작(수신 측 상태와 맞춤)
+		self._encoder.reset()
+		self._compressor = new_compressor()
+		hello = hello_frame(self.host, self.target, self.interval_s)
+		sock.sendall(hello)
+		self.sent_bytes += len(hello)
+		self._sock = sock
+
+	def close(self):
+		if self._sock is not None:
+			try:
+				self._sock.close()
+			except Exception:
+				pass
+		self._sock = None
+
+	def flush(self) -> bool:
+		# 보관 중인 샘플을 한 프레임으로 전송. 실패하면 샘플을 유지하고 지수 백오프 후 재연결
+		if not self._pending:
+			return True
+		now = time.monotonic()
+		if self._sock is None and now < self._retry_at:
+			return False
+		try:
+			if self._sock is None:
+				self._connect()
+			samples = list(self._pending)
+			frame = encode_frame(FRAME_BATCH, self._encoder.encode_batch(samples), self._compressor)
+			self._sock.sendall(frame)
+		except OSError as e:
+			self.close()
+			self._retry_at = now + self._backoff_s
+			self._backoff_s = min(self._backoff_s * 2, 60.0)
+			print(f"[WARN] push to {self.address[0]}:{self.address[1]} failed: {e}", file=sys.stderr)
+			return False
+		self._pending.clear()
+		self._backoff_s = 1.0
+		self.sent_bytes += len(frame)
+		self.sent_samples += len(samples)
+		if self._encoder.size > MAX_FIELDS:
+			# 다음 전송은 새 연결(빈 사전)로
+			self.close()
+		return True
+
+	def push(self, metrics: Dict[str, Any], ts: float | None = None):
+		if len(self._pending) == self._pending.maxlen:
+			self.dropped_samples += 1
+		self._pending.append((time.time() if ts is None else ts, flatten_fields(metrics)))
+		if len(self._pending) >= self.batch or self._sock is None:
+			self.flush()
+
+	def stop(self):
+		self._stop.set()
+
+	def run(self):
+		# 수집 주기는 시작 시각 기준으로 고정(수집 시간만큼 밀리지 않게)
+		next_at = time.monotonic()
+		while not self._stop.is_set():
+			try:
+				self.push(self.collect())
+			except Exception as e:
+				print(f"[WARN] collect failed: {e}", file=sys.stderr)
+			next_at += self.interval_s
+			delay = next_at - time.monotonic()
+			if delay < 0:
+				next_at = time.monotonic()
+				delay = 0
+			self._stop.wait(delay)
+		self.flush()
+		self.close()
@@ -0,0 +1,287 @@
+import os
+import re
+import time
+from typing import Any, Dict, List, Tuple
+
+from linux.procfs import FdBudget, ProcFile, shared_fd_budget
+
+
+CGROUP_MOUNT = "/sys/fs/cgroup"
+# 틱마다 읽는 파일(fd를 열어두고 pread). cpu.stat은 모든 v2 cgroup에 있어 제거 감지에도 사용
+HOT_FILES = ("cpu.stat", "memory.current", "memory.stat", "memory.events", "io.stat", "pids.current")
+# 한도는 거의 바뀌지 않으므로 목록을 다시 훑을 때만 읽음
+LIMIT_FILES = ("cpu.max", "memory.max", "memory.high", "pids.max")
+# "키 값" 줄(cpu.stat, memory.stat, memory.events)
+KV_RE = re.compile(rb"^(\w+) (\d+)$", re.M)
+# io.stat: 장치별 "major:minor rbytes=.. wbytes=.. rios=.. wios=.. ..."
+IO_STAT_RE = re.compile(rb"rbytes=(\d+) wbytes=(\d+) rios=(\d+) wios=(\d+)")
+MEMORY_STAT_KEYS = ("anon", "file", "kernel", "shmem", "sock")
+# memory.stat은 60여 줄이라 필요한 키만 매칭(전체 파싱의 1/3 비용)
+MEMORY_STAT_RE = re.compile(rb"^(anon|file|kernel|shmem|sock|inactive_file|pgmajfault) (\d+)$", re.M)
+# 구간 변화율: 카운터 → (행 키, 배율, 소수 자릿수). usec 차이 / 경과 초 x 1e-4 = CPU%(코어 1개 = 100%)
+RATES = (
+	("usage_usec", "cpu_percent", 1e-4, 2),
+	("user_usec", "cpu_user_percent", 1e-4, 2),
+	("system_usec", "cpu_system_percent", 1e-4, 2),
+	("throttled_usec", "throttled_ms_per_sec", 1e-3, 2),
+	("pgmajfault", "pgmajfault_per_sec", 1.0, 2),
+	("rbytes", "io_read_bytes_per_sec", 1.0, 1),
+	("wbytes", "io_write_bytes_per_sec", 1.0, 1),
+	("rios", "io_reads_per_sec", 1.0, 2),
+	("wios", "io_writes_per_sec", 1.0, 2),
+)
+IO_KEYS = ("rbytes", "wbytes", "rios", "wios")
+
+
+def cgroup_v2_mount(mount: str = CGROUP_MOUNT) -> str | None:
+	# 통합(v2) 계층 위치: 순수 v2는 /sys/fs/cgroup, 하이브리드(v1 컨트롤러 + v2)는 /sys/fs/cgroup/unified
+	for path in (mount, os.path.join(mount, "unified")):
+		if os.path.exists(os.path.join(path, "cgroup.controllers")):
+			return path
+	return None
+
+
+def self_cgroup(proc_root: str = "/proc") -> str:
+	# /proc/self/cgroup의 v2 줄 "0::/경로"(cgroup 네임스페이스 안이면 컨테이너 자신이 "/")
+	try:
+		with open(f"{proc_root}/self/cgroup", "rb") as f:
+			for line in f:
+				if line.startswith(b"0::"):
+					return line[3:].strip().decode(errors="replace") or "/"
+	except OSError:
+		pass
+	return "/"
+
+
+def read_limit(path: str) -> Tuple[int | None, ...] | None:
+	# 한도 파일 한 줄을 정수 튜플로("max"는 None). 파일이 없으면(컨트롤러 꺼짐) None
+	try:
+		with open(path, "rb") as f:
+			parts = f.read().split()
+	except OSError:
+		return None
+	return tuple(None if p == b"max" else int(p) for p in parts)
+
+
+class CgroupNode:
+	__slots__ = ("path", "files", "keep", "limits", "prev", "prev_at")
+
+	def __init__(self, path: str, keep: bool):
+		self.path = path
+		self.files: Dict[str, ProcFile] = {}
+		self.keep = keep
+		self.limits: Dict[str, Tuple[int | None, ...] | None] = {}
+		self.prev: Dict[str, int] = {}
+		self.prev_at = 0.0
+
+	def refresh(self):
+		# 컨트롤러가 켜지고 꺼질 때 파일이 생기고 없어지므로 목록을 다시 훑을 때 맞춤
+		try:
+			present = set(os.listdir(self.path))
+		except OSError:
+			present = set()
+		for name in HOT_FILES:
+			if name in present and name not in self.files:
+				self.files[name] = ProcFile(os.path.join(self.path, name), 2048 if name == "memory.stat" else 512)
+			elif name not in present and name in self.files:
+				self.files.pop(name).close()
+		self.limits = {name: read_limit(os.path.join(self.path, name)) if name in present else None for name in LIMIT_FILES}
+
+	def close(self):
+		for f in self.files.values():
+			f.close()
+		self.files.clear()
+
+	def _read(self, name: str) -> Tuple[bytearray | None, int]:
+		f = self.files.get(name)
+		if f is None:
+			return None, 0
+		n = f.read()
+		buf = f.view()
+		if not self.keep:
+			f.close()
+		return buf, n
+
+	def _counters(self, name: str, pattern: re.Pattern = KV_RE) -> Dict[str, int]:
+		buf, n = self._read(name)
+		if buf is None:
+			return {}
+		return {k.decode(): int(v) for k, v in pattern.findall(buf, 0, n)}
+
+	def _value(self, name: str) -> int | None:
+		buf, n = self._read(name)
+		if not n:
+			return None
+		try:
+			return int(buf[:n])
+		except ValueError:
+			return None
+
+	def _limit(self, name: str, index: int = 0) -> int | None:
+		limit = self.limits.get(name)
+		if not limit or len(limit) <= index:
+			return None
+		return limit[index]
+
+	def sample(self) -> Dict[str, Any] | None:
+		# cgroup이 제거됐으면(cpu.stat 읽기 실패) None
+		at = time.monotonic()
+		counters = self._counters("cpu.stat")
+		if not counters:
+			return None
+		memory_current = self._value("memory.current")
+		memory_stat = self._counters("memory.stat", MEMORY_STAT_RE)
+		events = self._counters("memory.events")
+		buf, n = self._read("io.stat")
+		if buf is not None:
+			io = [0, 0, 0, 0]
+			for values in IO_STAT_RE.findall(buf, 0, n):
+				for i, v in enumerate(values):
+					io[i] += int(v)
+			counters.update(zip(IO_KEYS, io))
+		if "pgmajfault" in memory_stat:
+			counters["pgmajfault"] = memory_stat["pgmajfault"]
+		pids_current = self._value("pids.current")
+
+		prev = self.prev
+		elapsed_s = at - self.prev_at if prev else 0.0
+		self.prev = counters
+		self.prev_at = at
+		rates: Dict[str, float | None] = {}
+		for key, name, scale, digits in RATES:
+			value = counters.get(key)
+			old = prev.get(key)
+			rates[name] = round(max(value - old, 0) * scale / elapsed_s, digits) if value is not None and old is not None and elapsed_s > 0 else None
+		periods = counters.get("nr_periods", 0) - prev.get("nr_periods", 0) if prev else None
+
+		cpu_percent = rates["cpu_percent"]
+		quota = self._limit("cpu.max", 0)
+		period = self._limit("cpu.max", 1)
+		cpu_limit_cores = round(quota / period, 3) if quota and period else None
+		memory_max = self._limit("memory.max")
+		inactive_file = memory_stat.get("inactive_file")
+		row: Dict[str, Any] = {
+			"cpu_percent": cpu_percent,
+			"cpu_user_percent": rates["cpu_user_percent"],
+			"cpu_system_percent": rates["cpu_system_percent"],
+			"cpu_limit_cores": cpu_limit_cores,
+			"cpu_limit_used_percent": round(cpu_percent / cpu_limit_cores, 2) if cpu_percent is not None and cpu_limit_cores else None,
+			# 쿼터 주기 중 스로틀된 비율과 초당 스로틀 시간(ms). 쿼터가 없으면 주기가 늘지 않아 0
+			"throttled_periods_percent": (
+				round(100.0 * max(counters.get("nr_throttled", 0) - prev.get("nr_throttled", 0), 0) / periods, 2) if periods else 0.0
+			) if periods is not None else None,
+			"throttled_ms_per_sec": rates["throttled_ms_per_sec"],
+			"memory_current_bytes": memory_current,
+			"memory_max_bytes": memory_max,
+			"memory_high_bytes": self._limit("memory.high"),
+			"memory_used_percent": round(100.0 * memory_current / memory_max, 2) if memory_current is not None and memory_max else None,
+			# 회수 가능한 비활성 파일 캐시를 뺀 값(OOM 판단에 가까움, cAdvisor working_set과 같은 계산)
+			"memory_working_set_bytes": max(memory_current - inactive_file, 0) if memory_current is not None and inactive_file is not None else memory_current,
+		}
+		for key in MEMORY_STAT_KEYS:
+			row[f"memory_{key}_bytes"] = memory_stat.get(key)
+		row["pgmajfault_per_sec"] = rates["pgmajfault_per_sec"]
+		# memory.max 도달 횟수(회수로 버틴 경우 포함), OOM kill 횟수
+		row["memory_max_events_total"] = events.get("max")
+		row["oom_kill_total"] = events.get("oom_kill")
+		row["io_read_bytes_per_sec"] = rates["io_read_bytes_per_sec"]
+		row["io_write_bytes_per_sec"] = rates["io_write_bytes_per_sec"]
+		row["io_reads_per_sec"] = rates["io_reads_per_sec"]
+		row["io_writes_per_sec"] = rates["io_writes_per_sec"]
+		row["pids_current"] = pids_current
+		row["pids_max"] = self._limit("pids.max")
+		return row
+
+
+class CgroupTable:
+	# cgroup v2 기준 cgroup(자기 자신 또는 지정 경로)과 depth단계 아래 하위 cgroup별 CPU/메모리/IO/PID 사용량
+	# 노드 하나의 에이전트가 컨테이너별 사용량을 보고할 수 있도록:
+	# - 하위 목록은 기준 cgroup.stat(nr_descendants 등)이 바뀔 때, cgroup이 사라졌을 때, rescan_every틱마다만 다시 훑음
+	# - 틱마다 읽는 파일은 fd를 열어두고 pread(상한을 넘는 cgroup은 열고 닫으며 읽음)
+	def __init__(self, path: str = "self", depth: int = 0, mount: str | None = None, proc_root: str = "/proc", rescan_every: int = 60, fd_budget: FdBudget | None = None):
+		mount = mount or cgroup_v2_mount()
+		if mount is None:
+			raise ValueError("cgroup v2 hierarchy not found")
+		if path == "self":
+			path = self_cgroup(proc_root)
+		self.path = "/" + path.strip("/")
+		self.base = os.path.join(mount, path.strip("/")) if path.strip("/") else mount
+		if not os.path.isdir(self.base):
+			raise ValueError(f"cgroup not found: {self.path}")
+		self.depth = max(0, int(depth))
+		self.rescan_every = max(1, int(rescan_every))
+		# 열어 둘 fd는 프로세스 테이블과 함께 쓰는 예산 안에서(기본은 프로세스 전체 공유 예산)
+		self.fd_budget = fd_budget or shared_fd_budget()
+		self.stat = ProcFile(os.path.join(self.base, "cgroup.stat"), 256)
+		self.nodes: Dict[str, CgroupNode] = {}
+		self._tick = 0
+		self._last_scan = 0
+		self._marker: bytes | None = None
+		self._rescan = True
+
+	def close(self):
+		for node in self.nodes.values():
+			self._drop(node)
+		self.nodes.clear()
+		self.stat.close()
+
+	def _drop(self, node: CgroupNode):
+		node.close()
+		if node.keep:
+			self.fd_budget.release(len(HOT_FILES))
+
+	def _scan(self):
+		found: List[Tuple[str, str]] = []
+		stack = [(self.path, self.base, 0)]
+		while stack:
+			name, directory, level = stack.pop()
+			found.append((name, directory))
+			if level >= self.depth:
+				continue
+			try:
+				with os.scandir(directory) as it:
+					children = [(entry.name, entry.path) for entry in it if entry.is_dir(follow_symlinks=False)]
+			except OSError:
+				continue
+			prefix = name.rstrip("/")
+			stack.extend((f"{prefix}/{child}", child_path, level + 1) for child, child_path in children)
+		found.sort()
+		names = {name for name, _ in found}
+		for name in [name for name in self.nodes if name not in names]:
+			self._drop(self.nodes.pop(name))
+		nodes: Dict[str, CgroupNode] = {}
+		for name, directory in found:
+			node = self.nodes.get(name)
+			if node is None:
+				node = CgroupNode(directory, self.fd_budget.acquire(len(HOT_FILES)))
+			node.refresh()
+			nodes[name] = node
+		self.nodes = nodes
+
+	def sample(self) -> Dict[str, Any]:
+		t0 = time.perf_counter()
+		self._tick += 1
+		n = self.stat.read()
+		marker = bytes(self.stat.view()[:n])
+		rescanned = False
+		if self._rescan or marker != self._marker or self._tick - self._last_scan >= self.rescan_every:
+			self._scan()
+			self._marker = marker
+			self._last_scan = self._tick
+			self._rescan = False
+			rescanned = True
+		groups: Dict[str, Dict[str, Any]] = {}
+		for name, node in self.nodes.items():
+			row = node.sample()
+			if row is None:
+				# 사라진 cgroup: 다음 틱에 목록을 다시 훑음
+				self._rescan = True
+				continue
+			groups[name] = row
+		return {
+			"path": self.path,
+			"count": len(groups),
+			"rescanned": rescanned,
+			"ms": round((time.perf_counter() - t0) * 1000.0, 2),
+			"groups": groups,
+		}
@@ -1,132 +1,192 @@
+import asyncio
 import os
 import shutil
 from typing import Dict, Any, Tuple, List
 import time
 
+from linux.cgroup import CgroupTable
+from linux.procfs import ProcReader, shared_fd_budget
+from linux.procs import ProcessTable
+
+
+CPU_MODES = ("user", "nice", "system", "idle", "iowait", "irq", "softirq", "steal")
+# /proc/diskstats 단위는 커널 내부 섹터 크기와 무관하게 항상 512바이트
+SECTOR_BYTES = 512
+# /proc/vmstat 카운터 → 초당 변화율 키. pgpgin/pgpgout은 KB, pswp*는 페이지 단위
+VMSTAT_RATES = (
+	("pgpgin", "pgpgin_kb_per_sec"),
+	("pgpgout", "pgpgout_kb_per_sec"),
+	("pswpin", "pswpin_per_sec"),
+	("pswpout", "pswpout_per_sec"),
+	("pgfault", "pgfault_per_sec"),
+	("pgmajfault", "pgmajfault_per_sec"),
+	("pgscan_kswapd", "pgscan_kswapd_per_sec"),
+	("pgscan_direct", "pgscan_direct_per_sec"),
+	("pgsteal_kswapd", "pgsteal_kswapd_per_sec"),
+	("pgsteal_direct", "pgsteal_direct_per_sec"),
+	("allocstall", "allocstall_per_sec"),
+)
+# 장치별 디스크 I/O 키. 첫 수집이거나 카운터가 모자라면 값은 None(장치·키가 빠지지 않게)
+DISK_IO_KEYS = (
+	"reads_per_sec", "writes_per_sec", "read_bytes_per_sec", "write_bytes_per_sec",
+	"read_await_ms", "write_await_ms", "util_percent", "queue_depth",
+)
+
 
 class LinuxMetricsCollector:
-	def __init__(self):
+	def __init__(self, first_sample_ms: int = 100, process_top_n: int = 10, cgroup: str | None = None, cgroup_depth: int = 0, fd_budget: int | None = None):
 		if os.name != "posix":
 			# 리눅스 전용(일부 macOS에서도 동작하지만 /proc 의존 기능은 제한)
 			pass
+		# CPU 사용률은 호출 간 /proc/stat 차이로 계산(첫 호출만 first_sample_ms 샘플)
+		self.first_sample_ms = int(first_sample_ms)
+		self._prev: Dict[str, Any] = {}
+		# /proc 파일은 틱마다 한 번씩만 읽음(fd·버퍼 재사용, 마운트 목록은 변경 시에만 갱신)
+		self._proc = ProcReader()
+		# 프로세스/cgroup 테이블이 열어 두는 fd는 프로세스 전체 공유 예산 안에서(None이면 기본 상한)
+		budget = shared_fd_budget(fd_budget)
+		# 프로세스별 top-N(CPU%/RSS/IO/FD). 0이면 끔(process_count만 /proc 목록으로 계산)
+		self._procs = ProcessTable(top_n=process_top_n, fd_budget=budget) if process_top_n > 0 else None
+		# cgroup v2 모드: 지정 cgroup("self"면 자기 cgroup)과 cgroup_depth단계 하위 cgroup별 사용량/한도
+		# 호스트 전체 값(system, cpu, memory 등)은 그대로 두고 cgroups 섹션을 추가
+		self._cgroups = None
+		self._cgroup_error = None
+		if cgroup:
+			try:
+				self._cgroups = CgroupTable(cgroup, depth=cgroup_depth, fd_budget=budget)
+			except Exception as e:
+				self._cgroup_error = str(e)
 
-	def _read_proc_meminfo(self) -> Dict[str, int]:
-		result: Dict[str, int] = {}
-		try:
-			with open("/proc/meminfo", "r", encoding="utf-8") as f:
-				for line in f:
-					parts = line.split(":")
-					if len(parts) < 2:
-						continue
-					key = parts[0].strip()
-					value_part = parts[1].strip().split()[0]
-					try:
-						result[key] = int(value_part)  # kB 단위
-					except Exception:
-						continue
-		except Exception:
-			pass
-		return result
+	def _read_counters(self) -> Dict[str, Any]:
+		# 구간 계산용 누적 카운터(CPU, 디스크 I/O, PSI, vmstat)를 한 번에 읽어 같은 시각 기준으로 묶음
+		return {
+			"at": time.monotonic(),
+			"cpu": self._proc.read_stat_cpus(),
+			"disk": self._proc.read_diskstats(),
+			"pressure": self._proc.read_pressure(),
+			"vmstat": self._proc.read_vmstat(),
+		}
 
-	def _read_uptime(self) -> float:
-		try:
-			with open("/proc/uptime", "r", encoding="utf-8") as f:
-				return float(f.read().split()[0])
-		except Exception:
-			return 0.0
+	def _counter_samples(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+		# 이전 호출의 카운터와 현재 카운터, 첫 호출에서만 짧게 두 번 샘플
+		cur = self._read_counters()
+		prev = self._prev
+		if not prev and cur["cpu"]:
+			time.sleep(max(self.first_sample_ms, 1) / 1000.0)
+			prev, cur = cur, self._read_counters()
+		return prev, cur
 
-	def _read_proc_stat_cpu(self) -> Tuple[int, int]:
-		# returns (idle, total) jiffies
-		try:
-			with open("/proc/stat", "r", encoding="utf-8") as f:
-				line = f.readline()
-				if not line.startswith("cpu "):
-					return 0, 0
-				parts = line.strip().split()
-				values = list(map(int, parts[1:]))  # user nice system idle iowait irq softirq steal guest guest_nice
-				idle = values[3] + (values[4] if len(values) > 4 else 0)
-				total = sum(values)
-				return idle, total
-		except Exception:
-			return 0, 0
+	def _cpu_deltas(self, prev: Dict[str, Any], cur: Dict[str, Any]) -> Dict[str, List[int]]:
+		deltas: Dict[str, List[int]] = {}
+		old_cpus = prev.get("cpu", {})
+		for name, values in cur["cpu"].items():
+			old = old_cpus.get(name)
+			if old is None or len(old) != len(values):
+				continue
+			deltas[name] = [max(v - o, 0) for v, o in zip(values, old)]
+		return deltas
 
-	def _cpu_usage_percent(self, sample_ms: int = 200) -> float | None:
-		idle1, total1 = self._read_proc_stat_cpu()
-		if total1 == 0:
-			return None
-		time.sleep(max(sample_ms, 1) / 1000.0)
-		idle2, total2 = self._read_proc_stat_cpu()
-		delta_total = total2 - total1
-		delta_idle = idle2 - idle1
-		if delta_total <= 0:
+	def _cpu_stats(self, deltas: Dict[str, List[int]]) -> Tuple[float | None, Dict[str, Any]]:
+		section: Dict[str, Any] = {f"{mode}_percent": None for mode in CPU_MODES}
+		section["per_cpu"] = {}
+		usage = None
+		total_delta = deltas.get("cpu")
+		if total_delta and sum(total_delta) > 0:
+			total = sum(total_delta)
+			for mode, value in zip(CPU_MODES, total_delta):
+				section[f"{mode}_percent"] = round(100.0 * value / total, 2)
+			usage = self._busy_percent(total_delta)
+		for name, delta in deltas.items():
+			if name == "cpu":
+				continue
+			section["per_cpu"][name] = self._busy_percent(delta)
+		return usage, section
+
+	def _busy_percent(self, delta: List[int]) -> float | None:
+		total = sum(delta)
+		if total <= 0:
 			return None
-		usage = 100.0 * (delta_total - delta_idle) / delta_total
-		return round(usage, 2)
+		idle = delta[3] + (delta[4] if len(delta) > 4 else 0)
+		return round(100.0 * (total - idle) / total, 2)
 
-	def _read_net_dev_bytes(self) -> Tuple[int, int]:
-		rx = 0
-		tx = 0
-		try:
-			with open("/proc/net/dev", "r", encoding="utf-8") as f:
-				for line in f:
-					if ":" not in line:
-						continue
-					iface, data = line.split(":", 1)
-					fields = data.split()
-					if len(fields) >= 16:
-						rx += int(fields[0])
-						tx += int(fields[8])
-		except Exception:
-			pass
-		return rx, tx
+	def _disk_io(self, prev: Dict[str, Any], cur: Dict[str, Any], elapsed_s: float) -> Dict[str, Dict[str, Any]]:
+		# 장치별 IOPS, 처리량, 평균 대기(await), 사용률, 평균 큐 길이(iostat과 같은 계산)
+		# 카운터: 0 읽기 완료, 2 읽은 섹터, 3 읽기 ms, 4 쓰기 완료, 6 쓴 섹터, 7 쓰기 ms, 8 진행 중, 9 I/O ms, 10 가중 I/O ms
+		devices: Dict[str, Dict[str, Any]] = {}
+		old_disks = prev.get("disk", {})
+		elapsed_ms = elapsed_s * 1000.0
+		for name, values in cur["disk"].items():
+			old = old_disks.get(name)
+			row: Dict[str, Any] = {"in_flight": values[8] if len(values) > 8 else None}
+			row.update(dict.fromkeys(DISK_IO_KEYS))
+			if len(values) < 11 or old is None or len(old) < 11 or elapsed_ms <= 0:
+				devices[name] = row
+				continue
+			d = [max(v - o, 0) for v, o in zip(values[:11], old[:11])]
+			row.update({
+				"reads_per_sec": round(d[0] / elapsed_s, 2),
+				"writes_per_sec": round(d[4] / elapsed_s, 2),
+				"read_bytes_per_sec": round(d[2] * SECTOR_BYTES / elapsed_s, 1),
+				"write_bytes_per_sec": round(d[6] * SECTOR_BYTES / elapsed_s, 1),
+				"read_await_ms": round(d[3] / d[0], 2) if d[0] else 0.0,
+				"write_await_ms": round(d[7] / d[4], 2) if d[4] else 0.0,
+				"util_percent": round(min(100.0 * d[9] / elapsed_ms, 100.0), 2),
+				"queue_depth": round(d[10] / elapsed_ms, 2),
+			})
+			devices[name] = row
+		return devices
 
-	def _read_net_dev_per_iface(self) -> Dict[str, Dict[str, int]]:
-		stats: Dict[str, Dict[str, int]] = {}
-		try:
-			with open("/proc/net/dev", "r", encoding="utf-8") as f:
-				for line in f:
-					if ":" not in line:
-						continue
-					iface, data = line.split(":", 1)
-					iface = iface.strip()
-					fields = data.split()
-					if len(fields) >= 16:
-						stats[iface] = {
-							"rx_bytes": int(fields[0]),
-							"rx_packets": int(fields[1]),
-							"tx_bytes": int(fields[8]),
-							"tx_packets": int(fields[9]),
-						}
-		except Exception:
-			pass
-		return stats
+	def _pressure(self, prev: Dict[str, Any], cur: Dict[str, Any], elapsed_s: float) -> Dict[str, Dict[str, Any]]:
+		# avg10/60/300은 커널 이동 평균(%), *_percent는 직전 수집 이후 구간의 stall 시간 비율(total 누적 us 차이)
+		pressure: Dict[str, Dict[str, Any]] = {}
+		old_pressure = prev.get("pressure", {})
+		elapsed_us = elapsed_s * 1e6
+		for resource, rows in cur["pressure"].items():
+			section: Dict[str, Any] = {}
+			old_rows = old_pressure.get(resource, {})
+			for kind, (avg10, avg60, avg300, total) in rows.items():
+				old = old_rows.get(kind)
+				section[f"{kind}_percent"] = (
+					round(min(100.0 * max(total - old[3], 0) / elapsed_us, 100.0), 2)
+					if old is not None and elapsed_us > 0
+					else None
+				)
+				section[f"{kind}_avg10"] = avg10
+				section[f"{kind}_avg60"] = avg60
+				section[f"{kind}_avg300"] = avg300
+			pressure[resource] = section
+		return pressure
 
-	def _list_mountpoints(self) -> List[Tuple[str, str]]:
-		mounts: List[Tuple[str, str]] = []
-		try:
-			with open("/proc/mounts", "r", encoding="utf-8") as f:
-				for line in f:
-					parts = line.split()
-					if len(parts) < 3:
-						continue
-					device, mnt, fstype = parts[0], parts[1], parts[2]
-					# 물리 볼륨 위주 필터
-					if fstype in ("ext2", "ext3", "ext4", "xfs", "btrfs", "zfs"):
-						mounts.append((mnt, fstype))
-		except Exception:
-			pass
-		# 루트는 항상 포함
-		if ("/", "unknown") not in mounts and not any(m == "/" for m, _ in mounts):
-			mounts.append(("/", "unknown"))
-		# 중복 제거
-		seen = set()
-		unique: List[Tuple[str, str]] = []
-		for m, t in mounts:
-			if m in seen:
-				continue
-			seen.add(m)
-			unique.append((m, t))
-		return unique
+	def _vmstat(self, prev: Dict[str, Any], cur: Dict[str, Any], elapsed_s: float) -> Dict[str, Any]:
+		counters = cur["vmstat"]
+		old_counters = prev.get("vmstat", {})
+		section: Dict[str, Any] = {}
+		for key, name in VMSTAT_RATES:
+			value = counters.get(key)
+			old = old_counters.get(key)
+			# 커널에 없는 카운터도 키는 남기고 None으로 표시
+			section[name] = (
+				round(max(value - old, 0) / elapsed_s, 2)
+				if value is not None and old is not None and elapsed_s > 0
+				else None
+			)
+		section["oom_kill_total"] = counters.get("oom_kill")
+		return section
+
+	def close(self):
+		self._proc.close()
+		if self._procs is not None:
+			self._procs.close()
+		if self._cgroups is not None:
+			self._cgroups.close()
+
+	async def collect_all_async(self) -> Dict[str, Dict[str, Any]]:
+		# /proc·/sys 읽기는 executor 스레드에서. 첫 호출의 기준 샘플 대기는 스레드를 붙잡지 않도록 루프에서 sleep
+		loop = asyncio.get_running_loop()
+		if not self._prev:
+			self._prev = await loop.run_in_executor(None, self._read_counters)
+			await asyncio.sleep(max(self.first_sample_ms, 1) / 1000.0)
+		return await loop.run_in_executor(None, self.collect_all)
 
 	def collect_all(self) -> Dict[str, Dict[str, Any]]:
 		# 로드 평균
@@ -136,7 +196,7 @@ class LinuxMetricsCollector:
 			load1 = load5 = load15 = None
 
 		# 메모리
-		meminfo = self._read_proc_meminfo()
+		meminfo = self._proc.read_meminfo()
 		mem_total_kb = meminfo.get("MemTotal")
 		mem_available_kb = meminfo.get("MemAvailable")
 		swap_total_kb = meminfo.get("SwapTotal")
@@ -158,7 +218,7 @@ class LinuxMetricsCollector:
 		# 디스크(root)
 		per_mount: Dict[str, Dict[str, int | float | None]] = {}
 		try:
-			for mount, fstype in self._list_mountpoints():
+			for mount, fstype in self._proc.mountpoints():
 				try:
 					du = shutil.disk_usage(mount)
 					used_percent = round(100.0 * du.used / du.total, 2) if du.total > 0 else None
@@ -175,34 +235,40 @@ class LinuxMetricsCollector:
 			pass
 
 		# 네트워크 총계
-		rx_bytes, tx_bytes = self._read_net_dev_bytes()
-		per_iface = self._read_net_dev_per_iface()
+		per_iface = self._proc.read_net_dev()
+		rx_bytes = sum(v["rx_bytes"] for v in per_iface.values())
+		tx_bytes = sum(v["tx_bytes"] for v in per_iface.values())
 
 		# 기타
-		uptime_seconds = self._read_uptime()
+		uptime_seconds = self._proc.read_uptime()
 		cpu_count = os.cpu_count()
-		cpu_usage_percent = self._cpu_usage_percent()
+		# 구간 지표(CPU%, 디스크 I/O, PSI, vmstat)는 같은 두 시점의 카운터로 계산
+		prev, cur = self._counter_samples()
+		cpu_deltas = self._cpu_deltas(prev, cur)
+		elapsed_s = cur["at"] - prev["at"] if prev else 0.0
+		cpu_usage_percent, cpu_section = self._cpu_stats(cpu_deltas)
+		disk_io = self._disk_io(prev, cur, elapsed_s)
+		pressure = self._pressure(prev, cur, elapsed_s)
+		vmstat = self._vmstat(prev, cur, elapsed_s)
+		# 같은 jiffy 안에서 다시 호출되면 기준점을 유지해 다음 호출이 더 긴 구간으로 계산되게 함
+		if sum(cpu_deltas.get("cpu", ())) > 0 or not prev:
+			self._prev = cur
 
-		# 프로세스 수
-		process_count = None
-		try:
-			process_count = sum(1 for name in os.listdir("/proc") if name.isdigit())
-		except Exception:
-			pass
+		# 프로세스 수(프로세스 테이블을 쓰면 그 목록 기준)
+		processes = None
+		if self._procs is not None:
+			try:
+				processes = self._procs.sample()
+			except Exception:
+				processes = None
+		process_count = processes["count"] if processes is not None else self._proc.process_count()
 
 		# 파일 디스크립터
-		fd_allocated = fd_max = None
-		try:
-			with open("/proc/sys/fs/file-nr", "r", encoding="utf-8") as f:
-				parts = f.read().split()
-				# file-nr: allocated unused max
-				if len(parts) >= 3:
-					fd_allocated = int(parts[0])
-					fd_max = int(parts[2])
-		except Exception:
-			pass
+		fd_allocated, fd_max = self._proc.read_file_nr()
 
-		return {
+		uname = os.uname() if hasattr(os, "uname") else None
+
+		metrics = {
 			"system": {
 				"uptime_seconds": uptime_seconds,
 				"cpu_count": cpu_count,
@@ -212,6 +278,7 @@ class LinuxMetricsCollector:
 				"cpu_usage_percent": cpu_usage_percent,
 				"process_count": process_count,
 			},
+			"cpu": cpu_section,
 			"memory": {
 				"mem_total_kb": mem_total_kb,
 				"mem_available_kb": mem_available_kb,
@@ -223,6 +290,9 @@ class LinuxMetricsCollector:
 				"swap_used_percent": swap_used_percent,
 			},
 			"disk": per_mount,
+			"diskio": disk_io,
+			"pressure": pressure,
+			"vmstat": vmstat,
 			"network": {
 				"rx_bytes_total": rx_bytes,
 				"tx_bytes_total": tx_bytes,
@@ -234,9 +304,19 @@ class LinuxMetricsCollector:
 			},
 			"meta": {
 				"timestamp": int(time.time()),
-				"node": os.uname().nodename if hasattr(os, "uname") else None,
-				"kernel": " ".join(os.uname()) if hasattr(os, "uname") else None,
+				"node": uname.nodename if uname else None,
+				"kernel": " ".join(uname) if uname else None,
 			},
 		}
+		if processes is not None:
+			metrics["processes"] = processes
+		if self._cgroups is not None:
+			try:
+				metrics["cgroups"] = self._cgroups.sample()
+			except Exception as e:
+				metrics["cgroups"] = {"error": str(e)}
+		elif self._cgroup_error is not None:
+			metrics["cgroups"] = {"error": self._cgroup_error}
+		return metrics
 
 
@@ -0,0 +1,293 @@
+import os
+import re
+import select
+import threading
+from typing import Dict, List, Tuple
+
+try:
+	import resource
+except ImportError:
+	resource = None
+
+
+MEMINFO_KEYS = ("MemTotal", "MemFree", "MemAvailable", "Buffers", "Cached", "SwapTotal", "SwapFree")
+# /proc/stat의 cpu 라인: cpu(합계) 또는 cpuN 뒤에 jiffies 카운터 나열
+STAT_CPU_RE = re.compile(rb"^(cpu\d*) +([\d ]+)$", re.M)
+# /proc/net/dev: iface: rx_bytes rx_packets errs drop fifo frame compressed multicast tx_bytes tx_packets ...
+NET_DEV_RE = re.compile(rb"^\s*([^:\s]+):\s*(\d+)\s+(\d+)(?:\s+\d+){6}\s+(\d+)\s+(\d+)", re.M)
+MOUNTS_RE = re.compile(rb"^(\S+) (\S+) (\S+) ", re.M)
+# /proc/diskstats: major minor name 뒤에 누적 카운터(커널 버전에 따라 11/15/17개)
+DISKSTATS_RE = re.compile(rb"^\s*\d+\s+\d+ (\S+) ([\d ]+)$", re.M)
+# /proc/pressure/*: some|full avg10=% avg60=% avg300=% total=누적 us
+PSI_RE = re.compile(rb"^(some|full) avg10=([\d.]+) avg60=([\d.]+) avg300=([\d.]+) total=(\d+)$", re.M)
+PSI_RESOURCES = ("cpu", "memory", "io")
+# /proc/vmstat 페이징/회수 카운터. 커널에 따라 zone별(_dma, _normal 등)로 나뉜 키는 합산
+# '^' 대신 '\n'으로 시작해야 줄마다 대안 전체를 시도하지 않아 3배 빠름(첫 줄은 nr_free_pages라 무관)
+VMSTAT_RE = re.compile(
+	rb"\n(pgpgin|pgpgout|pswpin|pswpout|pgfault|pgmajfault|pgscan_kswapd|pgscan_direct(?!_throttle)|pgsteal_kswapd|pgsteal_direct|allocstall|oom_kill)(?:_\w+)? (\d+)$",
+	re.M,
+)
+
+# 물리 볼륨 위주 필터
+PHYSICAL_FSTYPES = frozenset((b"ext2", b"ext3", b"ext4", b"xfs", b"btrfs", b"zfs"))
+# 디스크 I/O는 전체 장치만(파티션 제외, /sys/block 기준). 가상 장치(미사용 loop 등)도 제외
+BLOCK_DEVICES_DIR = b"/sys/block"
+VIRTUAL_DISK_PREFIXES = (b"loop", b"ram")
+
+# 프로세스/cgroup 테이블이 열어 두는 fd의 공유 상한 기본값. 같은 프로세스의 소켓(웹 aggregator의 에이전트 연결 등)이
+# 쓸 fd를 남기도록 작게 잡고, RLIMIT_NOFILE soft의 1/8도 넘지 않게 함
+DEFAULT_FD_BUDGET = 256
+
+
+class FdBudget:
+	# 열어 둔 채 재사용하는 fd 수를 여러 테이블이 함께 제한. 상한을 넘으면 호출 측이 열고 닫으며 읽음
+	def __init__(self, limit: int | None = None):
+		self._lock = threading.Lock()
+		self.used = 0
+		self.limit = 0
+		self.set_limit(limit)
+
+	def set_limit(self, limit: int | None = None):
+		if limit is None:
+			soft = 1024
+			if resource is not None:
+				try:
+					soft = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+				except Exception:
+					pass
+			limit = min(DEFAULT_FD_BUDGET, soft // 8) if soft > 0 else DEFAULT_FD_BUDGET
+		# 이미 열린 fd는 그대로 두고 이후 acquire부터 적용
+		self.limit = max(0, int(limit))
+
+	def acquire(self, n: int = 1) -> bool:
+		with self._lock:
+			if self.used + n > self.limit:
+				return False
+			self.used += n
+			return True
+
+	def release(self, n: int = 1):
+		with self._lock:
+			self.used = max(0, self.used - n)
+
+
+_shared_budget: FdBudget | None = None
+_shared_lock = threading.Lock()
+
+
+def shared_fd_budget(limit: int | None = None) -> FdBudget:
+	# 프로세스 전체에서 하나인 fd 예산. limit을 주면 상한을 바꿈
+	global _shared_budget
+	with _shared_lock:
+		if _shared_budget is None:
+			_shared_budget = FdBudget(limit)
+		elif limit is not None:
+			_shared_budget.set_limit(limit)
+		return _shared_budget
+
+
+class ProcFile:
+	# /proc 파일의 fd를 열어둔 채 매 틱 pread로 재사용 버퍼에 다시 읽음(open/close·텍스트 디코딩 없음)
+	def __init__(self, path: str, size: int = 4096):
+		self.path = path
+		self.buf = bytearray(size)
+		self.length = 0
+		self._fd: int | None = None
+
+	def fileno(self) -> int:
+		if self._fd is None:
+			self._fd = os.open(self.path, os.O_RDONLY | getattr(os, "O_CLOEXEC", 0))
+		return self._fd
+
+	def read(self) -> int:
+		# seq_file 기반 파일(vmstat, mounts, diskstats 등)은 pread 한 번에 최대 한 페이지 정도만 돌려주므로
+		# 짧게 읽혀도 EOF가 아님. 0이 나올 때까지 오프셋을 옮겨 가며 이어 읽고, 버퍼가 차면 두 배로 늘림. 실패 시 0 반환
+		try:
+			fd = self.fileno()
+			total = 0
+			while True:
+				if total == len(self.buf):
+					buf = bytearray(len(self.buf) * 2)
+					buf[:total] = self.buf
+					self.buf = buf
+				n = os.preadv(fd, [memoryview(self.buf)[total:]], total)
+				if n == 0:
+					self.length = total
+					return total
+				total += n
+		except OSError:
+			self.close()
+			self.length = 0
+			return 0
+
+	def view(self) -> bytearray:
+		return self.buf
+
+	def close(self):
+		if self._fd is not None:
+			try:
+				os.close(self._fd)
+			except OSError:
+				pass
+			self._fd = None
+
+
+class ProcReader:
+	# 한 틱에 필요한 /proc 파일을 각각 한 번씩만 읽고 미리 컴파일한 바이트 파서로 해석
+	def __init__(self, root: str = "/proc"):
+		self.root = root
+		self.meminfo = ProcFile(f"{root}/meminfo")
+		self.stat = ProcFile(f"{root}/stat", 16384)
+		self.net_dev = ProcFile(f"{root}/net/dev")
+		self.uptime = ProcFile(f"{root}/uptime", 128)
+		self.file_nr = ProcFile(f"{root}/sys/fs/file-nr", 128)
+		self.mounts = ProcFile(f"{root}/self/mounts", 8192)
+		self.diskstats = ProcFile(f"{root}/diskstats", 8192)
+		self.vmstat = ProcFile(f"{root}/vmstat", 8192)
+		# PSI가 없는 커널(4.20 미만, CONFIG_PSI 꺼짐)은 매 틱 open을 재시도하지 않도록 처음부터 제외
+		self.pressure = {
+			resource: ProcFile(f"{root}/pressure/{resource}", 256)
+			for resource in PSI_RESOURCES
+			if os.path.exists(f"{root}/pressure/{resource}")
+		}
+		self._meminfo_patterns: Dict[Tuple[str, ...], re.Pattern] = {}
+		self._mounts_poll = None
+		self._mountpoints: List[Tuple[str, str]] | None = None
+		self._disk_names: Tuple[bytes, ...] | None = None
+		self._whole_disks: frozenset = frozenset()
+
+	def close(self):
+		for f in (self.meminfo, self.stat, self.net_dev, self.uptime, self.file_nr, self.mounts, self.diskstats, self.vmstat):
+			f.close()
+		for f in self.pressure.values():
+			f.close()
+		self._mounts_poll = None
+
+	def read_meminfo(self, keys: Tuple[str, ...] = MEMINFO_KEYS) -> Dict[str, int]:
+		# 필요한 키만 매칭하는 패턴을 키 조합별로 한 번만 컴파일. 값은 kB 단위
+		pattern = self._meminfo_patterns.get(keys)
+		if pattern is None:
+			alternatives = b"|".join(re.escape(k.encode()) for k in keys)
+			pattern = re.compile(rb"^(" + alternatives + rb"):\s+(\d+)", re.M)
+			self._meminfo_patterns[keys] = pattern
+		n = self.meminfo.read()
+		return {k.decode(): int(v) for k, v in pattern.findall(self.meminfo.view(), 0, n)}
+
+	def read_stat_cpus(self) -> Dict[str, List[int]]:
+		n = self.stat.read()
+		buf = self.stat.view()
+		return {m.group(1).decode(): [int(v) for v in m.group(2).split()] for m in STAT_CPU_RE.finditer(buf, 0, n)}
+
+	def read_net_dev(self) -> Dict[str, Dict[str, int]]:
+		n = self.net_dev.read()
+		stats: Dict[str, Dict[str, int]] = {}
+		for iface, rx_bytes, rx_packets, tx_bytes, tx_packets in NET_DEV_RE.findall(self.net_dev.view(), 0, n):
+			stats[iface.decode()] = {
+				"rx_bytes": int(rx_bytes),
+				"rx_packets": int(rx_packets),
+				"tx_bytes": int(tx_bytes),
+				"tx_packets": int(tx_packets),
+			}
+		return stats
+
+	def _block_devices(self, names: Tuple[bytes, ...]) -> frozenset:
+		try:
+			# /sys/block은 장치 이름의 '/'를 '!'로 표기(cciss/c0d0 → cciss!c0d0)
+			block = {name.replace(b"!", b"/") for name in os.listdir(BLOCK_DEVICES_DIR)}
+		except OSError:
+			block = None
+		return frozenset(
+			name for name in names
+			if not name.startswith(VIRTUAL_DISK_PREFIXES) and (block is None or name in block)
+		)
+
+	def read_diskstats(self) -> Dict[str, List[int]]:
+		# 장치 구성이 바뀔 때만 /sys/block으로 전체 장치 목록을 다시 계산
+		n = self.diskstats.read()
+		rows = [(bytes(name), values) for name, values in DISKSTATS_RE.findall(self.diskstats.view(), 0, n)]
+		names = tuple(name for name, _ in rows)
+		if names != self._disk_names:
+			self._disk_names = names
+			self._whole_disks = self._block_devices(names)
+		whole = self._whole_disks
+		return {name.decode(errors="replace"): [int(v) for v in values.split()] for name, values in rows if name in whole}
+
+	def read_pressure(self) -> Dict[str, Dict[str, Tuple[float, float, float, int]]]:
+		# 자원별 {some|full: (avg10, avg60, avg300, total_us)}
+		pressure: Dict[str, Dict[str, Tuple[float, float, float, int]]] = {}
+		for resource, f in self.pressure.items():
+			n = f.read()
+			rows = {
+				kind.decode(): (float(avg10), float(avg60), float(avg300), int(total))
+				for kind, avg10, avg60, avg300, total in PSI_RE.findall(f.view(), 0, n)
+			}
+			if rows:
+				pressure[resource] = rows
+		return pressure
+
+	def read_vmstat(self) -> Dict[str, int]:
+		n = self.vmstat.read()
+		counters: Dict[str, int] = {}
+		for key, value in VMSTAT_RE.findall(self.vmstat.view(), 0, n):
+			key = key.decode()
+			counters[key] = counters.get(key, 0) + int(value)
+		return counters
+
+	def read_uptime(self) -> float:
+		n = self.uptime.read()
+		try:
+			return float(self.uptime.view()[:n].split()[0])
+		except Exception:
+			return 0.0
+
+	def read_file_nr(self) -> Tuple[int | None, int | None]:
+		# file-nr: allocated unused max
+		n = self.file_nr.read()
+		parts = self.file_nr.view()[:n].split()
+		if len(parts) >= 3:
+			return int(parts[0]), int(parts[2])
+		return None, None
+
+	def process_count(self) -> int | None:
+		try:
+			return sum(1 for name in os.listdir(self.root.encode()) if name[:1].isdigit())
+		except Exception:
+			return None
+
+	def _mounts_changed(self) -> bool:
+		# /proc/self/mounts는 마운트 테이블이 바뀌면 poll에서 POLLPRI|POLLERR를 돌려줌
+		if self._mountpoints is None or self._mounts_poll is None:
+			return True
+		try:
+			return bool(self._mounts_poll.poll(0))
+		except Exception:
+			return True
+
+	def mountpoints(self) -> List[Tuple[str, str]]:
+		if not self._mounts_changed():
+			return self._mountpoints
+		try:
+			if self._mounts_poll is None:
+				poller = select.poll()
+				poller.register(self.mounts.fileno(), select.POLLPRI | select.POLLERR)
+				# 등록 직후 남아있는 이벤트를 비우고, 이후 변경만 감지되도록 읽기 전에 등록
+				poller.poll(0)
+				self._mounts_poll = poller
+		except Exception:
+			self._mounts_poll = None
+		mounts: List[Tuple[str, str]] = []
+		n = self.mounts.read()
+		seen = set()
+		for _, mnt, fstype in MOUNTS_RE.findall(self.mounts.view(), 0, n):
+			if bytes(fstype) not in PHYSICAL_FSTYPES:
+				continue
+			mount = mnt.decode(errors="replace")
+			if mount in seen:
+				continue
+			seen.add(mount)
+			mounts.append((mount, fstype.decode()))
+		# 루트는 항상 포함
+		if "/" not in seen:
+			mounts.append(("/", "unknown"))
+		self._mountpoints = mounts
+		return mounts
@@ -0,0 +1,356 @@
+import heapq
+import os
+import time
+from typing import Any, Dict, List, Tuple
+
+from linux.procfs import FdBudget, ProcFile, shared_fd_budget
+
+
+# /proc/[pid]/stat에서 ')' 뒤 필드 인덱스(state가 0)
+STAT_STATE = 0
+STAT_UTIME = 11
+STAT_STIME = 12
+STAT_THREADS = 17
+STAT_STARTTIME = 19
+STAT_RSS = 21
+STAT_READ_SIZE = 1024
+
+TOP_KEYS = ("cpu", "rss", "io", "fds")
+
+
+class ProcEntry:
+	__slots__ = (
+		"pid", "fd", "raw", "comm", "state", "cpu_ticks", "threads", "rss_pages", "starttime",
+		"read_at", "cpu_percent", "idle_reads", "io_read", "io_write", "io_at", "io_rate",
+		"read_rate", "write_rate", "fds", "seen", "next_tick",
+	)
+
+	def __init__(self, pid: int):
+		self.pid = pid
+		self.fd: int | None = None
+		self.raw = b""
+		self.comm = ""
+		self.state = ""
+		self.cpu_ticks = 0
+		self.threads = 0
+		self.rss_pages = 0
+		self.starttime = 0
+		self.read_at = 0.0
+		self.cpu_percent = 0.0
+		self.idle_reads = 0
+		self.io_read: int | None = None
+		self.io_write: int | None = None
+		self.io_at = 0.0
+		self.io_rate = 0.0
+		self.read_rate: float | None = None
+		self.write_rate: float | None = None
+		self.fds: int | None = None
+		# 읽은 횟수(0: 처음, 1: 한 번 읽음, 2: io/fd 기준값까지 잡음)
+		self.seen = 0
+		self.next_tick = 0
+
+
+class ProcessTable:
+	# /proc/[pid]/stat·statm·io로 프로세스별 CPU%/RSS/IO 바이트/s/FD 수 top-N
+	# 틱마다 모든 PID를 읽지 않도록:
+	# - /proc/loadavg의 마지막 PID·전체 태스크 수가 그대로면 PID 목록(listdir)을 다시 읽지 않음
+	# - stat 바이트가 직전과 같으면(그 사이 실행되지 않음) 파싱·io·fd 조회를 건너뛰고, 연속으로 같을수록 2→max_skip틱 간격으로 읽음
+	#   (유휴였다가 바빠진 프로세스가 top_cpu에서 빠지는 기간이 최대 max_skip틱이므로 작게 유지)
+	# - 새 PID는 stat만 읽고, 한 틱을 넘겨 살아남은 프로세스만 fd를 열어둠(단명 프로세스 비용 최소화)
+	# - top-N은 직전 top-N과 이번 틱에 읽은 항목만 비교(읽지 않은 항목은 값이 그대로이므로)
+	def __init__(self, root: str = "/proc", top_n: int = 10, max_skip: int = 4, full_scan_every: int = 60, fd_budget: FdBudget | None = None):
+		self.root = root
+		self.top_n = max(1, int(top_n))
+		self.max_skip = max(1, int(max_skip))
+		self.full_scan_every = max(1, int(full_scan_every))
+		# 열어 둘 stat fd 수는 cgroup 테이블과 함께 쓰는 예산 안에서(기본은 프로세스 전체 공유 예산)
+		self.fd_budget = fd_budget or shared_fd_budget()
+		self.clk_tck = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+		self.page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+		self.loadavg = ProcFile(f"{root}/loadavg", 128)
+		self.entries: Dict[int, ProcEntry] = {}
+		# 틱 번호 → 그 틱에 읽을 PID 목록
+		self._due: Dict[int, List[int]] = {}
+		self._tick = 0
+		self._last_listing = -1
+		self._task_marker: bytes | None = None
+		self._open_fds = 0
+		# 상태별 프로세스 수/스레드 합은 읽을 때마다 증감(틱마다 전체 순회하지 않음)
+		self._states: Dict[str, int] = {}
+		self._threads = 0
+		# 지표별 직전 top-N: (pid, 항목, 선정 당시 값)
+		self._top: Dict[str, List[Tuple[int, ProcEntry, float]]] = {key: [] for key in TOP_KEYS}
+		# 커널 6.2+는 /proc/[pid]/fd의 st_size가 열린 fd 수
+		try:
+			self._fd_size = os.stat(f"{root}/self/fd").st_size > 0
+		except OSError:
+			self._fd_size = False
+
+	def close(self):
+		for entry in self.entries.values():
+			self._release(entry)
+		self.entries.clear()
+		self._due.clear()
+		self.loadavg.close()
+
+	def _release(self, entry: ProcEntry):
+		if entry.fd is not None:
+			try:
+				os.close(entry.fd)
+			except OSError:
+				pass
+			entry.fd = None
+			self._open_fds -= 1
+			self.fd_budget.release()
+
+	def _schedule(self, entry: ProcEntry, skip: int):
+		# skip틱 간격이면 다음 skip틱 중 PID mod skip 슬롯에 배치(한꺼번에 깨어나 같은 틱에 몰리지 않게, 늦어도 skip틱 뒤)
+		if skip <= 1:
+			entry.next_tick = self._tick + 1
+		else:
+			base = self._tick + 1
+			entry.next_tick = base + (entry.pid - base) % skip
+		self._due.setdefault(entry.next_tick, []).append(entry.pid)
+
+	def _count(self, entry: ProcEntry, sign: int):
+		if entry.raw:
+			self._states[entry.state] = self._states.get(entry.state, 0) + sign
+			self._threads += sign * entry.threads
+
+	def _tasks_changed(self) -> bool:
+		# loadavg 4·5번째 필드 "실행/전체 태스크 수 마지막PID": 생성이 있으면 마지막 PID가, 종료만 있으면 전체 수가 바뀜
+		n = self.loadavg.read()
+		parts = bytes(self.loadavg.view()[:n]).split()
+		marker = parts[3].partition(b"/")[2] + b" " + parts[4] if len(parts) >= 5 else None
+		changed = marker is None or marker != self._task_marker
+		self._task_marker = marker
+		return changed
+
+	def _list_pids(self) -> List[int]:
+		try:
+			return [int(name) for name in os.listdir(self.root.encode()) if name[:1].isdigit()]
+		except OSError:
+			return list(self.entries)
+
+	def _read_stat(self, entry: ProcEntry) -> bytes | None:
+		try:
+			if entry.fd is not None:
+				return os.pread(entry.fd, STAT_READ_SIZE, 0)
+			path = f"{self.root}/{entry.pid}/stat"
+			# 한 번 이상 살아남은 프로세스만 fd를 열어둠
+			if entry.seen and self.fd_budget.acquire():
+				try:
+					entry.fd = os.open(path, os.O_RDONLY | getattr(os, "O_CLOEXEC", 0))
+				except OSError:
+					self.fd_budget.release()
+					raise
+				self._open_fds += 1
+				return os.pread(entry.fd, STAT_READ_SIZE, 0)
+			fd = os.open(path, os.O_RDONLY | getattr(os, "O_CLOEXEC", 0))
+			try:
+				return os.read(fd, STAT_READ_SIZE)
+			finally:
+				os.close(fd)
+		except OSError:
+			# 종료된 프로세스(ESRCH/ENOENT)
+			return None
+
+	def _read_io(self, entry: ProcEntry, now: float):
+		# read_bytes/write_bytes: 스토리지 계층까지 간 바이트(다른 사용자 프로세스는 권한이 없으면 None)
+		try:
+			with open(f"{self.root}/{entry.pid}/io", "rb") as f:
+				data = f.read()
+		except OSError:
+			entry.read_rate = entry.write_rate = None
+			entry.io_rate = 0.0
+			return
+		read_bytes = write_bytes = None
+		for line in data.split(b"\n"):
+			if line.startswith(b"read_bytes:"):
+				read_bytes = int(line[11:])
+			elif line.startswith(b"write_bytes:"):
+				write_bytes = int(line[12:])
+		if entry.io_read is not None and read_bytes is not None and write_bytes is not None and now > entry.io_at:
+			elapsed = now - entry.io_at
+			entry.read_rate = round(max(0, read_bytes - entry.io_read) / elapsed, 1)
+			entry.write_rate = round(max(0, write_bytes - entry.io_write) / elapsed, 1)
+			entry.io_rate = entry.read_rate + entry.write_rate
+		entry.io_read, entry.io_write, entry.io_at = read_bytes, write_bytes, now
+
+	def _count_fds(self, entry: ProcEntry):
+		path = f"{self.root}/{entry.pid}/fd"
+		try:
+			entry.fds = os.stat(path).st_size if self._fd_size else len(os.listdir(path))
+		except OSError:
+			entry.fds = None
+
+	def _read_statm(self, entry: ProcEntry) -> Tuple[int | None, int | None]:
+		# statm: size resident shared text lib data dt (페이지)
+		try:
+			with open(f"{self.root}/{entry.pid}/statm", "rb") as f:
+				parts = f.read().split()
+			return int(parts[1]) * self.page_size, int(parts[2]) * self.page_size
+		except (OSError, IndexError, ValueError):
+			return None, None
+
+	def _update(self, entry: ProcEntry) -> str:
+		# 반환: "gone" | "same" | "parsed"
+		data = self._read_stat(entry)
+		if not data:
+			return "gone"
+		# 읽은 시각은 항목마다(전체를 읽는 틱은 수십 ms 걸려 틱 시작 시각을 쓰면 CPU%가 왜곡됨)
+		now = time.monotonic()
+		if data == entry.raw:
+			# 틱(jiffy) 단위 CPU 시간이 그대로면 CPU%는 0. fsync 등으로 대부분 블록된 프로세스도 같아 보일 수 있어
+			# IO 속도는 한 번은 유지(다음에 바뀌어 읽을 때 그 사이 전체 구간 평균으로 계산됨)
+			entry.cpu_percent = 0.0
+			entry.idle_reads += 1
+			if entry.idle_reads > 1 and entry.io_rate:
+				entry.io_rate = 0.0
+				entry.read_rate = entry.write_rate = 0.0
+			entry.read_at = now
+			return "same"
+		close = data.rfind(b")")
+		fields = data[close + 2:].split()
+		cpu_ticks = int(fields[STAT_UTIME]) + int(fields[STAT_STIME])
+		starttime = int(fields[STAT_STARTTIME])
+		if entry.raw and starttime == entry.starttime:
+			elapsed = now - entry.read_at
+			entry.cpu_percent = round(100.0 * (cpu_ticks - entry.cpu_ticks) / self.clk_tck / elapsed, 2) if elapsed > 0 else 0.0
+		else:
+			# 처음 읽었거나 PID가 재사용됨(fd를 열어두지 않은 항목)
+			entry.comm = data[data.find(b"(") + 1:close].decode(errors="replace")
+			entry.starttime = starttime
+			entry.cpu_percent = 0.0
+			entry.io_read = entry.io_write = entry.read_rate = entry.write_rate = entry.fds = None
+			entry.io_rate = 0.0
+		self._count(entry, -1)
+		entry.raw = data
+		entry.cpu_ticks = cpu_ticks
+		entry.state = fields[STAT_STATE].decode()
+		entry.threads = int(fields[STAT_THREADS])
+		self._count(entry, 1)
+		entry.rss_pages = int(fields[STAT_RSS])
+		entry.read_at = now
+		entry.idle_reads = 0
+		return "parsed"
+
+	def _merge_top(self, key: str, changed: List[ProcEntry], value, sticky: bool) -> List[ProcEntry]:
+		# 직전 top-N + 이번 틱에 값이 바뀐 항목 중 상위 N
+		# CPU/IO는 값이 있는 항목이 모두 매 틱 읽히므로 이것으로 충분. RSS/FD(sticky)는 읽지 않은 항목도 값이 남아 있어
+		# 직전 top-N 중 사라지거나 값이 줄어든 항목이 있으면 전체에서 다시 고름
+		prev = self._top[key]
+		rescan = sticky and any(
+			self.entries.get(pid) is not entry or (value(entry) or 0) < old
+			for pid, entry, old in prev
+		)
+		if rescan:
+			pool = self.entries.values()
+		else:
+			merged = {pid: entry for pid, entry, _ in prev if pid in self.entries}
+			for entry in changed:
+				merged[entry.pid] = entry
+			pool = merged.values()
+		top = heapq.nlargest(self.top_n, (e for e in pool if (value(e) or 0) > 0), key=lambda e: value(e) or 0)
+		self._top[key] = [(e.pid, e, value(e) or 0) for e in top]
+		return top
+
+	def sample(self) -> Dict[str, Any]:
+		start = time.perf_counter()
+		self._tick += 1
+		tick = self._tick
+		listed = False
+		new_pids: List[int] = []
+		if self._tasks_changed() or tick - self._last_listing >= self.full_scan_every:
+			listed = True
+			self._last_listing = tick
+			pids = self._list_pids()
+			alive = set(pids)
+			for pid in [pid for pid in self.entries if pid not in alive]:
+				entry = self.entries.pop(pid)
+				self._count(entry, -1)
+				self._release(entry)
+			new_pids = [pid for pid in pids if pid not in self.entries]
+			for pid in new_pids:
+				entry = self.entries[pid] = ProcEntry(pid)
+				entry.next_tick = tick
+
+		changed: List[ProcEntry] = []
+		read = 0
+		same = 0
+		for pid in self._due.pop(tick, []) + new_pids:
+			entry = self.entries.get(pid)
+			# 목록 갱신으로 사라졌거나 다른 틱으로 다시 예약된 PID는 건너뜀
+			if entry is None or entry.next_tick != tick:
+				continue
+			result = self._update(entry)
+			if result == "gone":
+				self._count(entry, -1)
+				self._release(entry)
+				del self.entries[pid]
+				continue
+			read += 1
+			if result == "parsed":
+				changed.append(entry)
+			else:
+				same += 1
+			if entry.seen == 1 or (entry.seen and result == "parsed"):
+				# 두 번째 읽기에서 io/fd 기준값, 이후에는 실행된 프로세스만 갱신(실행되지 않았으면 바뀌지 않음)
+				self._read_io(entry, entry.read_at)
+				self._count_fds(entry)
+			# 새 프로세스는 stat만 읽고 다음 틱에 다시 확인(단명이면 그때 사라짐)
+			if entry.seen < 2:
+				entry.seen += 1
+			self._schedule(entry, self.max_skip if entry.idle_reads >= 10 else min(self.max_skip, 1 << entry.idle_reads))
+
+		page = self.page_size
+		top_cpu = self._merge_top("cpu", changed, lambda e: e.cpu_percent, False)
+		top_rss = self._merge_top("rss", changed, lambda e: e.rss_pages, True)
+		top_io = self._merge_top("io", changed, lambda e: e.io_rate, False)
+		top_fds = self._merge_top("fds", changed, lambda e: e.fds, True)
+
+		def row(entry: ProcEntry) -> Dict[str, Any]:
+			return {
+				"pid": entry.pid,
+				"comm": entry.comm,
+				"state": entry.state,
+				"cpu_percent": entry.cpu_percent,
+				"rss_bytes": entry.rss_pages * page,
+				"threads": entry.threads,
+				"read_bytes_per_sec": entry.read_rate,
+				"write_bytes_per_sec": entry.write_rate,
+				"fd_count": entry.fds,
+			}
+
+		def table(entries: List[ProcEntry]) -> Dict[str, Dict[str, Any]]:
+			return {f"{e.comm}[{e.pid}]": row(e) for e in entries}
+
+		rss_table = table(top_rss)
+		for entry in top_rss:
+			resident, shared = self._read_statm(entry)
+			item = rss_table[f"{entry.comm}[{entry.pid}]"]
+			if resident is not None:
+				item["rss_bytes"] = resident
+			item["shared_bytes"] = shared
+
+		states = self._states
+		return {
+			"count": len(self.entries),
+			"threads": self._threads,
+			"running": states.get("R", 0),
+			"blocked": states.get("D", 0),
+			"zombie": states.get("Z", 0),
+			"top_cpu": table(top_cpu),
+			"top_rss": rss_table,
+			"top_io": table(top_io),
+			"top_fds": table(top_fds),
+			"scan": {
+				"listed": listed,
+				"new": len(new_pids),
+				"read": read,
+				"parsed": len(changed),
+				"unchanged": same,
+				"open_fds": self._open_fds,
+				"ms": round((time.perf_counter() - start) * 1000.0, 2),
+			},
+		}
@@ -1,15 +1,25 @@
 import argparse
+import asyncio
 import json
+import signal
 import sys
 import time
 from pathlib import Path
+from typing import List, Tuple
 
 import yaml
 from tabulate import tabulate
 
 from redis.collector import RedisMetricsCollector
+from redis.fanout import RedisClusterCollector
 from linux.collector import LinuxMetricsCollector
+from linux.agent import PushAgent
 from jvm.collector import JvmMetricsCollector
+from jvm.fleet import JvmFleetCollector, load_endpoints
+from core.aio import AsyncPoller
+from core.sampler import Sampler, SnapshotCache
+from core.rates import RateEngine
+from core.tsdb import TimeSeriesStore
 from importlib.machinery import SourceFileLoader
 from pathlib import Path as _Path
 
@@ -22,44 +32,296 @@ def load_config(args) -> dict:
 	# CLI가 우선
 	if args.redis_url:
 		config["redis_url"] = args.redis_url
+	if args.jmx_url:
+		config["jmx_url"] = args.jmx_url
+	if args.history_dir:
+		config["history_dir"] = args.history_dir
+	if args.jmx_fleet:
+		config["jmx_fleet"] = args.jmx_fleet
+	if args.jmx_fleet_concurrency is not None:
+		config["jmx_fleet_concurrency"] = args.jmx_fleet_concurrency
 	if args.interval is not None:
 		config["interval"] = args.interval
+	if args.process_top_n is not None:
+		config["process_top_n"] = args.process_top_n
+	if args.cgroup:
+		config["cgroup"] = args.cgroup
+	if args.cgroup_depth is not None:
+		config["cgroup_depth"] = args.cgroup_depth
+	if args.fd_budget is not None:
+		config["fd_budget"] = args.fd_budget
+	if args.push:
+		config["push"] = args.push
+	if args.push_batch is not None:
+		config["push_batch"] = args.push_batch
+	if args.host_name:
+		config["host_name"] = args.host_name
 	if args.output:
 		config["output"] = args.output
 	if args.ping_samples is not None:
 		config["ping_samples"] = args.ping_samples
 	if args.ping_timeout_ms is not None:
 		config["ping_timeout_ms"] = args.ping_timeout_ms
+	if args.ping_rate_hz is not None:
+		config["ping_rate_hz"] = args.ping_rate_hz
+	if args.client_list_type:
+		config["client_list_type"] = args.client_list_type
+	if args.client_sample_every is not None:
+		config["client_sample_every"] = args.client_sample_every
+	if args.no_redis_pipeline:
+		config["redis_pipeline"] = False
+	if args.redis_cluster:
+		config["redis_cluster"] = True
+	if args.redis_cluster_workers is not None:
+		config["redis_cluster_workers"] = args.redis_cluster_workers
+	if args.kafka_bootstrap:
+		config["kafka_bootstrap"] = args.kafka_bootstrap
+	if args.kafka_group:
+		config["kafka_group"] = args.kafka_group
+	if args.kafka_groups:
+		config["kafka_groups"] = args.kafka_groups
+	if args.kafka_no_throughput:
+		config["kafka_throughput"] = False
+	if args.kafka_metadata_max_age_s is not None:
+		config["kafka_metadata_max_age_s"] = args.kafka_metadata_max_age_s
+	if args.async_driver:
+		config["async"] = True
+	if args.async_concurrency is not None:
+		config["async_concurrency"] = args.async_concurrency
 	# 기본값
 	config.setdefault("redis_url", "redis://localhost:6379/0")
 	config.setdefault("interval", 0)
 	config.setdefault("output", "pretty")
 	config.setdefault("ping_samples", 3)
 	config.setdefault("ping_timeout_ms", 500)
+	config.setdefault("redis_pipeline", True)
+	config.setdefault("ping_rate_hz", 0)
+	config.setdefault("latency_window_s", 60)
+	config.setdefault("client_top_k", 10)
+	config.setdefault("client_sample_every", 1)
+	config.setdefault("client_list_type", None)
+	config.setdefault("redis_cluster", False)
+	config.setdefault("redis_cluster_workers", 16)
+	config.setdefault("jmx_url", None)
+	config.setdefault("history_dir", None)
+	config.setdefault("jmx_fleet", None)
+	config.setdefault("jmx_fleet_concurrency", 64)
+	config.setdefault("jmx_fleet_timeout_ms", 2000)
+	config.setdefault("process_top_n", 10)
+	config.setdefault("cgroup", None)
+	config.setdefault("cgroup_depth", 0)
+	config.setdefault("fd_budget", None)
+	config.setdefault("push", None)
+	config.setdefault("push_batch", 1)
+	config.setdefault("host_name", None)
+	config.setdefault("kafka_bootstrap", None)
+	config.setdefault("kafka_group", None)
+	config.setdefault("kafka_groups", None)
+	config.setdefault("kafka_throughput", True)
+	config.setdefault("kafka_metadata_max_age_s", 30.0)
+	config.setdefault("async", False)
+	config.setdefault("async_concurrency", 64)
+	config.setdefault("async_timeout_s", None)
+	config.setdefault("targets", None)
 	return config
 
 
-def print_output(metrics: dict, output: str):
+def resolve_targets(config: dict, default_target: str) -> List[Tuple[str, str, dict]]:
+	# 설정 파일의 targets 목록 → (이름, 대상 종류, 설정). 항목의 키는 공통 설정을 덮어씀
+	# 예: - {name: cache-1, target: redis, redis_url: "redis://10.0.0.1:6379/0"}
+	entries = config["targets"]
+	if not entries:
+		return [(default_target, default_target, config)]
+	if not isinstance(entries, list):
+		raise ValueError("targets must be a list")
+	resolved: List[Tuple[str, str, dict]] = []
+	seen = set()
+	for i, entry in enumerate(entries):
+		if not isinstance(entry, dict):
+			raise ValueError(f"targets[{i}] must be a mapping")
+		kind = entry.get("target", default_target)
+		name = str(entry.get("name") or f"{kind}-{i}")
+		if name in seen:
+			raise ValueError(f"duplicate target name: {name}")
+		seen.add(name)
+		merged = dict(config)
+		merged.update(entry)
+		merged["targets"] = None
+		resolved.append((name, kind, merged))
+	return resolved
+
+
+def rate_key(target: str, config: dict) -> str:
+	# 클러스터/플릿 모드는 결과 구조가 달라 core.rates.COUNTERS의 별도 항목으로 변화율 계산
+	if target == "redis" and config["redis_cluster"]:
+		return "redis_cluster"
+	if target == "jvm" and config["jmx_fleet"]:
+		return "jvm_fleet"
+	return target
+
+
+def build_collector(target: str, config: dict):
+	if target == "redis" and config["redis_cluster"]:
+		return RedisClusterCollector(
+			config["redis_url"].split(","),
+			max_workers=int(config["redis_cluster_workers"]),
+			ping_timeout_ms=config["ping_timeout_ms"],
+			pipeline=bool(config["redis_pipeline"]),
+		)
+	if target == "redis":
+		return RedisMetricsCollector(
+			redis_url=config["redis_url"],
+			ping_samples=config["ping_samples"],
+			ping_timeout_ms=config["ping_timeout_ms"],
+			pipeline=bool(config["redis_pipeline"]),
+			latency_window_s=float(config["latency_window_s"]),
+			ping_rate_hz=float(config["ping_rate_hz"]),
+			client_top_k=int(config["client_top_k"]),
+			client_sample_every=int(config["client_sample_every"]),
+			client_list_type=config["client_list_type"],
+		)
+	if target == "linux":
+		return LinuxMetricsCollector(
+			process_top_n=int(config["process_top_n"]),
+			cgroup=config["cgroup"],
+			cgroup_depth=int(config["cgroup_depth"]),
+			fd_budget=int(config["fd_budget"]) if config["fd_budget"] is not None else None,
+		)
+	if target == "kafka":
+		_kafka_mod = SourceFileLoader(
+			"systools_kafka_collector", str(_Path(__file__).resolve().parent / "kafka" / "collector.py")
+		).load_module()
+		return _kafka_mod.KafkaMetricsCollector(
+			bootstrap_servers=config["kafka_bootstrap"],
+			group_id=config["kafka_group"],
+			group_pattern=config["kafka_groups"],
+			metadata_max_age_s=float(config["kafka_metadata_max_age_s"]),
+			throughput=bool(config["kafka_throughput"]),
+		)
+	if target == "jvm" and config["jmx_fleet"]:
+		# 스윕 전체 데드라인은 수집 주기를 넘지 않도록 맞춤(1회 수집이면 기본값)
+		interval_s = int(config["interval"])
+		return JvmFleetCollector(
+			load_endpoints(config["jmx_fleet"]),
+			concurrency=int(config["jmx_fleet_concurrency"]),
+			timeout_ms=int(config["jmx_fleet_timeout_ms"]),
+			sweep_deadline_ms=interval_s * 1000 if interval_s > 0 else 5000,
+		)
+	if target == "jvm":
+		return JvmMetricsCollector(jmx_url=config["jmx_url"])
+	raise ValueError(f"unknown target: {target}")
+
+
+def print_output(metrics: dict, output: str, name: str | None = None):
+	# name: 여러 대상을 함께 수집할 때 결과를 구분할 대상 이름
 	if output == "json":
-		print(json.dumps(metrics, ensure_ascii=False, indent=2))
+		print(json.dumps(metrics if name is None else {"name": name, "data": metrics}, ensure_ascii=False, indent=2))
 		return
 	# pretty
-	sections = []
+	sections = [f"===== {name} =====", ""] if name is not None else []
 	def sec(title: str, items: dict):
 		rows = [(k, items.get(k)) for k in items.keys()]
 		sections.append(f"[{title}]")
 		sections.append(tabulate(rows, headers=["metric", "value"], tablefmt="github"))
 		sections.append("")
 	# 섹션별 출력
-	sec("PERFORMANCE", metrics["performance"])
-	sec("MEMORY", metrics["memory"])
-	sec("PERSISTENCE", metrics["persistence"])
-	sec("NETWORK", metrics["network"])
-	sec("SYSTEM", metrics["system"])
-	sec("CLUSTER/FAILURE", metrics["cluster"])
+	if "nodes" in metrics:
+		# 클러스터 모드: 롤업 섹션 + 노드별 표
+		for name in ("cluster", "performance", "memory", "slots", "replication"):
+			sec(name.upper(), metrics[name])
+		columns = ["role", "primary", "slots", "ops_per_sec", "latency_ms", "used_memory", "replica_lag_bytes", "error"]
+		rows = [[addr] + [node.get(c) for c in columns] for addr, node in sorted(metrics["nodes"].items())]
+		sections.append("[NODES]")
+		sections.append(tabulate(rows, headers=["node"] + columns, tablefmt="github"))
+		sections.append("")
+	elif "jvms" in metrics:
+		# JVM 플릿 모드: 플릿 요약 + JVM별 표
+		sec("FLEET", metrics["fleet"])
+		columns = ["heap_used_pct", "gc_time_ratio", "thread_count", "deadlocked_thread_count", "process_cpu_load", "error"]
+		rows = [[url] + [jvm.get(c) for c in columns] for url, jvm in sorted(metrics["jvms"].items())]
+		sections.append("[JVMS]")
+		sections.append(tabulate(rows, headers=["jvm"] + columns, tablefmt="github"))
+		sections.append("")
+	elif "persistence" in metrics:
+		sec("PERFORMANCE", metrics["performance"])
+		sec("MEMORY", metrics["memory"])
+		sec("PERSISTENCE", metrics["persistence"])
+		sec("NETWORK", metrics["network"])
+		sec("SYSTEM", metrics["system"])
+		sec("CLUSTER/FAILURE", metrics["cluster"])
+	else:
+		# 그 외 대상(linux/kafka/jvm): 섹션별 스칼라는 metric/value 표, 하위 항목별 dict 묶음(디스크·인터페이스 등)은 행 표
+		def generic(title: str, items: dict, label: str):
+			if all(isinstance(v, dict) for v in items.values()):
+				columns = list(dict.fromkeys(c for row in items.values() for c, v in row.items() if not isinstance(v, dict)))
+				rows = [[k] + [row.get(c) for c in columns] for k, row in items.items()]
+				sections.append(f"[{title}]")
+				sections.append(tabulate(rows, headers=[label] + columns, tablefmt="github"))
+				sections.append("")
+				return
+			scalars = {k: v for k, v in items.items() if not isinstance(v, dict)}
+			if scalars:
+				sec(title, scalars)
+			for key, value in items.items():
+				if isinstance(value, dict) and value:
+					generic(f"{title}/{key.upper()}", value, key)
+		for title, items in metrics.items():
+			if title != "rates" and isinstance(items, dict) and items:
+				generic(title.upper(), items, title)
+	rates = metrics.get("rates")
+	if rates and rates.get("interval_s"):
+		items = {f"{k}/s": v for k, v in rates["per_sec"].items()}
+		items.update({f"{k} (interval)": v for k, v in rates["ratio"].items()})
+		sec(f"RATES ({rates['interval_s']}s)", items)
 	print("\n".join(sections))
 
 
+async def run_async(targets: List[Tuple[str, str, dict]], config: dict, record):
+	# 모든 대상을 한 이벤트 루프에서 수집(대상당 스레드 없음). collect_all_async가 있는 collector는 논블로킹 I/O로,
+	# 변화율은 대상 이름별 RateEngine으로 계산
+	rate_keys = {name: rate_key(kind, cfg) for name, kind, cfg in targets}
+	collectors = {name: build_collector(kind, cfg) for name, kind, cfg in targets}
+	engines = {name: RateEngine() for name in collectors}
+	interval = int(config["interval"])
+	output = config["output"]
+	multi = len(targets) > 1
+
+	def transform(name: str, metrics: dict) -> dict:
+		if interval > 0:
+			metrics = engines[name].apply(rate_keys[name], metrics)
+		return record(name, metrics)
+
+	def show(snapshot: dict):
+		if snapshot["error"]:
+			print(f"[WARN] {snapshot['name']}: collect failed: {snapshot['error']}", file=sys.stderr)
+			return
+		try:
+			print_output(snapshot["data"], output, snapshot["name"] if multi else None)
+		except Exception as e:
+			print(f"[WARN] {snapshot['name']}: output failed: {e}", file=sys.stderr)
+
+	timeout_s = config["async_timeout_s"] or (interval if interval > 0 else 30)
+	poller = AsyncPoller(
+		collectors,
+		interval if interval > 0 else 1,
+		timeout_s=float(timeout_s),
+		concurrency=int(config["async_concurrency"]),
+		transform=transform,
+		on_snapshot=show if interval > 0 else None,
+	)
+	if interval > 0:
+		# 루프 안에서는 SIGTERM을 poller 정지로 처리(진행 중 수집 정리 후 정상 종료)
+		asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, poller.stop)
+	try:
+		if interval <= 0:
+			for snapshot in await poller.once():
+				show(snapshot)
+		else:
+			await poller.run()
+	finally:
+		await poller.close()
+
+
 def main():
 	parser = argparse.ArgumentParser(description="System Monitoring CLI")
 	parser.add_argument("--config", type=str, help="설정 파일 경로 (YAML)")
@@ -67,46 +329,119 @@ def main():
 	parser.add_argument("--redis-url", type=str, help="Redis URL, 예: redis://localhost:6379/0")
 	parser.add_argument("--kafka-bootstrap", type=str, help="Kafka bootstrap servers, 예: localhost:9092")
 	parser.add_argument("--kafka-group", type=str, help="Kafka consumer group(선택, 제공 시 그룹 랙 추정)")
+	parser.add_argument("--kafka-groups", type=str, help="패턴(glob, '*'이면 전체)에 맞는 모든 consumer group의 랙을 한 번에 계산")
+	parser.add_argument("--kafka-no-throughput", action="store_true", help="끝 오프셋 차이 기반 토픽/브로커별 처리량 샘플링 끄기 (kafka)")
+	parser.add_argument("--kafka-metadata-max-age-s", type=float, help="Kafka 토폴로지(브로커/토픽/파티션/ISR) 캐시 갱신 주기(초)")
+	parser.add_argument("--jmx-url", type=str, help="Jolokia 에이전트 URL, 예: http://localhost:8778/jolokia (jvm)")
+	parser.add_argument("--jmx-fleet", type=str, help="여러 Jolokia URL(쉼표 구분 또는 @파일)을 asyncio로 동시 수집 (jvm)")
+	parser.add_argument("--jmx-fleet-concurrency", type=int, help="플릿 모드 동시 요청 수 상한 (jvm)")
 	parser.add_argument("--interval", type=int, help="수집 주기(초). 0이면 1회 수집")
 	parser.add_argument("--output", type=str, choices=["pretty", "json"], help="출력 형식")
+	parser.add_argument("--process-top-n", type=int, help="프로세스별 CPU%%/RSS/IO/FD 상위 N개, 0이면 끔 (linux)")
+	parser.add_argument("--cgroup", type=str, help="cgroup v2 사용량/한도 수집: self(자기 cgroup) 또는 경로(/kubepods.slice 등) (linux)")
+	parser.add_argument("--cgroup-depth", type=int, help="--cgroup 아래 몇 단계 하위 cgroup까지 각각 보고할지(노드 전체 컨테이너별 사용량) (linux)")
+	parser.add_argument("--fd-budget", type=int, help="프로세스/cgroup 테이블이 열어 둘 fd 수 상한(기본 256, RLIMIT_NOFILE soft의 1/8 이하) (linux)")
+	parser.add_argument("--push", type=str, help="에이전트 모드: 출력 대신 수집기(host:port, web/aggregator.py)로 바뀐 필드만 푸시 (linux)")
+	parser.add_argument("--push-batch", type=int, help="에이전트 모드에서 한 프레임에 묶어 보낼 샘플 수")
+	parser.add_argument("--host-name", type=str, help="에이전트 모드에서 보고할 호스트 이름(기본 hostname)")
+	parser.add_argument("--history-dir", type=str, help="수집한 모든 숫자 메트릭을 기록할 시계열 저장소 경로(1m/5m/1h 롤업 포함)")
 	parser.add_argument("--ping-samples", type=int, help="핑 지연 샘플 수 (redis)")
 	parser.add_argument("--ping-timeout-ms", type=int, help="핑 타임아웃(ms) (redis)")
+	parser.add_argument("--ping-rate-hz", type=float, help="백그라운드 연속 PING 측정 빈도(Hz), 0이면 수집 시에만 측정 (redis)")
+	parser.add_argument("--client-list-type", type=str, help="CLIENT LIST TYPE 필터(normal/replica/pubsub 등) (redis)")
+	parser.add_argument("--client-sample-every", type=int, help="CLIENT LIST 클라이언트별 분석 시 N번째 줄만 분석 (redis)")
+	parser.add_argument("--no-redis-pipeline", action="store_true", help="명령을 파이프라인 없이 하나씩 전송 (redis)")
+	parser.add_argument("--redis-cluster", action="store_true", help="CLUSTER NODES로 찾은 모든 노드를 병렬 수집 (redis, --redis-url은 쉼표로 여러 시드 가능)")
+	parser.add_argument("--redis-cluster-workers", type=int, help="클러스터 모드 동시 수집 노드 수 상한 (redis)")
+	parser.add_argument("--async", dest="async_driver", action="store_true", help="대상별 스레드 대신 이벤트 루프 하나로 수집(설정 파일의 targets 목록이 있으면 자동)")
+	parser.add_argument("--async-concurrency", type=int, help="이벤트 루프 드라이버의 동시 수집 대상 수 상한")
 	args = parser.parse_args()
 
 	config = load_config(args)
 	target = args.target or "redis"
-	if target == "redis":
-		collector = RedisMetricsCollector(
-			redis_url=config["redis_url"],
-			ping_samples=config["ping_samples"],
-			ping_timeout_ms=config["ping_timeout_ms"],
-		)
-	elif target == "linux":
-		collector = LinuxMetricsCollector()
-	elif target == "kafka":
-		_kafka_mod = SourceFileLoader(
-			"systools_kafka_collector", str(_Path(__file__).resolve().parent / "kafka" / "collector.py")
-		).load_module()
-		collector = _kafka_mod.KafkaMetricsCollector(
-			bootstrap_servers=args.kafka_bootstrap,
-			group_id=args.kafka_group,
-		)
-	elif target == "jvm":
-		collector = JvmMetricsCollector()
-	else:
-		raise ValueError(f"unknown target: {target}")
+	# SIGTERM도 SystemExit으로 바꿔 finally의 저장소 close(열린 청크 기록)가 실행되게 함
+	signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+	try:
+		targets = resolve_targets(config, target)
+	except ValueError as e:
+		parser.error(str(e))
+
+	# 시계열 저장소: 수집 결과의 모든 숫자 메트릭을 기록(종료 시 열린 청크 기록)
+	store = TimeSeriesStore(config["history_dir"]) if config["history_dir"] else None
+	record = (lambda name, metrics: metrics) if store is None else (lambda name, metrics: store.record(name, metrics))
+
+	if config["async"] or config["targets"]:
+		if config["push"]:
+			parser.error("--push does not support --async or targets")
+		try:
+			asyncio.run(run_async(targets, config, record))
+		except KeyboardInterrupt:
+			pass
+		finally:
+			if store is not None:
+				store.close()
+		return
 
+	collector = build_collector(target, config)
 	interval = int(config["interval"])
-	while True:
+	if config["push"]:
+		# 에이전트 모드: 누적 카운터는 원본 그대로 보내고 변화율은 수신 측(Prometheus 등)에서 계산
+		if target != "linux":
+			parser.error("--push supports --target linux only")
+		agent = PushAgent(
+			config["push"],
+			lambda: record(target, collector.collect_all()),
+			host=config["host_name"],
+			interval_s=interval if interval > 0 else 5,
+			batch=int(config["push_batch"]),
+		)
+		try:
+			agent.run()
+		except KeyboardInterrupt:
+			pass
+		finally:
+			agent.flush()
+			agent.close()
+			if store is not None:
+				store.close()
+		return
+
+	if interval <= 0:
 		try:
-			metrics = collector.collect_all()
+			metrics = record(target, collector.collect_all())
 			print_output(metrics, config["output"])
 		except Exception as e:
 			print(f"[WARN] collect failed: {e}", file=sys.stderr)
-		if interval <= 0:
-			break
-		time.sleep(interval)
+		finally:
+			if store is not None:
+				store.close()
+		return
 
+	# 수집은 백그라운드 샘플러가 interval 주기로 수행, 출력 루프는 새 스냅샷만 읽음
+	# 누적 카운터는 직전 샘플과 비교해 초당 변화율/구간 증가량(rates 섹션)으로 함께 출력
+	cache = SnapshotCache()
+	engine = RateEngine()
+	key = rate_key(target, config)
+	sampler = Sampler(target, lambda: record(target, engine.apply(key, collector.collect_all())), interval, cache)
+	sampler.start()
+	seq = 0
+	try:
+		while True:
+			snapshot = cache.wait_for(target, after_seq=seq)
+			if snapshot is None:
+				continue
+			seq = snapshot["seq"]
+			if snapshot["error"]:
+				print(f"[WARN] collect failed: {snapshot['error']}", file=sys.stderr)
+				continue
+			try:
+				print_output(snapshot["data"], config["output"])
+			except Exception as e:
+				print(f"[WARN] output failed: {e}", file=sys.stderr)
+	finally:
+		sampler.stop()
+		if store is not None:
+			store.close()
 
 if __name__ == "__main__":
 	main()
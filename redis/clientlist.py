@@ -0,0 +1,131 @@
+import heapq
+import re
+from typing import Any, Dict, List, Tuple
+
+
+# 샘플링 시 버퍼 합계는 줄 단위 분해 없이 전체 응답에서 바로 추출(입력: qbuf, 출력: obl + omem)
+QBUF_RE = re.compile(rb" qbuf=(\d+)")
+OBL_RE = re.compile(rb" obl=(\d+)")
+OMEM_RE = re.compile(rb" omem=(\d+)")
+# 분석에 쓰는 필드. 한 응답 안에서는 모든 줄의 필드 순서가 같으므로 첫 줄에서 위치를 정함
+FIELDS = (b"addr", b"name", b"qbuf", b"obl", b"omem", b"cmd")
+
+
+def _sum(pattern: re.Pattern, raw: bytes) -> int:
+	return sum(map(int, pattern.findall(raw)))
+
+
+def _layout(line: bytes) -> Dict[bytes, int] | None:
+	positions: Dict[bytes, int] = {}
+	for i, part in enumerate(line.split(b" ")):
+		key = part.split(b"=", 1)[0]
+		if key in FIELDS:
+			positions[key] = i
+	if not all(k in positions for k in (b"addr", b"qbuf", b"omem")):
+		return None
+	return positions
+
+
+def _fields_slow(line: bytes) -> Tuple[bytes, bytes, int, int, bytes]:
+	# 필드 순서가 다른 줄: key=value 전체 분해(드문 경로)
+	fields = dict(part.split(b"=", 1) for part in line.split(b" ") if b"=" in part)
+	out = int(fields.get(b"obl", 0) or 0) + int(fields.get(b"omem", 0) or 0)
+	return fields.get(b"addr", b""), fields.get(b"name", b""), int(fields.get(b"qbuf", 0) or 0), out, fields.get(b"cmd", b"")
+
+
+def _top_groups(groups: Dict[str, List[int]], limit: int) -> Dict[str, Dict[str, int]]:
+	# 출력 버퍼가 큰 순으로 limit개 그룹만 남김(수만 개 주소에서도 결과 크기 고정)
+	top = heapq.nlargest(limit, groups.items(), key=lambda kv: kv[1][1])
+	return {key: {"clients": v[0], "output_bytes": v[1], "input_bytes": v[2]} for key, v in top}
+
+
+def analyze_client_list(raw: bytes | None, top_k: int = 10, sample_every: int = 1) -> Dict[str, Any]:
+	# CLIENT LIST(바이트 응답)를 줄별 dict 생성 없이 분석: 첫 줄에서 정한 필드 위치로 필요한 값만 잘라냄
+	# - 합계/클라이언트 수는 항상 전체 기준
+	# - 출력 버퍼 = obl + omem, 입력 버퍼 = qbuf
+	# - top-K, name/host별 집계는 sample_every번째 줄만 분석(비용 상한)
+	result: Dict[str, Any] = {
+		"clients": 0,
+		"input_buffer_total": 0,
+		"output_buffer_total": 0,
+		"sample_every": max(1, int(sample_every)),
+		"top_output": [],
+		"by_name": {},
+		"by_host": {},
+	}
+	if not raw:
+		return result
+	if isinstance(raw, str):
+		raw = raw.encode()
+	result["clients"] = raw.count(b"\n") + (0 if raw.endswith(b"\n") else 1)
+	step = result["sample_every"]
+	lines = raw.split(b"\n")
+	if lines and not lines[-1]:
+		lines.pop()
+	if step > 1:
+		# 합계는 전체 기준, 클라이언트별 분석은 표본 줄만
+		result["input_buffer_total"] = _sum(QBUF_RE, raw)
+		result["output_buffer_total"] = _sum(OBL_RE, raw) + _sum(OMEM_RE, raw)
+		lines = lines[::step]
+	layout = _layout(lines[0]) if lines else None
+	if layout is not None:
+		i_addr = layout[b"addr"]
+		i_name = layout.get(b"name")
+		i_qbuf = layout[b"qbuf"]
+		i_obl = layout.get(b"obl")
+		i_omem = layout[b"omem"]
+		i_cmd = layout.get(b"cmd")
+		last = max(layout.values())
+	by_name: Dict[bytes, List[int]] = {}
+	by_host: Dict[bytes, List[int]] = {}
+	heap: List[Tuple[int, int, Tuple[bytes, bytes, int, int, bytes]]] = []
+	k = max(0, int(top_k))
+	total_in = total_out = 0
+	for seq, line in enumerate(lines):
+		parts = line.split(b" ", last + 1) if layout is not None else None
+		if parts is not None and len(parts) > last and parts[i_omem].startswith(b"omem="):
+			addr = parts[i_addr][5:]
+			name = parts[i_name][5:] if i_name is not None else b""
+			inp = int(parts[i_qbuf][5:])
+			out = int(parts[i_omem][5:]) + (int(parts[i_obl][4:]) if i_obl is not None else 0)
+			cmd = parts[i_cmd][4:] if i_cmd is not None else b""
+		else:
+			addr, name, inp, out, cmd = _fields_slow(line)
+		total_in += inp
+		total_out += out
+		if k:
+			if len(heap) < k:
+				heapq.heappush(heap, (out, seq, (addr, name, inp, out, cmd)))
+			elif out > heap[0][0]:
+				heapq.heapreplace(heap, (out, seq, (addr, name, inp, out, cmd)))
+		agg = by_name.get(name)
+		if agg is None:
+			agg = by_name[name] = [0, 0, 0]
+		agg[0] += 1
+		agg[1] += out
+		agg[2] += inp
+		host = addr.rsplit(b":", 1)[0]
+		agg = by_host.get(host)
+		if agg is None:
+			agg = by_host[host] = [0, 0, 0]
+		agg[0] += 1
+		agg[1] += out
+		agg[2] += inp
+	if step == 1:
+		result["input_buffer_total"] = total_in
+		result["output_buffer_total"] = total_out
+
+	result["top_output"] = [
+		{
+			"addr": addr.decode(errors="replace"),
+			"name": name.decode(errors="replace"),
+			"input_bytes": inp,
+			"output_bytes": out,
+			"cmd": cmd.decode(errors="replace") or None,
+		}
+		for _, _, (addr, name, inp, out, cmd) in sorted(heap, reverse=True)
+	]
+	limit = max(k, 1)
+	result["by_name"] = _top_groups({(n.decode(errors="replace") or "(none)"): v for n, v in by_name.items()}, limit)
+	result["by_host"] = _top_groups({h.decode(errors="replace"): v for h, v in by_host.items()}, limit)
+	return result
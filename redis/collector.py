@@ -1,3 +1,4 @@
+import asyncio
 import json
 import time
 from typing import Any, Dict, Tuple
@@ -6,12 +7,35 @@ import sys
 import sysconfig
 from pathlib import Path
 
+# 로컬 'redis' 패키지 모듈은 아래에서 site-packages redis-py로 교체되기 전에 import
+from redis.latency import LatencyHistogram, LatencyProbe
+from redis.clientlist import analyze_client_list
+
 
 class RedisMetricsCollector:
-	def __init__(self, redis_url: str, ping_samples: int = 3, ping_timeout_ms: int = 500):
+	def __init__(
+		self,
+		redis_url: str,
+		ping_samples: int = 3,
+		ping_timeout_ms: int = 500,
+		pipeline: bool = True,
+		latency_window_s: float = 60.0,
+		ping_rate_hz: float = 0.0,
+		client_top_k: int = 10,
+		client_sample_every: int = 1,
+		client_list_type: str | None = None,
+	):
 		self.redis_url = redis_url
 		self.ping_samples = max(1, int(ping_samples))
 		self.ping_timeout_ms = max(1, int(ping_timeout_ms))
+		# 지연 측정 외 명령을 한 번의 파이프라인 왕복으로 전송
+		self.pipeline = bool(pipeline)
+		# CLIENT LIST 분석: 상위 client_top_k개, sample_every번째 줄만 분석, TYPE 필터(normal/replica/pubsub 등)
+		self.client_top_k = max(0, int(client_top_k))
+		self.client_sample_every = max(1, int(client_sample_every))
+		self.client_list_type = client_list_type or None
+		# 서버가 cluster_enabled:0을 보고하면 이후 CLUSTER 명령은 보내지 않음(None: 아직 모름)
+		self._cluster_enabled: bool | None = None
 		# 외부 패키지 'redis'와 로컬 패키지명이 충돌하므로, site-packages에서 강제로 로드
 		site_purelib = sysconfig.get_paths().get("purelib")
 		restore = False
@@ -30,6 +54,7 @@ class RedisMetricsCollector:
 				sys.path.insert(0, site_purelib)
 				restore = True
 			redis_py = importlib.import_module("redis")
+			redis_aio = importlib.import_module("redis.asyncio")
 		finally:
 			if restore:
 				# site-packages를 임시로 앞에 둔 후 원복
@@ -38,6 +63,57 @@ class RedisMetricsCollector:
 				except Exception:
 					pass
 		self.client = redis_py.from_url(redis_url, decode_responses=True, socket_timeout=ping_timeout_ms / 1000.0)
+		# collect_all_async용 asyncio 클라이언트(연결이 이벤트 루프에 묶이므로 첫 사용 루프에서 생성)
+		self._redis_aio = redis_aio
+		self._aclient = None
+		self._aloop: asyncio.AbstractEventLoop | None = None
+		# CLIENT LIST는 디코딩 없이 바이트로 받아 스트리밍 파싱
+		self._never_decode = getattr(redis_py.client, "NEVER_DECODE", "NEVER_DECODE")
+		# PING 지연 분포: 최근 latency_window_s 구간의 고정 메모리 히스토그램, ping_rate_hz > 0이면 백그라운드 연속 측정
+		self.latency = LatencyHistogram(window_s=latency_window_s)
+		self._probe = LatencyProbe(
+			self.client.ping,
+			self.latency,
+			timeout_errors=(redis_py.exceptions.TimeoutError,),
+			rate_hz=ping_rate_hz,
+		)
+		self._probe.start()
+
+	def healthy(self) -> bool:
+		try:
+			return bool(self.client.ping())
+		except Exception:
+			return False
+
+	def close(self):
+		self._probe.stop()
+		try:
+			self.client.close()
+		except Exception:
+			pass
+		# asyncio 클라이언트는 루프 밖에서 닫을 수 없으므로 참조만 정리(루프 안에서는 close_async)
+		self._aclient = None
+
+	async def close_async(self):
+		self._probe.stop()
+		aclient, self._aclient = self._aclient, None
+		if aclient is not None and self._aloop is asyncio.get_running_loop():
+			try:
+				await aclient.aclose()
+			except Exception:
+				pass
+		try:
+			self.client.close()
+		except Exception:
+			pass
+
+	def _async_client(self):
+		# 다른 이벤트 루프(asyncio.run을 다시 호출 등)에서 쓰이면 새로 생성
+		loop = asyncio.get_running_loop()
+		if self._aclient is None or self._aloop is not loop:
+			self._aclient = self._redis_aio.from_url(self.redis_url, decode_responses=True, socket_timeout=self.ping_timeout_ms / 1000.0)
+			self._aloop = loop
+		return self._aclient
 
 	def _safe_get(self, dct: Dict[str, Any], key: str, default=None):
 		try:
@@ -45,82 +121,131 @@ class RedisMetricsCollector:
 		except Exception:
 			return default
 
-	def _measure_latency_ms(self) -> float:
-		# 간단한 라운드트립 PING으로 지연 측정 (샘플 평균)
+	def _measure_latency_ms(self) -> float | None:
+		# 간단한 라운드트립 PING으로 지연 측정 (이번 수집 샘플 평균, 히스토그램에도 기록)
+		# 타임아웃 샘플은 평균에서 빼고 별도 카운트, 전부 타임아웃이면 None
 		samples = []
 		for _ in range(self.ping_samples):
-			start = time.perf_counter()
-			self.client.ping()
-			elapsed_ms = (time.perf_counter() - start) * 1000.0
-			samples.append(elapsed_ms)
-		return sum(samples) / len(samples)
-
-	def _parse_client_buffers(self) -> Tuple[int, int]:
-		# CLIENT LIST를 파싱해 input/output buffer 추정 합계 계산
-		total_input = 0
-		total_output = 0
-		try:
-			raw = self.client.execute_command("CLIENT", "LIST")
-			# redis-py decode_responses=True → 문자열
-			for line in raw.splitlines():
-				# 필드는 key=value 형식
-				fields = {}
-				for part in line.split(" "):
-					if "=" in part:
-						k, v = part.split("=", 1)
-						fields[k] = v
-				# 버전에 따라 다름: qbuf(입력 대기), qbuf-free, obl/omem/obuf(출력)
-				# 가능한 필드를 최대한 합산
-				# 입력 추정
-				for k in ("qbuf", "ibl", "input_buffer_length"):
-					if k in fields:
-						try:
-							total_input += int(fields[k])
-						except Exception:
-							pass
-				# 출력 추정
-				for k in ("obuf", "omem", "obl", "output_buffer_length"):
-					if k in fields:
-						try:
-							total_output += int(fields[k])
-						except Exception:
-							pass
-		except Exception:
-			# 일부 버전/권한에서 실패 가능
-			pass
-		return total_input, total_output
+			elapsed_ms = self._probe.probe_once()
+			if elapsed_ms is not None:
+				samples.append(elapsed_ms)
+		return sum(samples) / len(samples) if samples else None
+
+	async def _measure_latency_ms_async(self) -> float | None:
+		ping = self._async_client().ping
+		samples = []
+		for _ in range(self.ping_samples):
+			elapsed_ms = await self._probe.probe_once_async(ping)
+			if elapsed_ms is not None:
+				samples.append(elapsed_ms)
+		return sum(samples) / len(samples) if samples else None
 
-	def _cluster_slots_stats(self) -> Tuple[int, int, int]:
+	def _cluster_slots_stats(self, state_map: Dict[str, str]) -> Tuple[int, int, int]:
 		# cluster_slots_assigned, cluster_slots_pfail, cluster_slots_fail
-		# CLUSTER SLOTS로 계산: assigned는 총 할당된 슬롯 수, pfail/fail은 CLUSTER NODES 기반이 일반적이나
-		# 간단화: SLOTS 출력 범위로 assigned 계산, pfail/fail은 CLUSTER INFO가 직접 제공하지 않아 0으로 처리
-		try:
-			slots = self.client.execute_command("CLUSTER", "SLOTS")
-			assigned = 0
-			for slot in slots:
-				start, end = slot[0], slot[1]
-				assigned += (end - start + 1)
-			# pfail/fail은 CLUSTER NODES 파싱이 필요하나 간단 구현에서는 0
-			return assigned, 0, 0
-		except Exception:
-			return 0, 0, 0
+		# CLUSTER INFO가 노드 관점의 슬롯 상태 수를 직접 제공(클러스터 비활성/조회 실패 시 0)
+		result = []
+		for key in ("cluster_slots_assigned", "cluster_slots_pfail", "cluster_slots_fail"):
+			try:
+				result.append(int(state_map.get(key, 0)))
+			except Exception:
+				result.append(0)
+		return result[0], result[1], result[2]
+
+	def _scrape_commands(self) -> list:
+		# (키, 명령 인자, 옵션) 목록. INFO(default)에 replication/cluster 섹션이 포함되므로 INFO는 한 번만 보냄
+		client_list = ("CLIENT", "LIST")
+		if self.client_list_type:
+			client_list += ("TYPE", self.client_list_type)
+		commands = [
+			("info", ("INFO",), {}),
+			("client_list", client_list, {self._never_decode: True}),
+			("malloc_stats", ("MEMORY", "MALLOC-STATS"), {}),
+		]
+		if self._cluster_enabled is not False:
+			commands.append(("cluster_info", ("CLUSTER", "INFO"), {}))
+		return commands
+
+	def _scrape(self) -> Dict[str, Any]:
+		# 명령별 응답, 실패한 명령은 Exception 객체로 남김(INFO 실패는 수집 실패로 전파)
+		commands = self._scrape_commands()
+		replies: Dict[str, Any] = {}
+		if self.pipeline:
+			pipe = self.client.pipeline(transaction=False)
+			for _, args, options in commands:
+				pipe.execute_command(*args, **options)
+			results = pipe.execute(raise_on_error=False)
+			for (key, _, _), result in zip(commands, results):
+				replies[key] = result
+		else:
+			for key, args, options in commands:
+				try:
+					replies[key] = self.client.execute_command(*args, **options)
+				except Exception as e:
+					replies[key] = e
+		return self._check_replies(replies)
+
+	async def _scrape_async(self) -> Dict[str, Any]:
+		client = self._async_client()
+		commands = self._scrape_commands()
+		replies: Dict[str, Any] = {}
+		if self.pipeline:
+			pipe = client.pipeline(transaction=False)
+			for _, args, options in commands:
+				pipe.execute_command(*args, **options)
+			results = await pipe.execute(raise_on_error=False)
+			for (key, _, _), result in zip(commands, results):
+				replies[key] = result
+		else:
+			for key, args, options in commands:
+				try:
+					replies[key] = await client.execute_command(*args, **options)
+				except Exception as e:
+					replies[key] = e
+		return self._check_replies(replies)
+
+	def _check_replies(self, replies: Dict[str, Any]) -> Dict[str, Any]:
+		if isinstance(replies["info"], Exception):
+			raise replies["info"]
+		if "cluster_enabled" in replies["info"]:
+			self._cluster_enabled = bool(replies["info"]["cluster_enabled"])
+		return replies
 
 	def collect_all(self) -> Dict[str, Dict[str, Any]]:
-		info_all = self.client.info()
-		server_now = int(time.time())
+		# 지연 측정은 파이프라인과 분리해 대량 응답 대기 시간이 섞이지 않게 먼저 수행
 		latency_ms = self._measure_latency_ms()
-		total_input_buf, total_output_buf = self._parse_client_buffers()
+		return self._build(latency_ms, self._scrape())
+
+	async def collect_all_async(self) -> Dict[str, Dict[str, Any]]:
+		# collect_all과 같은 결과를 asyncio 클라이언트로(스레드 없이 여러 대상을 한 루프에서 수집)
+		latency_ms = await self._measure_latency_ms_async()
+		return self._build(latency_ms, await self._scrape_async())
+
+	def _build(self, latency_ms: float | None, replies: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+		info_all = replies["info"]
+		server_now = int(time.time())
+		client_list = replies.get("client_list")
+		if isinstance(client_list, Exception):
+			client_list = None
+		clients = analyze_client_list(client_list, top_k=self.client_top_k, sample_every=self.client_sample_every)
+		total_input_buf = clients.pop("input_buffer_total")
+		total_output_buf = clients.pop("output_buffer_total")
 
 		# 성능
 		perf = {
 			"instantaneous_ops_per_sec": self._safe_get(info_all, "instantaneous_ops_per_sec"),
-			"latency_ms": round(latency_ms, 3),
+			"latency_ms": round(latency_ms, 3) if latency_ms is not None else None,
 			"total_commands_processed": self._safe_get(info_all, "total_commands_processed"),
 			"keyspace_hits": self._safe_get(info_all, "keyspace_hits"),
 			"keyspace_misses": self._safe_get(info_all, "keyspace_misses"),
 			"hit_rate": None,
 			"expired_keys": self._safe_get(info_all, "expired_keys"),
 		}
+		# 최근 window 구간 PING 지연 분포(백분위/최대/타임아웃 수)
+		dist = self.latency.snapshot()
+		for name in ("p50", "p90", "p99", "p999", "max"):
+			perf[f"latency_{name}_ms"] = dist[f"{name}_ms"]
+		perf["latency_samples"] = dist["count"]
+		perf["latency_timeouts"] = dist["timeouts"]
 		hits = perf["keyspace_hits"] or 0
 		misses = perf["keyspace_misses"] or 0
 		try:
@@ -139,11 +264,8 @@ class RedisMetricsCollector:
 			"allocator_stats": None,
 		}
 		# jemalloc allocator stats (있을 경우)
-		try:
-			mem_stats_raw = self.client.execute_command("MEMORY", "MALLOC-STATS")
-			mem["allocator_stats"] = mem_stats_raw
-		except Exception:
-			mem["allocator_stats"] = None
+		malloc_stats = replies.get("malloc_stats")
+		mem["allocator_stats"] = None if isinstance(malloc_stats, Exception) else malloc_stats
 
 		# 영속성
 		persist = {
@@ -161,6 +283,8 @@ class RedisMetricsCollector:
 			"input_buffer_length": total_input_buf if total_input_buf > 0 else None,
 			"output_buffer_length": total_output_buf if total_output_buf > 0 else None,
 		}
+		# CLIENT LIST 분석: 출력 버퍼 상위 클라이언트, name/host별 집계(TYPE 필터/샘플링 반영)
+		clients["list_type"] = self.client_list_type
 
 		# 시스템/CPU
 		system = {
@@ -179,29 +303,37 @@ class RedisMetricsCollector:
 			"cluster_slots_assigned": None,
 			"cluster_slots_pfail": None,
 			"cluster_slots_fail": None,
+			"cluster_current_epoch": None,
+			"cluster_known_nodes": None,
+			"role": self._safe_get(info_all, "role"),
+			"repl_offset": None,
 		}
-		# 복제 (replication)
-		try:
-			rep = self.client.info("replication")
-			cluster["master_link_status"] = rep.get("master_link_status")
-			cluster["master_last_io_seconds_ago"] = rep.get("master_last_io_seconds_ago")
-			if cluster["repl_backlog_size"] is None:
-				cluster["repl_backlog_size"] = rep.get("repl_backlog_size")
-		except Exception:
-			pass
+		# 복제 (replication): 첫 INFO 결과의 replication 섹션 재사용
+		cluster["master_link_status"] = self._safe_get(info_all, "master_link_status")
+		cluster["master_last_io_seconds_ago"] = self._safe_get(info_all, "master_last_io_seconds_ago")
+		# 복제 오프셋: 프라이머리는 master_repl_offset, 레플리카는 slave_repl_offset(프라이머리와의 차이가 복제 지연)
+		if cluster["role"] == "slave":
+			cluster["repl_offset"] = self._safe_get(info_all, "slave_repl_offset")
+		else:
+			cluster["repl_offset"] = self._safe_get(info_all, "master_repl_offset")
 		# 클러스터
+		state_map: Dict[str, str] = {}
 		try:
-			cinfo = self.client.execute_command("CLUSTER", "INFO")
+			cinfo = replies.get("cluster_info")
+			if cinfo is None or isinstance(cinfo, Exception):
+				raise ValueError("cluster info unavailable")
 			# 문자열 포맷을 파싱
-			state_map = {}
 			for line in cinfo.splitlines():
 				if ":" in line:
 					k, v = line.split(":", 1)
 					state_map[k.strip()] = v.strip()
 			cluster["cluster_state"] = state_map.get("cluster_state")
+			for key in ("cluster_current_epoch", "cluster_known_nodes"):
+				if key in state_map:
+					cluster[key] = int(state_map[key])
 		except Exception:
 			cluster["cluster_state"] = None
-		assigned, pfail, fail = self._cluster_slots_stats()
+		assigned, pfail, fail = self._cluster_slots_stats(state_map)
 		cluster["cluster_slots_assigned"] = assigned
 		cluster["cluster_slots_pfail"] = pfail
 		cluster["cluster_slots_fail"] = fail
@@ -211,6 +343,7 @@ class RedisMetricsCollector:
 			"memory": mem,
 			"persistence": persist,
 			"network": network,
+			"clients": clients,
 			"system": system,
 			"cluster": cluster,
 			"meta": {
@@ -0,0 +1,348 @@
+import asyncio
+import statistics
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from redis.collector import RedisMetricsCollector
+
+
+def parse_cluster_nodes(raw: str) -> List[Dict[str, Any]]:
+	# CLUSTER NODES: <id> <ip:port@cport[,hostname]> <flags> <master> <ping-sent> <pong-recv> <config-epoch> <link-state> <slot>...
+	nodes: List[Dict[str, Any]] = []
+	for line in (raw or "").splitlines():
+		parts = line.split()
+		if len(parts) < 8:
+			continue
+		addr = parts[1].split("@", 1)[0]
+		host, _, port = addr.rpartition(":")
+		flags = parts[2].split(",")
+		slots = 0
+		for token in parts[8:]:
+			# [slot->-id] 형태의 마이그레이션 표시는 제외
+			if token.startswith("["):
+				continue
+			if "-" in token:
+				start, end = token.split("-", 1)
+				slots += int(end) - int(start) + 1
+			else:
+				slots += 1
+		nodes.append({
+			"id": parts[0],
+			"host": host,
+			"port": int(port) if port.isdigit() else None,
+			"addr": addr,
+			"flags": flags,
+			"role": "primary" if "master" in flags else "replica",
+			"master_id": parts[3] if parts[3] != "-" else None,
+			"config_epoch": int(parts[6]) if parts[6].isdigit() else None,
+			"link_state": parts[7],
+			"slots": slots,
+		})
+	return nodes
+
+
+class RedisClusterCollector:
+	# CLUSTER NODES로 찾은 모든 프라이머리/레플리카를 max_workers 한도 내에서 병렬 수집하고 클러스터 롤업 계산
+	# 토폴로지(노드 목록, 노드별 collector)는 캐시하고, epoch/노드 수 변화 시에만 다시 조회
+	def __init__(
+		self,
+		seed_urls: List[str] | str,
+		max_workers: int = 16,
+		ping_samples: int = 1,
+		ping_timeout_ms: int = 500,
+		pipeline: bool = True,
+	):
+		self.seed_urls = [seed_urls] if isinstance(seed_urls, str) else list(seed_urls)
+		self.max_workers = max(1, int(max_workers))
+		self.ping_samples = ping_samples
+		self.ping_timeout_ms = ping_timeout_ms
+		self.pipeline = pipeline
+		self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="systools-redis-fanout")
+		self._lock = threading.Lock()
+		self._nodes: List[Dict[str, Any]] = []
+		self._collectors: Dict[str, RedisMetricsCollector] = {}
+		self._epoch: int | None = None
+		self._topology_at: float | None = None
+		# 직전 CLUSTER NODES가 보고한 전체 노드 수(noaddr/handshake 포함, cluster_known_nodes와 비교용)
+		self._reported_nodes = 0
+		self.topology_refreshes = 0
+
+	def _node_url(self, host: str, port: int) -> str:
+		# 시드 URL의 스킴/인증/DB는 유지하고 호스트:포트만 교체
+		seed = urlsplit(self.seed_urls[0])
+		userinfo = seed.netloc.rpartition("@")[0]
+		hostport = f"[{host}]:{port}" if ":" in host else f"{host}:{port}"
+		netloc = f"{userinfo}@{hostport}" if userinfo else hostport
+		return urlunsplit((seed.scheme or "redis", netloc, seed.path, seed.query, seed.fragment))
+
+	def _collector_for(self, addr: str, url: str) -> RedisMetricsCollector:
+		collector = self._collectors.get(addr)
+		if collector is None:
+			# 노드별 CLIENT LIST 상세 분석은 생략(합계만), 지연은 노드 수만큼 PING이 나가므로 샘플 수 최소화
+			collector = RedisMetricsCollector(
+				url,
+				self.ping_samples,
+				self.ping_timeout_ms,
+				pipeline=self.pipeline,
+				client_top_k=0,
+			)
+			self._collectors[addr] = collector
+		return collector
+
+	def _topology_candidates(self) -> List[Tuple[str, str]]:
+		# 알려진 노드 → 시드 순으로 CLUSTER NODES 조회
+		candidates: List[Tuple[str, str]] = [(addr, c.redis_url) for addr, c in self._collectors.items()]
+		for url in self.seed_urls:
+			parts = urlsplit(url)
+			candidates.append((f"{parts.hostname}:{parts.port or 6379}", url))
+		return candidates
+
+	def _refresh_topology(self):
+		last_error: Exception | None = None
+		for addr, url in self._topology_candidates():
+			try:
+				collector = self._collector_for(addr, url)
+				nodes = parse_cluster_nodes(collector.client.execute_command("CLUSTER", "NODES"))
+				if nodes:
+					break
+			except Exception as e:
+				last_error = e
+		else:
+			raise RuntimeError(f"cluster topology unavailable: {last_error}")
+		self._apply_topology(nodes)
+
+	async def _refresh_topology_async(self):
+		last_error: Exception | None = None
+		for addr, url in self._topology_candidates():
+			try:
+				collector = self._collector_for(addr, url)
+				nodes = parse_cluster_nodes(await collector._async_client().execute_command("CLUSTER", "NODES"))
+				if nodes:
+					break
+			except Exception as e:
+				last_error = e
+		else:
+			raise RuntimeError(f"cluster topology unavailable: {last_error}")
+		await self._apply_topology_async(nodes)
+
+	def _stale_collectors(self, nodes: List[Dict[str, Any]]) -> List[RedisMetricsCollector]:
+		# 클러스터에서 사라진 노드의 collector를 떼어 반환하고 나머지 노드로 토폴로지 갱신
+		known = {n["addr"] for n in nodes if n["port"] and "noaddr" not in n["flags"] and "handshake" not in n["flags"]}
+		stale = [self._collectors.pop(addr) for addr in list(self._collectors) if addr not in known]
+		for node in nodes:
+			if node["addr"] in known:
+				self._collector_for(node["addr"], self._node_url(node["host"], node["port"]))
+		self._nodes = [n for n in nodes if n["addr"] in known]
+		self._reported_nodes = len(nodes)
+		self._topology_at = time.monotonic()
+		self.topology_refreshes += 1
+		return stale
+
+	def _apply_topology(self, nodes: List[Dict[str, Any]]):
+		for collector in self._stale_collectors(nodes):
+			collector.close()
+
+	async def _apply_topology_async(self, nodes: List[Dict[str, Any]]):
+		for collector in self._stale_collectors(nodes):
+			await collector.close_async()
+
+	def _scrape_node(self, node: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any] | None, str | None]:
+		try:
+			return node, self._collectors[node["addr"]].collect_all(), None
+		except Exception as e:
+			return node, None, str(e)
+
+	async def _scrape_node_async(self, node: Dict[str, Any], limit: asyncio.Semaphore) -> Tuple[Dict[str, Any], Dict[str, Any] | None, str | None]:
+		async with limit:
+			try:
+				return node, await self._collectors[node["addr"]].collect_all_async(), None
+			except Exception as e:
+				return node, None, str(e)
+
+	def healthy(self) -> bool:
+		# 노드 하나라도 응답하면 재사용(개별 노드 장애는 수집 결과의 error로 보고)
+		# 워커 풀에서 병렬로 ping하고 처음 응답한 노드에서 끝냄. 죽은 노드가 섞여도 노드 수 x timeout이 아니라 데드라인 안에 판정
+		collectors = list(self._collectors.values())
+		if not collectors:
+			return True
+		pending = {self._executor.submit(c.healthy) for c in collectors}
+		deadline = time.monotonic() + max(self.ping_timeout_ms / 1000.0, 0.1) * 2
+		try:
+			while pending:
+				done, pending = wait(pending, timeout=max(deadline - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+				if not done:
+					return False
+				if any(f.result() for f in done):
+					return True
+			return False
+		finally:
+			for f in pending:
+				f.cancel()
+
+	def close(self):
+		with self._lock:
+			for collector in self._collectors.values():
+				collector.close()
+			self._collectors.clear()
+		self._executor.shutdown(wait=False, cancel_futures=True)
+
+	async def close_async(self):
+		collectors = list(self._collectors.values())
+		self._collectors.clear()
+		for collector in collectors:
+			await collector.close_async()
+		self._executor.shutdown(wait=False, cancel_futures=True)
+
+	def _topology_changed(self, results: List[Tuple[Dict[str, Any], Dict[str, Any] | None, str | None]]) -> bool:
+		# 토폴로지를 다시 볼 조건: 노드가 보고한 current_epoch 변화, cluster_known_nodes가 직전 CLUSTER NODES의 노드 수와 다름
+		# (수집 명령 INFO/CLIENT LIST 등은 키가 없어 MOVED/ASK로 리다이렉트되지 않으므로 조건에서 제외)
+		epochs = [d["cluster"]["cluster_current_epoch"] for _, d, _ in results if d and d["cluster"]["cluster_current_epoch"] is not None]
+		known = [d["cluster"]["cluster_known_nodes"] for _, d, _ in results if d and d["cluster"]["cluster_known_nodes"] is not None]
+		epoch = max(epochs) if epochs else None
+		changed = self._epoch is not None and epoch is not None and epoch != self._epoch
+		if known and max(known) != self._reported_nodes:
+			changed = True
+		if epoch is not None:
+			self._epoch = epoch
+		return changed
+
+	def collect_all(self) -> Dict[str, Dict[str, Any]]:
+		with self._lock:
+			if not self._nodes:
+				self._refresh_topology()
+			results = list(self._executor.map(self._scrape_node, self._nodes))
+			if self._topology_changed(results):
+				# 같은 수집 안에서 토폴로지를 갱신하고 노드 정보(역할/슬롯)를 새 목록 기준으로 다시 맞춤
+				# 이미 수집한 노드는 재사용, 새로 나타난 노드만 추가 수집
+				self._refresh_topology()
+				scraped = {node["addr"]: (data, error) for node, data, error in results}
+				missing = [n for n in self._nodes if n["addr"] not in scraped]
+				for node, data, error in self._executor.map(self._scrape_node, missing):
+					scraped[node["addr"]] = (data, error)
+				results = [(n,) + scraped[n["addr"]] for n in self._nodes]
+			return self._finish(results)
+
+	async def collect_all_async(self) -> Dict[str, Dict[str, Any]]:
+		# collect_all과 같은 흐름을 스레드 풀 대신 한 이벤트 루프에서(동시 요청 수는 max_workers로 제한)
+		# 같은 인스턴스를 동시에 수집하지 않는다는 전제(드라이버가 대상당 하나만 실행)로 잠금 없이 동작
+		limit = asyncio.Semaphore(self.max_workers)
+		if not self._nodes:
+			await self._refresh_topology_async()
+		results = list(await asyncio.gather(*(self._scrape_node_async(n, limit) for n in self._nodes)))
+		if self._topology_changed(results):
+			await self._refresh_topology_async()
+			scraped = {node["addr"]: (data, error) for node, data, error in results}
+			missing = [n for n in self._nodes if n["addr"] not in scraped]
+			for node, data, error in await asyncio.gather(*(self._scrape_node_async(n, limit) for n in missing)):
+				scraped[node["addr"]] = (data, error)
+			results = [(n,) + scraped[n["addr"]] for n in self._nodes]
+		return self._finish(results)
+
+	def _finish(self, results: List[Tuple[Dict[str, Any], Dict[str, Any] | None, str | None]]) -> Dict[str, Dict[str, Any]]:
+		rollup = self._rollup(results)
+		rollup["cluster"]["current_epoch"] = self._epoch
+		rollup["cluster"]["topology_age_s"] = round(time.monotonic() - self._topology_at, 1) if self._topology_at else None
+		rollup["cluster"]["topology_refreshes"] = self.topology_refreshes
+		return rollup
+
+	def _rollup(self, results: List[Tuple[Dict[str, Any], Dict[str, Any] | None, str | None]]) -> Dict[str, Dict[str, Any]]:
+		per_node: Dict[str, Dict[str, Any]] = {}
+		by_id: Dict[str, Dict[str, Any]] = {}
+		for node, data, error in results:
+			entry: Dict[str, Any] = {
+				"role": node["role"],
+				"primary": None,
+				"slots": node["slots"],
+				"flags": ",".join(node["flags"]),
+				"error": error,
+			}
+			if data:
+				entry.update({
+					"ops_per_sec": data["performance"]["instantaneous_ops_per_sec"],
+					# 누적 카운터(rates 섹션의 노드별 변화율용)
+					"total_commands_processed": data["performance"]["total_commands_processed"],
+					"keyspace_hits": data["performance"]["keyspace_hits"],
+					"keyspace_misses": data["performance"]["keyspace_misses"],
+					"expired_keys": data["performance"]["expired_keys"],
+					"evicted_keys": data["memory"]["evicted_keys"],
+					"latency_ms": data["performance"]["latency_ms"],
+					"used_memory": data["memory"]["used_memory"],
+					"connected_clients": data["network"]["connected_clients"],
+					"repl_offset": data["cluster"]["repl_offset"],
+					"master_link_status": data["cluster"]["master_link_status"],
+					"master_last_io_seconds_ago": data["cluster"]["master_last_io_seconds_ago"],
+					"cluster_state": data["cluster"]["cluster_state"],
+					"cluster_slots_pfail": data["cluster"]["cluster_slots_pfail"],
+					"cluster_slots_fail": data["cluster"]["cluster_slots_fail"],
+				})
+			per_node[node["addr"]] = entry
+			by_id[node["id"]] = {"node": node, "entry": entry}
+
+		# 레플리카 복제 지연: 프라이머리 master_repl_offset - 레플리카 slave_repl_offset
+		replica_lags: List[int] = []
+		for item in by_id.values():
+			node, entry = item["node"], item["entry"]
+			if node["role"] != "replica":
+				continue
+			primary = by_id.get(node["master_id"] or "")
+			if primary is None:
+				continue
+			entry["primary"] = primary["node"]["addr"]
+			p_off, r_off = primary["entry"].get("repl_offset"), entry.get("repl_offset")
+			if isinstance(p_off, int) and isinstance(r_off, int):
+				entry["replica_lag_bytes"] = max(p_off - r_off, 0)
+				replica_lags.append(entry["replica_lag_bytes"])
+
+		reachable = [e for e in per_node.values() if e["error"] is None]
+		primaries = [e for e in per_node.values() if e["role"] == "primary"]
+		primary_mem = [e["used_memory"] for e in primaries if isinstance(e.get("used_memory"), int)]
+		mem_mean = statistics.fmean(primary_mem) if primary_mem else None
+		states = {e.get("cluster_state") for e in reachable}
+		# 슬롯 상태는 노드마다 보는 관점이 다를 수 있어 가장 나쁜 관점(최대값)을 채택
+		pfail = max((e.get("cluster_slots_pfail") or 0 for e in reachable), default=None)
+		fail = max((e.get("cluster_slots_fail") or 0 for e in reachable), default=None)
+		lag_io = [e["master_last_io_seconds_ago"] for e in reachable if e["role"] == "replica" and isinstance(e.get("master_last_io_seconds_ago"), int)]
+
+		return {
+			"cluster": {
+				"nodes": len(per_node),
+				"primaries": len(primaries),
+				"replicas": len(per_node) - len(primaries),
+				"nodes_unreachable": len(per_node) - len(reachable),
+				"cluster_state": "ok" if states == {"ok"} else ("fail" if "fail" in states else None),
+				"current_epoch": None,
+				"topology_age_s": None,
+				"topology_refreshes": None,
+			},
+			"performance": {
+				"total_ops_per_sec": sum(e.get("ops_per_sec") or 0 for e in reachable),
+				"max_latency_ms": max((e["latency_ms"] for e in reachable if e.get("latency_ms") is not None), default=None),
+			},
+			"memory": {
+				"used_memory_total": sum(e.get("used_memory") or 0 for e in reachable),
+				"primary_used_memory_min": min(primary_mem) if primary_mem else None,
+				"primary_used_memory_max": max(primary_mem) if primary_mem else None,
+				"primary_used_memory_mean": round(mem_mean) if mem_mean is not None else None,
+				# 샤드 간 메모리 편차: 최대 / 평균 (1.0이면 균등)
+				"memory_skew_ratio": round(max(primary_mem) / mem_mean, 3) if primary_mem and mem_mean else None,
+			},
+			"slots": {
+				"assigned": sum(e["slots"] for e in primaries),
+				"pfail": pfail,
+				"fail": fail,
+			},
+			"replication": {
+				"max_replica_lag_bytes": max(replica_lags) if replica_lags else None,
+				"max_master_last_io_seconds_ago": max(lag_io) if lag_io else None,
+				"replicas_link_down": sum(1 for e in reachable if e["role"] == "replica" and e.get("master_link_status") not in (None, "up")),
+			},
+			"nodes": per_node,
+			"meta": {
+				"timestamp": int(time.time()),
+				"redis_url": self.seed_urls[0],
+				"mode": "cluster",
+			},
+		}
@@ -0,0 +1,164 @@
+import math
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+
+PERCENTILES = (("p50", 0.50), ("p90", 0.90), ("p99", 0.99), ("p999", 0.999))
+
+
+class LatencyHistogram:
+	# 로그 버킷(옥타브당 sub_buckets개, 상대 오차 ~4%) 고정 메모리 히스토그램
+	# 시간 슬롯 링으로 관리해 최근 window_s 구간의 분포만 보고
+	def __init__(self, window_s: float = 60.0, slots: int = 6, sub_buckets: int = 8, max_ms: float = 60000.0):
+		self.window_s = max(1.0, float(window_s))
+		self.slots = max(1, int(slots))
+		self.sub_buckets = max(1, int(sub_buckets))
+		self._slot_s = self.window_s / self.slots
+		# 버킷 0: 1us 미만, 버킷 i: [2^((i-1)/sub), 2^(i/sub)) us
+		self._nbuckets = int(math.ceil(math.log2(max(max_ms, 0.002) * 1000.0) * self.sub_buckets)) + 2
+		self._counts: List[List[int]] = [[0] * self._nbuckets for _ in range(self.slots)]
+		self._timeouts = [0] * self.slots
+		self._errors = [0] * self.slots
+		self._max_ms = [0.0] * self.slots
+		self._epochs = [-1] * self.slots
+		self._lock = threading.Lock()
+
+	def _slot(self, now: float) -> int:
+		epoch = int(now // self._slot_s)
+		idx = epoch % self.slots
+		if self._epochs[idx] != epoch:
+			# 오래된 슬롯 재사용
+			counts = self._counts[idx]
+			for i in range(self._nbuckets):
+				counts[i] = 0
+			self._timeouts[idx] = 0
+			self._errors[idx] = 0
+			self._max_ms[idx] = 0.0
+			self._epochs[idx] = epoch
+		return idx
+
+	def _bucket(self, ms: float) -> int:
+		us = ms * 1000.0
+		if us < 1.0:
+			return 0
+		return min(self._nbuckets - 1, int(math.log2(us) * self.sub_buckets) + 1)
+
+	def _bucket_value_ms(self, idx: int) -> float:
+		# 버킷의 기하 중앙값
+		if idx == 0:
+			return 0.0005
+		return 2 ** ((idx - 0.5) / self.sub_buckets) / 1000.0
+
+	def record(self, ms: float, now: float | None = None):
+		with self._lock:
+			idx = self._slot(time.monotonic() if now is None else now)
+			self._counts[idx][self._bucket(ms)] += 1
+			if ms > self._max_ms[idx]:
+				self._max_ms[idx] = ms
+
+	def record_timeout(self, now: float | None = None):
+		with self._lock:
+			self._timeouts[self._slot(time.monotonic() if now is None else now)] += 1
+
+	def record_error(self, now: float | None = None):
+		with self._lock:
+			self._errors[self._slot(time.monotonic() if now is None else now)] += 1
+
+	def snapshot(self, now: float | None = None) -> Dict[str, Any]:
+		now = time.monotonic() if now is None else now
+		current = int(now // self._slot_s)
+		merged = [0] * self._nbuckets
+		timeouts = errors = 0
+		max_ms = 0.0
+		with self._lock:
+			for idx in range(self.slots):
+				if self._epochs[idx] <= current - self.slots:
+					continue
+				for i, c in enumerate(self._counts[idx]):
+					if c:
+						merged[i] += c
+				timeouts += self._timeouts[idx]
+				errors += self._errors[idx]
+				max_ms = max(max_ms, self._max_ms[idx])
+		count = sum(merged)
+		result: Dict[str, Any] = {"count": count, "timeouts": timeouts, "errors": errors}
+		for name, _ in PERCENTILES:
+			result[f"{name}_ms"] = None
+		result["max_ms"] = round(max_ms, 3) if count else None
+		if count == 0:
+			return result
+		targets = [(name, max(1, math.ceil(q * count))) for name, q in PERCENTILES]
+		seen = 0
+		t = 0
+		for i, c in enumerate(merged):
+			if not c:
+				continue
+			seen += c
+			while t < len(targets) and seen >= targets[t][1]:
+				# 버킷 대표값이 관측 최대값을 넘지 않도록 제한
+				result[f"{targets[t][0]}_ms"] = round(min(self._bucket_value_ms(i), max_ms), 3)
+				t += 1
+			if t >= len(targets):
+				break
+		return result
+
+
+class LatencyProbe:
+	# PING 지연을 측정해 히스토그램에 기록. 타임아웃은 예외 대신 별도 카운트
+	# rate_hz > 0이면 백그라운드에서 연속 측정
+	def __init__(self, ping: Callable[[], Any], histogram: LatencyHistogram, timeout_errors: tuple = (), rate_hz: float = 0.0):
+		self.ping = ping
+		self.histogram = histogram
+		self.timeout_errors = tuple(timeout_errors)
+		self.rate_hz = max(0.0, float(rate_hz))
+		self._stop = threading.Event()
+		self._thread: threading.Thread | None = None
+
+	def probe_once(self) -> float | None:
+		# 성공 시 지연(ms), 타임아웃 시 None. 그 외 오류는 호출자에게 전파
+		start = time.perf_counter()
+		try:
+			self.ping()
+		except self.timeout_errors:
+			self.histogram.record_timeout()
+			return None
+		elapsed_ms = (time.perf_counter() - start) * 1000.0
+		self.histogram.record(elapsed_ms)
+		return elapsed_ms
+
+	async def probe_once_async(self, ping: Callable[[], Awaitable[Any]]) -> float | None:
+		# probe_once의 asyncio 버전(ping은 코루틴 함수)
+		start = time.perf_counter()
+		try:
+			await ping()
+		except self.timeout_errors:
+			self.histogram.record_timeout()
+			return None
+		elapsed_ms = (time.perf_counter() - start) * 1000.0
+		self.histogram.record(elapsed_ms)
+		return elapsed_ms
+
+	def start(self):
+		if self.rate_hz <= 0 or self._thread is not None:
+			return
+		self._thread = threading.Thread(target=self._run, name="systools-redis-latency", daemon=True)
+		self._thread.start()
+
+	def stop(self):
+		self._stop.set()
+
+	def _run(self):
+		period = 1.0 / self.rate_hz
+		next_at = time.monotonic()
+		while not self._stop.is_set():
+			try:
+				self.probe_once()
+			except Exception:
+				# 연결 오류 등은 별도 카운트 후 다음 주기에 재시도
+				self.histogram.record_error()
+			next_at += period
+			now = time.monotonic()
+			if next_at < now:
+				next_at = now
+			self._stop.wait(next_at - now)
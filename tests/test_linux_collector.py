@@ -0,0 +1,38 @@
+from linux.collector import DISK_IO_KEYS, VMSTAT_RATES, LinuxMetricsCollector
+
+
+def make_collector():
+	return LinuxMetricsCollector(process_top_n=0)
+
+
+def test_vmstat_missing_counters_are_none():
+	c = make_collector()
+	try:
+		prev = {"vmstat": {"pgfault": 100}}
+		cur = {"vmstat": {"pgfault": 300}}
+		section = c._vmstat(prev, cur, 2.0)
+		assert set(section) == {name for _, name in VMSTAT_RATES} | {"oom_kill_total"}
+		assert section["pgfault_per_sec"] == 100.0
+		assert section["allocstall_per_sec"] is None
+		assert section["oom_kill_total"] is None
+	finally:
+		c.close()
+
+
+def test_disk_io_keeps_device_keys():
+	c = make_collector()
+	try:
+		old = [10, 0, 80, 5, 20, 0, 160, 10, 1, 500, 700]
+		new = [30, 0, 240, 25, 40, 0, 320, 30, 2, 1500, 2700]
+		devices = c._disk_io({"disk": {"sda": old}}, {"disk": {"sda": new, "sdb": new, "short": new[:4]}}, 2.0)
+		assert devices["sda"]["reads_per_sec"] == 10.0
+		assert devices["sda"]["read_bytes_per_sec"] == 160 * 512 / 2.0
+		assert devices["sda"]["util_percent"] == 50.0
+		# 첫 수집 장치와 카운터가 모자란 장치도 키는 모두 있고 값만 None
+		for name in ("sdb", "short"):
+			assert set(devices[name]) == {"in_flight", *DISK_IO_KEYS}
+			assert devices[name]["reads_per_sec"] is None
+		assert devices["sdb"]["in_flight"] == 2
+		assert devices["short"]["in_flight"] is None
+	finally:
+		c.close()
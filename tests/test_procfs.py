@@ -0,0 +1,80 @@
+import os
+
+import pytest
+
+from linux import procfs
+from linux.procfs import ProcFile
+
+
+def test_read_seq_file_longer_than_page():
+	# smaps는 seq_file이라 pread 한 번에 한 페이지 정도만 돌려줌
+	if not os.path.exists("/proc/self/smaps"):
+		pytest.skip("no /proc/self/smaps")
+	f = ProcFile("/proc/self/smaps", 512)
+	try:
+		n = f.read()
+		assert n > os.sysconf("SC_PAGE_SIZE")
+		assert f.length == n
+		# 마지막 매핑 블록까지 읽혔는지(각 블록은 VmFlags 줄로 끝남)
+		assert bytes(f.view()[:n]).rstrip(b"\n").rsplit(b"\n", 1)[-1].startswith(b"VmFlags:")
+	finally:
+		f.close()
+
+
+def test_read_continues_after_short_reads(tmp_path, monkeypatch):
+	data = b"".join(b"line %05d\n" % i for i in range(1000))
+	path = tmp_path / "big"
+	path.write_bytes(data)
+	real_preadv = os.preadv
+	calls = []
+
+	def short_preadv(fd, buffers, offset):
+		# 한 번에 최대 100바이트만 돌려주는 seq_file 흉내
+		calls.append(offset)
+		return real_preadv(fd, [memoryview(buffers[0])[:100]], offset)
+
+	monkeypatch.setattr(procfs.os, "preadv", short_preadv)
+	f = ProcFile(str(path), 64)
+	try:
+		assert f.read() == len(data)
+		assert bytes(f.view()[:f.length]) == data
+		assert calls[0] == 0 and calls[-1] == len(data)
+		# 두 번째 읽기는 늘어난 버퍼를 그대로 재사용
+		size = len(f.buf)
+		assert f.read() == len(data)
+		assert len(f.buf) == size
+	finally:
+		f.close()
+
+
+def test_read_missing_file_returns_zero(tmp_path):
+	f = ProcFile(str(tmp_path / "missing"))
+	assert f.read() == 0
+	assert f.length == 0
+
+
+def test_read_vmstat_keys_past_first_page(tmp_path, monkeypatch):
+	# 관심 카운터가 첫 페이지 뒤에 있어도 합산·파싱되어야 함
+	filler = b"".join(b"nr_filler_%04d %d\n" % (i, i) for i in range(400))
+	(tmp_path / "vmstat").write_bytes(b"nr_free_pages 1\n" + filler + b"pgfault 42\npgscan_direct_dma 1\npgscan_direct_normal 2\noom_kill 3\n")
+	real_preadv = os.preadv
+	monkeypatch.setattr(procfs.os, "preadv", lambda fd, buffers, offset: real_preadv(fd, [memoryview(buffers[0])[:4096]], offset))
+	reader = procfs.ProcReader(str(tmp_path))
+	try:
+		assert reader.read_vmstat() == {"pgfault": 42, "pgscan_direct": 3, "oom_kill": 3}
+	finally:
+		reader.close()
+
+
+def test_fd_budget_shared_between_tables(tmp_path):
+	budget = procfs.FdBudget(4)
+	assert budget.acquire(3)
+	assert not budget.acquire(2)
+	assert budget.acquire(1)
+	budget.release(3)
+	assert budget.used == 1
+	# 상한을 줄여도 이미 잡은 fd는 그대로, 새 acquire만 막힘
+	budget.set_limit(1)
+	assert not budget.acquire()
+	budget.release(5)
+	assert budget.used == 0
@@ -0,0 +1,65 @@
+from linux.procfs import FdBudget
+from linux.procs import ProcessTable
+
+
+def write_stat(root, pid, utime, starttime=1000):
+	fields = ["0"] * 40
+	fields[0] = "S"
+	fields[11] = str(utime)
+	fields[17] = "1"
+	fields[19] = str(starttime)
+	fields[21] = "100"
+	(root / str(pid)).mkdir(exist_ok=True)
+	(root / str(pid) / "stat").write_text(f"{pid} (worker {pid}) " + " ".join(fields) + "\n")
+
+
+def make_root(tmp_path, pids):
+	(tmp_path / "self" / "fd").mkdir(parents=True)
+	(tmp_path / "loadavg").write_text(f"0.00 0.00 0.00 1/{len(pids)} {max(pids)}\n")
+	for pid in pids:
+		write_stat(tmp_path, pid, 0)
+	return tmp_path
+
+
+def test_idle_process_turning_busy_shows_up_within_max_skip(tmp_path):
+	pids = list(range(100, 120))
+	root = make_root(tmp_path, pids)
+	table = ProcessTable(str(root), top_n=3, fd_budget=FdBudget(64))
+	try:
+		# 오래 유휴 → 최대 간격까지 밀림
+		for _ in range(30):
+			table.sample()
+		assert table.sample()["top_cpu"] == {}
+		# 5초 주기에서 20초 안(4틱)에 top_cpu에 나타나야 함
+		for pid in pids:
+			write_stat(root, pid, 500)
+			for _ in range(4):
+				if f"worker {pid}[{pid}]" in table.sample()["top_cpu"]:
+					break
+			else:
+				raise AssertionError(f"pid {pid} not in top_cpu after 4 ticks")
+			# 다시 유휴로
+			for _ in range(8):
+				table.sample()
+	finally:
+		table.close()
+
+
+def test_process_gone_releases_fd_budget(tmp_path):
+	pids = [200, 201, 202]
+	root = make_root(tmp_path, pids)
+	budget = FdBudget(2)
+	table = ProcessTable(str(root), fd_budget=budget)
+	try:
+		table.sample()
+		scan = table.sample()["scan"]
+		assert scan["open_fds"] == 2 and budget.used == 2
+		(root / "201" / "stat").unlink()
+		(root / "201").rmdir()
+		(root / "loadavg").write_text("0.00 0.00 0.00 1/2 202\n")
+		table.sample()
+		assert 201 not in table.entries
+		assert budget.used == table._open_fds
+	finally:
+		table.close()
+	assert budget.used == 0
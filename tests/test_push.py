@@ -0,0 +1,134 @@
+import asyncio
+import math
+
+import pytest
+
+from core.push import (
+	FRAME_BATCH,
+	FRAME_HELLO,
+	MAGIC,
+	DeltaDecoder,
+	DeltaEncoder,
+	encode_frame,
+	flatten_fields,
+	hello_frame,
+	new_compressor,
+	new_decompressor,
+	read_frame,
+	read_varint,
+	unflatten_fields,
+	unzigzag,
+	write_varint,
+	zigzag,
+)
+
+
+def same(a, b):
+	# NaN은 자기 자신과 같지 않으므로 따로 비교, 1 / 1.0 / True는 타입까지 같아야 함
+	if isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b):
+		return True
+	return type(a) is type(b) and a == b
+
+
+def assert_state(state, expected):
+	assert set(state) == set(expected)
+	for key, value in expected.items():
+		assert same(state[key], value), (key, state[key], value)
+
+
+@pytest.mark.parametrize("n", [0, 1, -1, 63, -64, 127, 128, 300, -300, 2 ** 31, -(2 ** 31), 2 ** 63 - 1, -(2 ** 63), 2 ** 70])
+def test_varint_zigzag_round_trip(n):
+	out = bytearray()
+	write_varint(out, zigzag(n))
+	value, pos = read_varint(bytes(out), 0)
+	assert pos == len(out)
+	assert unzigzag(value) == n
+
+
+def test_flatten_unflatten_round_trip():
+	data = {"system": {"cpu": 1.5, "name": "host"}, "disk": {"/": {"used": 10}, "/var": {"used": 20}}, "list": [1, 2], "empty": None}
+	fields = flatten_fields(data)
+	assert all(not isinstance(v, dict) for v in fields.values())
+	assert unflatten_fields(fields) == data
+
+
+def test_delta_round_trip_across_samples():
+	encoder, decoder = DeltaEncoder(), DeltaDecoder()
+	samples = [
+		{"a": 1, "b": 0.5, "c": "x", "d": None, "e": True, "f": [1, "two"], "g": 1e300},
+		# 정수 증가, 타입 변경(int → float, float → int, bool → int), 값 유지
+		{"a": 5, "b": 2, "c": "x", "d": None, "e": 1, "f": [1, "two"], "g": 1.0},
+		# 필드 삭제와 새 필드, 음수·소수·비유한 값
+		{"a": -(2 ** 40), "b": -0.001, "h": float("inf"), "i": float("nan"), "j": -0.0, "k": 0.1 + 0.2},
+		{"a": -(2 ** 40), "b": -0.001, "h": float("-inf"), "i": float("nan"), "j": -0.0, "k": 123456.789012},
+	]
+	ts = 1700000000.0
+	for i, fields in enumerate(samples):
+		payload = encoder.encode_batch([(ts + i * 5, fields)])
+		times = decoder.decode_batch(payload)
+		assert times == [ts + i * 5]
+		assert_state(decoder.state, fields)
+	assert math.copysign(1.0, decoder.state["j"]) < 0
+
+
+def test_delta_batch_and_reset():
+	encoder, decoder = DeltaEncoder(), DeltaDecoder()
+	batch = [(100.0 + i, {"n": i * 1000, "x": i / 4}) for i in range(10)]
+	times = decoder.decode_batch(encoder.encode_batch(batch))
+	assert times == [t for t, _ in batch]
+	assert_state(decoder.state, batch[-1][1])
+	# 재연결: 인코더를 비우면 새 디코더가 전체 상태를 다시 받음
+	encoder.reset()
+	fresh = DeltaDecoder()
+	fresh.decode_batch(encoder.encode_batch([(200.0, {"n": 7, "x": 0.25})]))
+	assert_state(fresh.state, {"n": 7, "x": 0.25})
+
+
+def test_unchanged_fields_are_not_resent():
+	encoder = DeltaEncoder()
+	fields = {f"metric{i}": i for i in range(50)}
+	first = encoder.encode_batch([(1.0, fields)])
+	second = encoder.encode_batch([(2.0, fields)])
+	assert len(second) < 8 < len(first)
+
+
+def test_trailing_bytes_rejected():
+	payload = DeltaEncoder().encode_batch([(1.0, {"a": 1})])
+	with pytest.raises(ValueError):
+		DeltaDecoder().decode_batch(payload + b"\x00")
+
+
+def read_frames(data: bytes, decompressor, limit=None):
+	async def run():
+		reader = asyncio.StreamReader()
+		reader.feed_data(data)
+		reader.feed_eof()
+		assert await reader.readexactly(len(MAGIC)) == MAGIC
+		frames = [await read_frame(reader)]
+		while not reader.at_eof():
+			kwargs = {"limit": limit} if limit is not None else {}
+			frames.append(await read_frame(reader, decompressor, **kwargs))
+		return frames
+	return asyncio.run(run())
+
+
+def test_frames_round_trip_through_deflate_stream():
+	compressor, decompressor = new_compressor(), new_decompressor()
+	encoder, decoder = DeltaEncoder(), DeltaDecoder()
+	samples = [(10.0 + i, {"cpu": round(i * 0.37, 2), "rx": 1000 * i, "host": "web-1"}) for i in range(5)]
+	wire = hello_frame("web-1", "linux", 5.0)
+	for sample in samples:
+		wire += encode_frame(FRAME_BATCH, encoder.encode_batch([sample]), compressor)
+	frames = read_frames(wire, decompressor)
+	assert frames[0][0] == FRAME_HELLO
+	assert [kind for kind, _, _ in frames[1:]] == [FRAME_BATCH] * len(samples)
+	assert sum(size for _, _, size in frames) == len(wire) - len(MAGIC)
+	for _, payload, _ in frames[1:]:
+		decoder.decode_batch(payload)
+	assert_state(decoder.state, samples[-1][1])
+
+
+def test_oversized_frame_rejected():
+	wire = hello_frame("h", "linux", 5.0) + encode_frame(FRAME_BATCH, b"x" * 100)
+	with pytest.raises(ValueError):
+		read_frames(wire, new_decompressor(), limit=50)
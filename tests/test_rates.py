@@ -0,0 +1,87 @@
+import pytest
+
+from core.rates import COUNTERS, RateEngine, counter_delta, iter_paths
+
+
+def test_counter_delta_increase_wrap_and_reset():
+	width = 1 << 32
+	assert counter_delta(100, 250, width) == 150
+	# 상위 1/4에서 하위 1/4로: wraparound
+	assert counter_delta(width - 10, 5, width) == 15
+	# 그 외 감소: 재시작, 재시작 이후 누적분만
+	assert counter_delta(1000, 40, width) == 40
+	assert counter_delta(width - 10, width // 2, width) == width // 2
+
+
+def test_iter_paths_expands_wildcards():
+	data = {"network": {"interfaces": {"eth0": {"rx_bytes": 1}, "lo": {"rx_bytes": 2}, "bad": 3}}}
+	assert dict(iter_paths(data, "network.interfaces.*.rx_bytes")) == {
+		"network.interfaces.eth0.rx_bytes": 1,
+		"network.interfaces.lo.rx_bytes": 2,
+	}
+	assert list(iter_paths(data, "missing.*.x")) == []
+
+
+def redis_metrics(commands, hits, misses):
+	return {
+		"performance": {"total_commands_processed": commands, "keyspace_hits": hits, "keyspace_misses": misses},
+		"memory": {"evicted_keys": 0},
+	}
+
+
+def test_first_sample_has_no_rates_then_per_sec_and_ratio():
+	engine = RateEngine()
+	first = engine.apply("redis", redis_metrics(1000, 10, 0), at=100.0)
+	assert first["rates"] == {"interval_s": None, "per_sec": {}, "delta": {}, "ratio": {}}
+	# 원본 dict는 바꾸지 않음
+	assert "rates" not in redis_metrics(1000, 10, 0)
+	rates = engine.apply("redis", redis_metrics(1500, 40, 10), at=105.0)["rates"]
+	assert rates["interval_s"] == 5.0
+	assert rates["delta"]["performance.total_commands_processed"] == 500
+	assert rates["per_sec"]["performance.total_commands_processed"] == 100.0
+	assert rates["ratio"]["performance.hit_rate"] == 0.75
+	# 구간 내 조회가 없으면 비율은 None
+	rates = engine.apply("redis", redis_metrics(1600, 40, 10), at=110.0)["rates"]
+	assert rates["ratio"]["performance.hit_rate"] is None
+
+
+def test_reset_and_wrap_per_target_width():
+	engine = RateEngine()
+	engine.apply("redis", redis_metrics(5000, 0, 0), at=0.0)
+	# 재시작(카운터 감소): 재시작 이후 값을 증가량으로
+	rates = engine.apply("redis", redis_metrics(300, 0, 0), at=10.0)["rates"]
+	assert rates["delta"]["performance.total_commands_processed"] == 300
+	engine = RateEngine(widths={"linux": 1 << 32})
+	engine.apply("linux", {"network": {"rx_bytes_total": (1 << 32) - 100}}, at=0.0)
+	rates = engine.apply("linux", {"network": {"rx_bytes_total": 50}}, at=1.0)["rates"]
+	assert rates["delta"]["network.rx_bytes_total"] == 150
+
+
+def test_non_advancing_clock_and_new_paths():
+	engine = RateEngine()
+	engine.apply("linux", {"network": {"interfaces": {"eth0": {"rx_bytes": 10}}}}, at=5.0)
+	assert engine.apply("linux", {"network": {"interfaces": {"eth0": {"rx_bytes": 20}}}}, at=5.0)["rates"]["interval_s"] is None
+	rates = engine.apply("linux", {"network": {"interfaces": {"eth0": {"rx_bytes": 30}, "eth1": {"rx_bytes": 7}}}}, at=6.0)["rates"]
+	# 직전 샘플에 없던 경로(새 인터페이스)는 다음 샘플부터
+	assert rates["delta"] == {"network.interfaces.eth0.rx_bytes": 10}
+
+
+def test_bools_and_strings_are_not_counters():
+	engine = RateEngine(counters={"x": ("a", "b")})
+	engine.apply("x", {"a": True, "b": "1"}, at=0.0)
+	assert engine.apply("x", {"a": False, "b": "2"}, at=1.0)["rates"]["delta"] == {}
+
+
+def test_targets_and_reset_are_independent():
+	engine = RateEngine()
+	engine.apply("redis", redis_metrics(100, 0, 0), at=0.0)
+	engine.apply("redis_cluster", {"nodes": {"a:1": {"total_commands_processed": 100}}}, at=0.0)
+	engine.reset("redis")
+	assert engine.apply("redis", redis_metrics(200, 0, 0), at=1.0)["rates"]["interval_s"] is None
+	rates = engine.apply("redis_cluster", {"nodes": {"a:1": {"total_commands_processed": 160}}}, at=2.0)["rates"]
+	assert rates["per_sec"] == {"nodes.a:1.total_commands_processed": 30.0}
+
+
+@pytest.mark.parametrize("target", ["redis_cluster", "jvm_fleet", "agents"])
+def test_shape_specific_counters_exist(target):
+	assert COUNTERS[target]
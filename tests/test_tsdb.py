@@ -0,0 +1,155 @@
+import math
+import random
+import time
+
+import pytest
+
+from core.tsdb import INT_LIMIT, Chunk, TimeSeriesStore, decode_chunk, flatten_numeric, value_scale
+
+
+def same(a, b):
+	if math.isnan(a) and math.isnan(b):
+		return True
+	return a == b and math.copysign(1.0, a) == math.copysign(1.0, b)
+
+
+def round_trip(times, values):
+	# 값 모드가 안 맞으면 저장소처럼 직전 모드를 힌트로 새 청크를 시작
+	chunks = [Chunk(times[0], 1)]
+	for ts, value in zip(times, values):
+		if not chunks[-1].append(ts, (value,)):
+			chunks.append(Chunk(ts, 1, chunks[-1].hints()))
+			assert chunks[-1].append(ts, (value,))
+	out_times, out = [], []
+	for chunk in chunks:
+		t, cols = decode_chunk(chunk.payload(), chunk.start, chunk.count, 1)
+		out_times += t
+		out += cols[0]
+	return out_times, out
+
+
+@pytest.mark.parametrize("values", [
+	[0, 0, 0, 0],
+	[1, 2, 3, 5, 8, 13, 10 ** 12, -(10 ** 12), 7],
+	[0.5, 0.25, 0.125, 1.0, -3.75],
+	[12.34, 12.35, 99.99, 0.01, -0.07],
+	[float(INT_LIMIT - 1), float(-(INT_LIMIT - 1)), 0.0],
+])
+def test_scaled_int_values_round_trip(values):
+	times = list(range(1000, 1000 + len(values)))
+	out_times, out = round_trip(times, values)
+	assert out_times == times
+	assert out == [float(v) for v in values]
+
+
+def test_float_values_round_trip():
+	rand = random.Random(7)
+	values = [rand.gauss(0, 1e6) for _ in range(500)] + [math.pi, math.pi, 1e-300, -1e300, float("inf"), float("-inf"), -0.0, float("nan"), 1 / 3]
+	times = list(range(5000, 5000 + len(values)))
+	_, out = round_trip(times, values)
+	assert all(same(a, b) for a, b in zip(out, values))
+
+
+def test_irregular_timestamps_round_trip():
+	# 일정 간격(1비트), 작은/큰 흔들림, 32비트 wide 구간까지
+	times = [0, 1, 2, 3, 5, 6, 70, 71, 72, 3000, 3001, 400000, 400001, 2 ** 31 - 10, 2 ** 31]
+	out_times, out = round_trip(times, [1.0] * len(times))
+	assert out_times == times
+
+
+def test_value_scale():
+	assert value_scale(3.0) == 0
+	assert value_scale(0.25) == 2
+	assert value_scale(1.234567) == 6
+	assert value_scale(1 / 3) == 255
+	assert value_scale(float("nan")) == 255
+	assert value_scale(-0.0) == 255
+
+
+def test_flatten_numeric_skips_non_numeric_and_non_finite():
+	data = {"a": {"b": 1, "c": "x", "d": None, "e": True, "f": float("inf"), "g": float("nan")}, "h": 2.5}
+	assert dict(flatten_numeric(data)) == {"a.b": 1.0, "a.e": 1.0, "h": 2.5}
+
+
+def base_ts() -> int:
+	# 원본 단계 보존 기간(7일) 안, 분 경계에서 시작
+	now = int(time.time()) - 3 * 3600
+	return now - now % 3600
+
+
+def test_store_reopen_reads_raw_and_rollups(tmp_path):
+	start = base_ts()
+	values = [(i % 7) * 0.5 + (1e13 if i == 50 else 0) for i in range(600)]
+	store = TimeSeriesStore(tmp_path, chunk_points=64)
+	for i, value in enumerate(values):
+		store.append("t:m", start + i, value)
+	# 같은 초/과거 시각은 버림
+	store.append("t:m", start + 10, 999.0)
+	store.close()
+	store.append("t:m", start + 1000, 1.0)
+
+	store = TimeSeriesStore(tmp_path, chunk_points=64)
+	try:
+		raw = store.query("t:m", start, start + 599, step=1)
+		assert raw["resolution_s"] == 1
+		assert [p[0] for p in raw["points"]] == list(range(start, start + 600))
+		assert [p[1] for p in raw["points"]] == values
+		minute = store.query("t:m", start, start + 599, step=60)
+		assert minute["resolution_s"] == 60
+		assert len(minute["points"]) == 10
+		for i, (ts, avg, lo, hi) in enumerate(minute["points"]):
+			bucket = values[i * 60:(i + 1) * 60]
+			assert ts == start + i * 60
+			assert avg == pytest.approx(sum(bucket) / 60)
+			assert (lo, hi) == (min(bucket), max(bucket))
+		assert store.series("t:") == ["t:m"]
+	finally:
+		store.close()
+
+
+def test_checkpoint_recovers_open_chunks_after_crash(tmp_path):
+	start = base_ts()
+	store = TimeSeriesStore(tmp_path, checkpoint_s=10)
+	for i in range(95):
+		store.append("t:m", start + i, float(i))
+	# close 없이 종료(비정상 종료): 마지막 체크포인트(90초 시점)까지 복구
+	assert (tmp_path / "open.ckpt").exists()
+	for seg in store._files.values():
+		seg.close()
+	store._series_fh.close()
+
+	store = TimeSeriesStore(tmp_path, checkpoint_s=10)
+	try:
+		assert not (tmp_path / "open.ckpt").exists()
+		points = store.query("t:m", start, start + 200, step=1)["points"]
+		assert [p[1] for p in points] == [float(i) for i in range(91)]
+		# 복구 후에도 이어서 기록
+		store.append("t:m", start + 150, 150.0)
+		store.append("t:m", start + 10, -1.0)
+	finally:
+		store.close()
+	store = TimeSeriesStore(tmp_path)
+	try:
+		points = store.query("t:m", start, start + 200, step=1)["points"]
+		assert points[-1][:2] == [start + 150, 150.0]
+		assert len(points) == 92
+	finally:
+		store.close()
+
+
+def test_truncated_segment_tail_is_dropped(tmp_path):
+	start = base_ts()
+	store = TimeSeriesStore(tmp_path, chunk_points=16)
+	for i in range(40):
+		store.append("t:m", start + i, float(i))
+	store.close()
+	seg = next((tmp_path / "raw").glob("*.seg"))
+	size = seg.stat().st_size
+	with open(seg, "ab") as f:
+		f.write(b"\x01\x02\x03")
+	store = TimeSeriesStore(tmp_path)
+	try:
+		assert seg.stat().st_size == size
+		assert len(store.query("t:m", start, start + 60, step=1)["points"]) == 40
+	finally:
+		store.close()
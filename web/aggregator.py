@@ -0,0 +1,267 @@
+import argparse
+import asyncio
+import json
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+# 단독 실행(python web/aggregator.py) 시에도 로컬 패키지를 찾도록
+project_root = str(Path(__file__).resolve().parents[1])
+if project_root not in sys.path:
+	sys.path.insert(0, project_root)
+
+try:
+	import resource
+except ImportError:
+	resource = None
+
+from core.push import (
+	FRAME_BATCH,
+	FRAME_HELLO,
+	MAGIC,
+	MAX_HELLO_BYTES,
+	DeltaDecoder,
+	new_decompressor,
+	read_frame,
+	unflatten_fields,
+)
+
+
+def raise_nofile_limit() -> int | None:
+	# 에이전트 연결마다 소켓 fd 하나. RLIMIT_NOFILE soft를 hard까지 올려 수천 연결에서 accept가 EMFILE로 막히지 않게 함
+	if resource is None:
+		return None
+	try:
+		soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+		if soft != resource.RLIM_INFINITY and (hard == resource.RLIM_INFINITY or soft < hard):
+			# hard가 무제한이어도 커널 상한(fs.nr_open, 기본 1048576)은 넘을 수 없음
+			target = hard if hard != resource.RLIM_INFINITY else max(soft, 1 << 20)
+			resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+		return resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+	except (ValueError, OSError):
+		return None
+
+
+class AgentHost:
+	# 호스트별 최신 상태. 필드 값은 연결의 디코더가 갖고, 중첩 dict는 바뀐 경우에만 다시 만듦
+	def __init__(self, name: str):
+		self.name = name
+		self.target = None
+		self.addr = None
+		self.interval_s = None
+		self.decoder: DeltaDecoder | None = None
+		self.writer: asyncio.StreamWriter | None = None
+		self.connected = False
+		self.last_seen = 0.0
+		self.sample_ts = None
+		self.samples = 0
+		self.bytes = 0
+		self.connections = 0
+		self._dirty = True
+		self._data: Dict[str, Any] = {}
+
+	def data(self) -> Dict[str, Any]:
+		if self._dirty and self.decoder is not None:
+			self._data = unflatten_fields(self.decoder.state)
+			self._dirty = False
+		return self._data
+
+
+class Aggregator:
+	# 에이전트(linux/agent.py) 푸시 수신기: asyncio TCP 서버를 전용 스레드 이벤트 루프에서 실행
+	# 연결마다 deflate 스트림/필드 사전(DeltaDecoder)을 두고 바뀐 필드만 적용. 수천 연결도 스레드 하나로 처리
+	def __init__(self, host: str = "0.0.0.0", port: int = 9100, stale_after_s: float = 30.0, host_ttl_s: float = 3600.0, backlog: int = 4096):
+		self.listen = (host, int(port))
+		self.stale_after_s = float(stale_after_s)
+		self.host_ttl_s = float(host_ttl_s)
+		self.backlog = int(backlog)
+		self.hosts: Dict[str, AgentHost] = {}
+		self.frames_total = 0
+		self.samples_total = 0
+		self.bytes_total = 0
+		self.errors_total = 0
+		self.last_error: str | None = None
+		self._prev_totals = (time.monotonic(), 0, 0)
+		self._server: asyncio.AbstractServer | None = None
+		self._loop = asyncio.new_event_loop()
+		self._thread = threading.Thread(target=self._loop.run_forever, name="systools-aggregator", daemon=True)
+
+	def start(self) -> "Aggregator":
+		raise_nofile_limit()
+		self._thread.start()
+		asyncio.run_coroutine_threadsafe(self._start_server(), self._loop).result()
+		return self
+
+	async def _start_server(self):
+		self._server = await asyncio.start_server(self._handle, self.listen[0], self.listen[1], backlog=self.backlog, reuse_address=True)
+		# 포트 0이면 실제 할당된 포트로
+		self.listen = self._server.sockets[0].getsockname()[:2]
+
+	def healthy(self) -> bool:
+		return self._thread.is_alive()
+
+	def close(self):
+		async def _close():
+			if self._server is not None:
+				self._server.close()
+			for host in self.hosts.values():
+				if host.writer is not None:
+					host.writer.close()
+		if self._loop.is_running():
+			try:
+				asyncio.run_coroutine_threadsafe(_close(), self._loop).result(timeout=5)
+			except Exception:
+				pass
+			self._loop.call_soon_threadsafe(self._loop.stop)
+
+	async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+		sock = writer.get_extra_info("socket")
+		if sock is not None:
+			sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+		peer = writer.get_extra_info("peername")
+		# 포트는 재연결마다 바뀌므로 주소만(라벨/표시용)
+		addr = peer[0] if peer else None
+		host = None
+		try:
+			if await reader.readexactly(len(MAGIC)) != MAGIC:
+				raise ValueError("bad magic")
+			kind, payload, wire = await read_frame(reader, limit=MAX_HELLO_BYTES)
+			if kind != FRAME_HELLO:
+				raise ValueError("expected hello")
+			hello = json.loads(payload)
+			name = str(hello["host"])
+			host = self.hosts.get(name)
+			if host is None:
+				host = self.hosts[name] = AgentHost(name)
+			elif host.writer is not None:
+				# 같은 호스트의 이전 연결(재시작 전 반쯤 끊긴 연결 등)은 닫고 새 연결로 교체
+				host.writer.close()
+			host.target = hello.get("target")
+			host.interval_s = hello.get("interval_s")
+			host.addr = addr
+			host.writer = writer
+			host.connected = True
+			host.connections += 1
+			host.last_seen = time.time()
+			decoder = host.decoder = DeltaDecoder()
+			decompressor = new_decompressor()
+			self.bytes_total += len(MAGIC) + wire
+			while True:
+				kind, payload, wire = await read_frame(reader, decompressor)
+				if host.writer is not writer:
+					break
+				self.frames_total += 1
+				self.bytes_total += wire
+				host.bytes += wire
+				if kind != FRAME_BATCH:
+					continue
+				times = decoder.decode_batch(payload)
+				self.samples_total += len(times)
+				host.samples += len(times)
+				host.last_seen = time.time()
+				if times:
+					host.sample_ts = times[-1]
+				host._dirty = True
+		except asyncio.IncompleteReadError:
+			# 에이전트 종료/재연결: 정상 종료로 취급
+			pass
+		except Exception as e:
+			self.errors_total += 1
+			self.last_error = f"{addr}: {e}"
+		finally:
+			if host is not None and host.writer is writer:
+				host.writer = None
+				host.connected = False
+			writer.close()
+
+	async def _snapshot(self) -> Dict[str, Any]:
+		# 루프 스레드에서 상태를 읽어 잠금 없이 일관된 스냅샷 생성
+		now = time.time()
+		hosts: Dict[str, Any] = {}
+		connected = 0
+		stale = 0
+		for name in list(self.hosts):
+			host = self.hosts[name]
+			age_s = now - host.last_seen
+			if not host.connected and age_s > self.host_ttl_s:
+				del self.hosts[name]
+				continue
+			# 보고 주기의 3배(최소 stale_after_s) 동안 샘플이 없으면 stale
+			limit = max(self.stale_after_s, 3 * float(host.interval_s or 0))
+			up = host.connected and age_s <= limit
+			connected += 1 if host.connected else 0
+			stale += 0 if up else 1
+			entry = dict(host.data())
+			entry["agent"] = {
+				"up": up,
+				"connected": host.connected,
+				"age_s": round(age_s, 1),
+				"sample_lag_s": round(now - host.sample_ts, 1) if host.sample_ts else None,
+				"samples": host.samples,
+				"bytes": host.bytes,
+				"connections": host.connections,
+				"addr": host.addr,
+				"target": host.target,
+			}
+			hosts[name] = entry
+		return {"hosts": hosts, "connected": connected, "stale": stale}
+
+	def collect_all(self) -> Dict[str, Any]:
+		snap = asyncio.run_coroutine_threadsafe(self._snapshot(), self._loop).result(timeout=10)
+		now = time.monotonic()
+		prev_at, prev_samples, prev_bytes = self._prev_totals
+		elapsed = now - prev_at
+		self._prev_totals = (now, self.samples_total, self.bytes_total)
+		samples_per_sec = round((self.samples_total - prev_samples) / elapsed, 2) if elapsed > 0 else None
+		bytes_per_sec = round((self.bytes_total - prev_bytes) / elapsed, 1) if elapsed > 0 else None
+		return {
+			"agents": {
+				"hosts": len(snap["hosts"]),
+				"connected": snap["connected"],
+				"stale": snap["stale"],
+				"samples_per_sec": samples_per_sec,
+				"bytes_per_sec": bytes_per_sec,
+				"bytes_per_sample": round(self.bytes_total / self.samples_total, 1) if self.samples_total else None,
+				"samples_total": self.samples_total,
+				"frames_total": self.frames_total,
+				"bytes_total": self.bytes_total,
+				"errors_total": self.errors_total,
+				"last_error": self.last_error,
+			},
+			"hosts": snap["hosts"],
+			"meta": {
+				"timestamp": int(time.time()),
+				"listen": f"{self.listen[0]}:{self.listen[1]}",
+			},
+		}
+
+
+def main():
+	# 단독 실행: 수신만 하고 주기적으로 요약 출력(로컬 테스트용)
+	parser = argparse.ArgumentParser(description="systools 에이전트 푸시 수신기")
+	parser.add_argument("--host", type=str, default="0.0.0.0")
+	parser.add_argument("--port", type=int, default=9100)
+	parser.add_argument("--interval", type=float, default=10.0, help="요약 출력 주기(초)")
+	parser.add_argument("--output", type=str, choices=["summary", "json"], default="summary")
+	args = parser.parse_args()
+	aggregator = Aggregator(args.host, args.port).start()
+	print(f"aggregator listening on {aggregator.listen[0]}:{aggregator.listen[1]}", file=sys.stderr)
+	try:
+		while True:
+			time.sleep(args.interval)
+			metrics = aggregator.collect_all()
+			if args.output == "json":
+				print(json.dumps(metrics, ensure_ascii=False))
+			else:
+				print(json.dumps(metrics["agents"], ensure_ascii=False))
+	except KeyboardInterrupt:
+		pass
+	finally:
+		aggregator.close()
+
+
+if __name__ == "__main__":
+	main()
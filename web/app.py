@@ -1,5 +1,9 @@
-from flask import Flask, render_template, request
+from flask import Flask, Response, render_template, request
+import atexit
+import gzip
+import json
 import os
+import signal
 import time
 import sys
 from pathlib import Path
@@ -10,8 +14,17 @@ if project_root not in sys.path:
 	sys.path.insert(0, project_root)
 
 from redis.collector import RedisMetricsCollector
+from redis.fanout import RedisClusterCollector
 from linux.collector import LinuxMetricsCollector
 from jvm.collector import JvmMetricsCollector
+from jvm.fleet import JvmFleetCollector, load_endpoints
+from core.scheduler import CollectionScheduler
+from core.pool import CollectorPool
+from core.sampler import SamplerGroup
+from core.rates import RateEngine
+from core.exposition import CONTENT_TYPE, ExpositionCache
+from core.tsdb import TimeSeriesStore
+from web.aggregator import Aggregator
 from importlib.machinery import SourceFileLoader
 from types import ModuleType
 
@@ -21,48 +34,339 @@ KafkaMetricsCollector = SourceFileLoader("systools_kafka_collector", str(kafka_c
 
 app = Flask(__name__, template_folder="templates", static_folder="static")
 
+# 대상별 수집을 병렬 실행, 페이지 지연은 가장 느린 대상 또는 데드라인으로 제한
+scheduler = CollectionScheduler(deadline_ms=int(os.environ.get("COLLECT_DEADLINE_MS", "5000")))
+# 요청마다 collector(연결)를 새로 만들지 않도록 프로세스 전역 풀에서 재사용
+pool = CollectorPool(
+	idle_ttl_s=float(os.environ.get("COLLECTOR_IDLE_TTL_S", "300")),
+	health_check_s=float(os.environ.get("COLLECTOR_HEALTH_CHECK_S", "30")),
+)
+# 대상별 백그라운드 샘플링(SAMPLE_INTERVAL_S 주기), 요청은 최신 스냅샷만 읽음. 0이면 요청마다 직접 수집
+SAMPLE_INTERVAL_S = float(os.environ.get("SAMPLE_INTERVAL_S", "5"))
+samplers = SamplerGroup()
+# 누적 카운터 → 초당 변화율/구간 증가량
+rates = RateEngine()
+# /metrics 백그라운드 샘플러용. SAMPLE_INTERVAL_S=0이면 요청 경로도 같은 대상을 직접 수집하므로
+# 직전 값을 따로 두어 서로의 수집 간격으로 변화율을 계산하지 않게 함
+sampler_rates = RateEngine()
 
-def collect_safe(collector_name: str, fn):
-	try:
-		return {"name": collector_name, "data": fn(), "error": None}
-	except Exception as e:
-		return {"name": collector_name, "data": None, "error": str(e)}
 
+# 수집한 모든 숫자 메트릭의 이력(1m/5m/1h 롤업 포함). TSDB_DIR을 빈 값으로 두면 기록하지 않음
+TSDB_DIR = os.environ.get("TSDB_DIR", str(Path(project_root) / "data" / "tsdb"))
+history = TimeSeriesStore(TSDB_DIR) if TSDB_DIR else None
+if history is not None:
+	# 종료 시 열린 청크/롤업 버킷을 봉인해 기록(비정상 종료 시 유실은 체크포인트 주기 이내)
+	atexit.register(history.close)
 
-@app.route("/")
-def index():
-	targets = request.args.get("targets", "redis,linux,kafka,jvm")
-	target_list = [t.strip() for t in targets.split(",") if t.strip()]
+# 에이전트 푸시 수신(AGGREGATOR_PORT 지정 시): 각 호스트의 linux/agent.py가 보낸 최신 값을 'agents' 대상으로 노출
+AGGREGATOR_PORT = os.environ.get("AGGREGATOR_PORT", "")
+aggregator = (
+	Aggregator(
+		os.environ.get("AGGREGATOR_HOST", "0.0.0.0"),
+		int(AGGREGATOR_PORT),
+		stale_after_s=float(os.environ.get("AGGREGATOR_STALE_S", "30")),
+		host_ttl_s=float(os.environ.get("AGGREGATOR_HOST_TTL_S", "3600")),
+	).start()
+	if AGGREGATOR_PORT
+	else None
+)
 
-	results = []
-	now = int(time.time())
+
+# 카드별 기본 스파크라인: (메트릭 경로, 변환). rate는 누적 카운터의 초당 변화율
+SPARKLINES = {
+	"redis": (
+		("performance.latency_ms", None),
+		("performance.total_commands_processed", "rate"),
+		("memory.used_memory", None),
+		("network.connected_clients", None),
+	),
+	"linux": (
+		("system.cpu_usage_percent", None),
+		("system.loadavg_1", None),
+		("memory.mem_used_percent", None),
+		("network.rx_bytes_total", "rate"),
+	),
+	"kafka": (
+		("throughput.messages_in_per_sec", None),
+		("lag.consumer_lag_total", None),
+	),
+	"jvm": (
+		("memory.heap_used_bytes", None),
+		("gc_interval.gc_time_pct", None),
+		("threads.thread_count", None),
+	),
+	"agents": (
+		("agents.connected", None),
+		("agents.samples_total", "rate"),
+		("agents.bytes_total", "rate"),
+	),
+}
+# 스파크라인 기본 구간(초)
+SPARKLINE_WINDOW_S = int(os.environ.get("SPARKLINE_WINDOW_S", "3600"))
+
+
+def pooled_job(target: str, params: tuple, factory, engine: RateEngine):
+	# 풀의 collector로 수집하고 누적 카운터에 rates 섹션을 붙이는 작업
+	return lambda: engine.apply(target, pool.collect(target, params, factory))
+
+
+def recorded(name: str, fn):
+	# 수집 결과를 카드(작업) 이름 기준으로 이력 저장소에 기록
+	return lambda: history.record(name, fn())
+
+
+def agents_job():
+	# 호스트별 필드(수천 호스트 x 수십 필드)는 이력에 남기지 않고 요약만 기록
+	metrics = aggregator.collect_all()
+	if history is not None:
+		history.record("agents", {"agents": metrics["agents"]})
+	return metrics
+
+
+def json_response(payload) -> Response:
+	# 느린 링크를 고려해 공백 없는 JSON, 클라이언트가 받으면 gzip
+	body = json.dumps(payload, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+	headers = {"Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+	if len(body) > 512 and "gzip" in request.accept_encodings:
+		body = gzip.compress(body, compresslevel=6)
+		headers["Content-Encoding"] = "gzip"
+	return Response(body, headers=headers, content_type="application/json")
+
+
+# /metrics 본문(스냅샷 seq가 바뀔 때만 재렌더링). SAMPLE_INTERVAL_S=0이어도 /metrics용 샘플링은 이 주기로 수행
+exposition = ExpositionCache()
+METRICS_SAMPLE_INTERVAL_S = float(os.environ.get("METRICS_SAMPLE_INTERVAL_S", "15"))
+
+
+def build_jobs(target_list: list, engine: RateEngine | None = None) -> dict:
+	# 대상별 수집 작업(환경 변수 설정을 요청마다 반영). 변화율은 호출 측 engine 기준(기본은 요청 경로용 rates)
+	engine = engine or rates
+	jobs = {}
+
+	def pooled(target: str, params: tuple, factory):
+		return pooled_job(target, params, factory, engine)
 
 	if "redis" in target_list:
 		redis_url = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
 		ping_samples = int(os.environ.get("REDIS_PING_SAMPLES", "3"))
 		ping_timeout_ms = int(os.environ.get("REDIS_PING_TIMEOUT_MS", "500"))
-		rc = RedisMetricsCollector(redis_url, ping_samples, ping_timeout_ms)
-		results.append(collect_safe("redis", rc.collect_all))
+		pipeline = os.environ.get("REDIS_PIPELINE", "1") not in ("0", "false", "no")
+		ping_rate_hz = float(os.environ.get("REDIS_PING_RATE_HZ", "0"))
+		client_sample_every = int(os.environ.get("REDIS_CLIENT_SAMPLE_EVERY", "1"))
+		client_list_type = os.environ.get("REDIS_CLIENT_LIST_TYPE") or None
+		# REDIS_CLUSTER=1: REDIS_URL(쉼표로 여러 시드 가능)을 시드로 CLUSTER NODES의 모든 노드를 병렬 수집
+		cluster_mode = os.environ.get("REDIS_CLUSTER", "0") not in ("", "0", "false", "no")
+		cluster_workers = int(os.environ.get("REDIS_CLUSTER_WORKERS", "16"))
+		if cluster_mode:
+			jobs["redis"] = pooled(
+				"redis_cluster",
+				(redis_url, cluster_workers, ping_timeout_ms, pipeline),
+				lambda: RedisClusterCollector(
+					redis_url.split(","),
+					max_workers=cluster_workers,
+					ping_timeout_ms=ping_timeout_ms,
+					pipeline=pipeline,
+				),
+			)
+		else:
+			jobs["redis"] = pooled(
+				"redis",
+				(redis_url, ping_samples, ping_timeout_ms, pipeline, ping_rate_hz, client_sample_every, client_list_type),
+				lambda: RedisMetricsCollector(
+					redis_url,
+					ping_samples,
+					ping_timeout_ms,
+					pipeline=pipeline,
+					ping_rate_hz=ping_rate_hz,
+					client_sample_every=client_sample_every,
+					client_list_type=client_list_type,
+				),
+			)
 
 	if "linux" in target_list:
-		lc = LinuxMetricsCollector()
-		results.append(collect_safe("linux", lc.collect_all))
+		process_top_n = int(os.environ.get("LINUX_PROCESS_TOP_N", "10"))
+		# LINUX_CGROUP: self 또는 cgroup 경로(cgroup v2), LINUX_CGROUP_DEPTH: 하위 cgroup 단계
+		cgroup = os.environ.get("LINUX_CGROUP") or None
+		cgroup_depth = int(os.environ.get("LINUX_CGROUP_DEPTH", "0"))
+		# LINUX_FD_BUDGET: 프로세스/cgroup 테이블이 열어 둘 fd 수 상한(aggregator 소켓과 같은 프로세스라 기본은 작게)
+		fd_budget = int(os.environ["LINUX_FD_BUDGET"]) if os.environ.get("LINUX_FD_BUDGET") else None
+		jobs["linux"] = pooled(
+			"linux",
+			(process_top_n, cgroup, cgroup_depth, fd_budget),
+			lambda: LinuxMetricsCollector(process_top_n=process_top_n, cgroup=cgroup, cgroup_depth=cgroup_depth, fd_budget=fd_budget),
+		)
 
 	if "kafka" in target_list:
 		bootstrap = os.environ.get("KAFKA_BOOTSTRAP")
 		group_id = os.environ.get("KAFKA_GROUP")
-		kc = KafkaMetricsCollector(bootstrap_servers=bootstrap, group_id=group_id)
-		results.append(collect_safe("kafka", kc.collect_all))
+		# KAFKA_GROUPS: 패턴(glob, '*'이면 전체)에 맞는 모든 그룹의 랙(다중 그룹 모드)
+		group_pattern = os.environ.get("KAFKA_GROUPS") or None
+		metadata_max_age_s = float(os.environ.get("KAFKA_METADATA_MAX_AGE_S", "30"))
+		throughput = os.environ.get("KAFKA_THROUGHPUT", "1") not in ("0", "false", "no")
+		jobs["kafka"] = pooled(
+			"kafka",
+			(bootstrap, group_id, group_pattern, metadata_max_age_s, throughput),
+			lambda: KafkaMetricsCollector(
+				bootstrap_servers=bootstrap,
+				group_id=group_id,
+				group_pattern=group_pattern,
+				metadata_max_age_s=metadata_max_age_s,
+				throughput=throughput,
+			),
+		)
 
 	if "jvm" in target_list:
 		jmx_url = os.environ.get("JMX_URL")
-		jc = JvmMetricsCollector(jmx_url=jmx_url)
-		results.append(collect_safe("jvm", jc.collect_all))
+		# JMX_FLEET: 쉼표 구분 URL 또는 @파일. 지정 시 모든 엔드포인트를 동시 수집(플릿 모드)
+		jmx_fleet = os.environ.get("JMX_FLEET") or None
+		if jmx_fleet:
+			fleet_concurrency = int(os.environ.get("JMX_FLEET_CONCURRENCY", "64"))
+			fleet_timeout_ms = int(os.environ.get("JMX_FLEET_TIMEOUT_MS", "2000"))
+			# 스윕 데드라인은 샘플링 주기 또는 수집 데드라인 안에 끝나도록 설정
+			sweep_deadline_ms = int(SAMPLE_INTERVAL_S * 1000) if SAMPLE_INTERVAL_S > 0 else scheduler.deadline_ms
+			jobs["jvm"] = pooled(
+				"jvm_fleet",
+				(jmx_fleet, fleet_concurrency, fleet_timeout_ms, sweep_deadline_ms),
+				lambda: JvmFleetCollector(
+					load_endpoints(jmx_fleet),
+					concurrency=fleet_concurrency,
+					timeout_ms=fleet_timeout_ms,
+					sweep_deadline_ms=sweep_deadline_ms,
+				),
+			)
+		else:
+			jobs["jvm"] = pooled("jvm", (jmx_url,), lambda: JvmMetricsCollector(jmx_url=jmx_url))
+
+	if history is not None:
+		jobs = {name: recorded(name, fn) for name, fn in jobs.items()}
+
+	if "agents" in target_list and aggregator is not None:
+		jobs["agents"] = agents_job
+	return jobs
 
-	return render_template("index.html", results=results, ts=now)
+
+def read_results(jobs: dict) -> list:
+	# 샘플링 중이면 최신 스냅샷만 읽고, SAMPLE_INTERVAL_S=0이면 직접 수집
+	if SAMPLE_INTERVAL_S > 0:
+		for name, fn in jobs.items():
+			samplers.ensure(name, fn, SAMPLE_INTERVAL_S)
+		return samplers.cache.read(list(jobs), wait_ms=scheduler.deadline_ms)
+	return scheduler.run(jobs)
+
+
+@app.route("/")
+def index():
+	targets = request.args.get("targets", "redis,linux,kafka,jvm")
+	target_list = [t.strip() for t in targets.split(",") if t.strip()]
+	jobs = build_jobs(target_list)
+	now = int(time.time())
+	results = read_results(jobs)
+	sparklines = {name: [{"metric": m, "fn": fn} for m, fn in SPARKLINES.get(name, ())] for name in jobs}
+	return render_template(
+		"index.html",
+		results=results,
+		ts=now,
+		sparklines=sparklines,
+		window_s=SPARKLINE_WINDOW_S,
+		refresh_s=SAMPLE_INTERVAL_S if SAMPLE_INTERVAL_S > 0 else 10,
+		history=history is not None,
+	)
+
+
+@app.route("/api/latest")
+def api_latest():
+	# 대시보드 갱신용: since(대상:seq,...)보다 새 스냅샷이 있는 대상만 반환
+	targets = request.args.get("targets", "redis,linux,kafka,jvm")
+	target_list = [t.strip() for t in targets.split(",") if t.strip()]
+	since = {}
+	for item in request.args.get("since", "").split(","):
+		name, _, seq = item.partition(":")
+		if seq.isdigit():
+			since[name] = int(seq)
+	results = [
+		{k: r.get(k) for k in ("name", "data", "error", "seq", "age_s")}
+		for r in read_results(build_jobs(target_list))
+		if r.get("seq") is None or r["seq"] > since.get(r["name"], 0)
+	]
+	return json_response({"ts": int(time.time()), "results": results})
+
+
+def _compact(value: float | None) -> float | None:
+	# 유효숫자 6자리(스파크라인 용도, 응답 크기 절감)
+	return None if value is None else float(f"{value:.6g}")
+
+
+@app.route("/api/series")
+def api_series():
+	# 범위 조회: /api/series?target=redis&metric=performance.latency_ms&from=-3600&step=30[&fn=rate]
+	# metric은 쉼표로 여러 개, from/to는 유닉스 초(음수면 현재 기준 상대 초)
+	if history is None:
+		return json_response({"error": "history disabled (TSDB_DIR)"}), 404
+	target = request.args.get("target", "")
+	metrics = [m for item in request.args.getlist("metric") for m in item.split(",") if m]
+	fns = request.args.get("fn", "")
+	fn_list = fns.split(",") if fns else []
+	now = int(time.time())
+	try:
+		start = float(request.args.get("from", f"-{SPARKLINE_WINDOW_S}"))
+		end = float(request.args.get("to", now))
+		step = int(request.args.get("step", "0")) or None
+	except ValueError:
+		return json_response({"error": "from/to/step must be numbers"}), 400
+	if start < 0:
+		start = now + start
+	if end < 0:
+		end = now + end
+	if not target or not metrics:
+		return json_response({"error": "target and metric are required"}), 400
+
+	series = {}
+	resolution = None
+	for i, metric in enumerate(metrics[:20]):
+		fn = fn_list[i] if i < len(fn_list) else ""
+		# rate는 첫 버킷의 기준값이 필요하므로 한 step 앞부터 조회
+		result = history.query(f"{target}:{metric}", start - (step or 0) if fn == "rate" else start, end, step=step)
+		step = step or result["step_s"]
+		resolution = resolution or result["resolution_s"]
+		if fn == "rate":
+			# 버킷 max(단조 증가 카운터의 구간 마지막 값)의 차이. 감소(재시작)는 건너뜀
+			points = []
+			prev = None
+			for ts, _, _, hi in result["points"]:
+				if prev is not None and ts > prev[0] and hi >= prev[1] and ts >= start:
+					points.append([ts, _compact((hi - prev[1]) / (ts - prev[0]))])
+				prev = (ts, hi)
+		else:
+			points = [[ts, _compact(avg)] for ts, avg, _, _ in result["points"]]
+		series[metric] = points
+	return json_response({"target": target, "from": int(start), "to": int(end), "step_s": step, "resolution_s": resolution, "series": series})
+
+
+@app.route("/metrics")
+def metrics():
+	# OpenMetrics 노출: 백그라운드 샘플러의 최신 스냅샷만 읽고 수집은 유발하지 않음(첫 샘플 전 대상은 생략)
+	default_targets = "redis,linux,kafka,jvm" + (",agents" if aggregator is not None else "")
+	targets = request.args.get("targets", os.environ.get("METRICS_TARGETS", default_targets))
+	target_list = [t.strip() for t in targets.split(",") if t.strip()]
+	interval_s = SAMPLE_INTERVAL_S if SAMPLE_INTERVAL_S > 0 else METRICS_SAMPLE_INTERVAL_S
+	names = []
+	for name, fn in build_jobs(target_list, sampler_rates).items():
+		samplers.ensure(name, fn, interval_s)
+		names.append(name)
+	snapshots = [s for s in (samplers.cache.get(name) for name in names) if s is not None]
+	body, gzip_body, etag = exposition.get(snapshots)
+	headers = {"ETag": f'"{etag}"', "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+	if request.if_none_match.contains(etag):
+		return Response(status=304, headers=headers)
+	if "gzip" in request.accept_encodings:
+		headers["Content-Encoding"] = "gzip"
+		body = gzip_body
+	return Response(body, status=200, headers=headers, content_type=CONTENT_TYPE)
 
 
 if __name__ == "__main__":
+	# SIGTERM(컨테이너 중지 등)도 정상 종료로 처리해 atexit이 실행되게 함
+	signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
 	app.run(host="0.0.0.0", port=int(os.environ.get("PORT", "8000")))
 
 
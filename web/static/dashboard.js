@@ -0,0 +1,345 @@
+// 대시보드 갱신: 처음 한 번만 전체 렌더링, 이후에는 바뀐 스냅샷(/api/latest)과
+// 스파크라인의 새 구간(/api/series)만 받아 값/그래프를 제자리에서 갱신
+(function () {
+  "use strict";
+
+  var body = document.body;
+  var refreshS = Number(body.dataset.refreshS) || 10;
+  var windowS = Number(body.dataset.windowS) || 3600;
+  var historyOn = body.dataset.history === "1";
+  var SVG_NS = "http://www.w3.org/2000/svg";
+  var WIDTH = 120;
+  var HEIGHT = 24;
+
+  var cards = [];
+  Array.prototype.forEach.call(document.querySelectorAll("section.card[data-target]"), function (el) {
+    var specs = [];
+    try {
+      specs = JSON.parse(el.dataset.sparklines || "[]");
+    } catch (e) {
+      specs = [];
+    }
+    cards.push({
+      el: el,
+      target: el.dataset.target,
+      // 현재 그려진 값 경로 목록(키 집합이 바뀌면 본문을 다시 그림), 오류 상태면 null
+      shape: el.querySelector(".body .error") ? null : domShape(el),
+      seq: Number(el.dataset.seq) || 0,
+      specs: specs,
+      step: null,
+      series: {},
+      lines: {},
+    });
+  });
+  if (!cards.length) {
+    return;
+  }
+
+  function domShape(el) {
+    return Array.prototype.map
+      .call(el.querySelectorAll(".body .val[data-path]"), function (v) { return v.dataset.path; })
+      .sort()
+      .join("\n");
+  }
+
+  // 서버 템플릿(render_obj)과 같은 구조로 그릴 값 경로 목록
+  function dataShape(data, prefix, out) {
+    Object.keys(data).forEach(function (k) {
+      var v = data[k];
+      if (v !== null && typeof v === "object" && !Array.isArray(v)) {
+        dataShape(v, prefix + k + ".", out);
+      } else {
+        out.push(prefix + k);
+      }
+    });
+    return out;
+  }
+
+  function div(className, text) {
+    var el = document.createElement("div");
+    el.className = className;
+    if (text !== undefined) {
+      el.textContent = text;
+    }
+    return el;
+  }
+
+  function getJson(url) {
+    return fetch(url, { headers: { Accept: "application/json" } }).then(function (res) {
+      if (!res.ok) {
+        throw new Error(url + ": HTTP " + res.status);
+      }
+      return res.json();
+    });
+  }
+
+  function formatValue(v) {
+    if (v === null || v === undefined) {
+      return "-";
+    }
+    if (Array.isArray(v)) {
+      return v.join(", ");
+    }
+    return String(v);
+  }
+
+  // 중첩 dict를 data-path(점 경로) 기준으로 펼쳐 .val 텍스트 교체
+  function updateValues(card, data, prefix) {
+    Object.keys(data).forEach(function (k) {
+      var v = data[k];
+      var path = prefix + k;
+      if (v !== null && typeof v === "object" && !Array.isArray(v)) {
+        updateValues(card, v, path + ".");
+        return;
+      }
+      var el = card.el.querySelector('.val[data-path="' + CSS.escape(path) + '"]');
+      if (el) {
+        var text = formatValue(v);
+        if (el.textContent !== text) {
+          el.textContent = text;
+        }
+      }
+    });
+  }
+
+  // index.html의 render_obj 매크로와 같은 마크업
+  function renderObj(obj, level, path) {
+    if (obj === null || typeof obj !== "object" || Array.isArray(obj)) {
+      var single = div("kv");
+      single.appendChild(div("key", "value"));
+      single.appendChild(div("val", formatValue(obj)));
+      return single;
+    }
+    var section = div("section level-" + level);
+    Object.keys(obj).forEach(function (k) {
+      var v = obj[k];
+      if (v !== null && typeof v === "object" && !Array.isArray(v)) {
+        var group = div("group");
+        group.appendChild(div("group-title", k));
+        group.appendChild(renderObj(v, level + 1, path + k + "."));
+        section.appendChild(group);
+        return;
+      }
+      var kv = div("kv");
+      kv.appendChild(div(typeof v === "number" ? "key numeric" : "key", k));
+      var val = div("val", formatValue(v));
+      val.dataset.path = path + k;
+      kv.appendChild(val);
+      section.appendChild(kv);
+    });
+    return section;
+  }
+
+  function renderBody(card, r) {
+    var bodyEl = card.el.querySelector(".body");
+    if (!bodyEl) {
+      return;
+    }
+    bodyEl.textContent = "";
+    if (r.error) {
+      bodyEl.appendChild(div("kv muted error", "접속 불가: " + r.error));
+    } else {
+      bodyEl.appendChild(renderObj(r.data, 0, ""));
+    }
+  }
+
+  function updateCard(card, r) {
+    var dot = card.el.querySelector(".dot");
+    if (dot) {
+      dot.className = "dot " + (r.error ? "err" : "ok");
+    }
+    var state = card.el.querySelector(".state");
+    if (state) {
+      state.textContent = r.error ? "unavailable" : "ok";
+    }
+    var age = card.el.querySelector(".age");
+    if (age) {
+      age.textContent = r.age_s === null || r.age_s === undefined ? "" : "· " + r.age_s + "s ago";
+    }
+    if (r.seq) {
+      card.seq = r.seq;
+    }
+    if (r.error) {
+      // 오류 문구 갱신, 복구되면 본문 전체를 다시 그림
+      card.shape = null;
+      renderBody(card, r);
+      return;
+    }
+    if (!r.data) {
+      return;
+    }
+    var shape = dataShape(r.data, "", []).sort().join("\n");
+    if (card.shape !== shape) {
+      // 오류에서 복구했거나 키가 생기거나 사라짐(rates 섹션, 새 디스크/인터페이스/토픽 등)
+      card.shape = shape;
+      renderBody(card, r);
+    } else {
+      updateValues(card, r.data, "");
+    }
+  }
+
+  // 스파크라인: 인라인 SVG polyline, 값 범위에 맞춰 세로 정규화
+  function sparkline(card, metric) {
+    var line = card.lines[metric];
+    if (line) {
+      return line;
+    }
+    var wrap = document.createElement("div");
+    wrap.className = "spark";
+    var label = document.createElement("span");
+    label.className = "spark-label";
+    label.textContent = metric;
+    var value = document.createElement("span");
+    value.className = "spark-value";
+    var svg = document.createElementNS(SVG_NS, "svg");
+    svg.setAttribute("viewBox", "0 0 " + WIDTH + " " + HEIGHT);
+    svg.setAttribute("preserveAspectRatio", "none");
+    var poly = document.createElementNS(SVG_NS, "polyline");
+    svg.appendChild(poly);
+    wrap.appendChild(label);
+    wrap.appendChild(svg);
+    wrap.appendChild(value);
+    card.el.querySelector(".sparks").appendChild(wrap);
+    line = card.lines[metric] = { wrap: wrap, poly: poly, value: value };
+    return line;
+  }
+
+  function draw(card, metric) {
+    var line = sparkline(card, metric);
+    var points = (card.series[metric] || []).filter(function (p) {
+      return p[1] !== null;
+    });
+    if (!points.length) {
+      line.poly.setAttribute("points", "");
+      line.value.textContent = "-";
+      return;
+    }
+    var now = Date.now() / 1000;
+    var t0 = now - windowS;
+    var lo = Infinity;
+    var hi = -Infinity;
+    points.forEach(function (p) {
+      lo = Math.min(lo, p[1]);
+      hi = Math.max(hi, p[1]);
+    });
+    var span = hi - lo || 1;
+    line.poly.setAttribute(
+      "points",
+      points
+        .map(function (p) {
+          var x = ((p[0] - t0) / windowS) * WIDTH;
+          var y = HEIGHT - 1 - ((p[1] - lo) / span) * (HEIGHT - 2);
+          return x.toFixed(1) + "," + y.toFixed(1);
+        })
+        .join(" ")
+    );
+    line.value.textContent = formatValue(points[points.length - 1][1]);
+  }
+
+  // 새 점 병합: 같은 ts(진행 중이던 버킷)는 덮어쓰고 창 밖 점은 버림
+  function merge(old, fresh) {
+    var cut = fresh.length ? fresh[0][0] : Infinity;
+    var t0 = Date.now() / 1000 - windowS;
+    return old
+      .filter(function (p) {
+        return p[0] < cut && p[0] >= t0;
+      })
+      .concat(fresh);
+  }
+
+  function lastTs(card) {
+    var ts = null;
+    card.specs.forEach(function (s) {
+      var pts = card.series[s.metric] || [];
+      if (pts.length && (ts === null || pts[pts.length - 1][0] > ts)) {
+        ts = pts[pts.length - 1][0];
+      }
+    });
+    return ts;
+  }
+
+  function loadSeries(card) {
+    if (!historyOn || !card.specs.length) {
+      return Promise.resolve();
+    }
+    var params = new URLSearchParams({
+      target: card.target,
+      metric: card.specs.map(function (s) { return s.metric; }).join(","),
+      fn: card.specs.map(function (s) { return s.fn || ""; }).join(","),
+    });
+    var since = lastTs(card);
+    if (card.step && since !== null) {
+      // 마지막 버킷부터 같은 step으로 이어받기
+      params.set("from", since);
+      params.set("step", card.step);
+    } else {
+      params.set("from", -windowS);
+    }
+    return getJson("api/series?" + params.toString())
+      .then(function (res) {
+        card.step = card.step || res.step_s;
+        card.specs.forEach(function (s) {
+          var fresh = res.series[s.metric] || [];
+          card.series[s.metric] = since !== null && card.step === res.step_s ? merge(card.series[s.metric] || [], fresh) : fresh;
+          draw(card, s.metric);
+        });
+      })
+      .catch(function () {});
+  }
+
+  function refresh() {
+    var since = cards.map(function (c) { return c.target + ":" + c.seq; }).join(",");
+    var targets = cards.map(function (c) { return c.target; }).join(",");
+    getJson("api/latest?targets=" + encodeURIComponent(targets) + "&since=" + encodeURIComponent(since))
+      .then(function (res) {
+        var updated = document.querySelector("header .updated");
+        if (updated) {
+          updated.textContent = "updated " + res.ts;
+        }
+        res.results.forEach(function (r) {
+          cards.forEach(function (card) {
+            if (card.target === r.name) {
+              updateCard(card, r);
+            }
+          });
+        });
+        return Promise.all(cards.map(loadSeries));
+      })
+      .catch(function () {})
+      .then(function () {
+        setTimeout(refresh, refreshS * 1000);
+      });
+  }
+
+  // 숫자 키를 누르면 해당 메트릭 스파크라인 추가/제거
+  document.addEventListener("click", function (ev) {
+    var key = ev.target.closest(".key.numeric");
+    if (!key || !historyOn) {
+      return;
+    }
+    var el = key.closest("section.card[data-target]");
+    var val = key.parentNode.querySelector(".val[data-path]");
+    var card = cards.filter(function (c) { return c.el === el; })[0];
+    if (!card || !val) {
+      return;
+    }
+    var metric = val.dataset.path;
+    var idx = card.specs.findIndex(function (s) { return s.metric === metric; });
+    if (idx >= 0) {
+      card.specs.splice(idx, 1);
+      card.lines[metric].wrap.remove();
+      delete card.lines[metric];
+      delete card.series[metric];
+      return;
+    }
+    card.specs.push({ metric: metric, fn: null });
+    // 새 메트릭은 전체 창부터 받아야 하므로 이어받기 상태 초기화
+    card.step = null;
+    card.series = {};
+    loadSeries(card);
+  });
+
+  Promise.all(cards.map(loadSeries)).then(function () {
+    setTimeout(refresh, refreshS * 1000);
+  });
+})();